@@ -0,0 +1,149 @@
+"""
+Idempotency-Key for create endpoints. Completed response stored in
+cache (redis in production) with a fingerprint of the request, retry
+with the same key get the stored response without running the write
+path again. Duplicate arriving while the first still running wait on
+a short lock, 409 when it not finished in IDEMPOTENCY_WAIT seconds.
+
+    @idempotent('suggest')
+    @transaction.atomic
+    def create(self, request, format=None):
+        ...
+
+Decorator above transaction.atomic, response stored after commit.
+"""
+import hashlib
+import json
+import time
+
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status as response_status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+HEADER = 'HTTP_IDEMPOTENCY_KEY'
+REPLAYED_HEADER = 'Idempotent-Replayed'
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL = 0.05
+
+
+class KeyInProgress(APIException):
+    status_code = response_status.HTTP_409_CONFLICT
+    default_detail = _("Request with this Idempotency-Key still in progress.")
+    default_code = 'idempotency_in_progress'
+
+
+class KeyMismatch(APIException):
+    status_code = response_status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = _("Idempotency-Key already used for other request.")
+    default_code = 'idempotency_mismatch'
+
+
+def get_key(request):
+    key = request.META.get(HEADER)
+    if key and len(key) > MAX_KEY_LENGTH:
+        raise ValidationError({'idempotency_key': _("Too long.")})
+    return key
+
+
+def fingerprint(request):
+    """
+    Method, path and parsed data as canonical json, the raw body can't
+    be read once the stream parsed (throttle read request.data first)
+    and differ by key order or spacing for the same request
+    """
+    data = request.data
+    if hasattr(data, 'lists'):
+        # QueryDict of form and multipart
+        data = dict(data.lists())
+
+    value = '%s %s %s' % (
+        request.method,
+        request.get_full_path(),
+        json.dumps(data, sort_keys=True, separators=(',', ':'), default=str)
+    )
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def cache_key(scope, user_id, key):
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return 'idempotency:%s:%s:%s' % (scope, user_id or 'anon', digest)
+
+
+def _wait(entry_key):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(entry_key)
+        if entry is not None:
+            return entry
+    raise KeyInProgress()
+
+
+def execute(request, scope, user_id, func):
+    """
+    Return (status, data, replayed), func() return (status, data)
+    and only run once per key. Status 5xx and exception not stored,
+    client can retry those.
+    """
+    key = get_key(request)
+    if not key:
+        status, data = func()
+        return status, data, False
+
+    entry_key = cache_key(scope, user_id, key)
+    lock_key = entry_key + ':lock'
+    request_fingerprint = fingerprint(request)
+
+    entry = cache.get(entry_key)
+    if entry is None:
+        if cache.add(lock_key, 1, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            # first may have stored and released between get and add
+            entry = cache.get(entry_key)
+            if entry is not None:
+                cache.delete(lock_key)
+        else:
+            entry = _wait(entry_key)
+
+    if entry is not None:
+        if entry['fingerprint'] != request_fingerprint:
+            raise KeyMismatch()
+        return entry['status'], entry['data'], True
+
+    try:
+        status, data = func()
+        if status < 500:
+            cache.set(entry_key, {
+                'fingerprint': request_fingerprint,
+                'status': status,
+                'data': data,
+            }, settings.IDEMPOTENCY_TIMEOUT)
+    finally:
+        cache.delete(lock_key)
+    return status, data, False
+
+
+def idempotent(scope):
+    """Viewset method decorator, keyed by Idempotency-Key header and user"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            response = None
+
+            def run():
+                nonlocal response
+                response = func(self, request, *args, **kwargs)
+                return response.status_code, response.data
+
+            status, data, replayed = execute(request, scope, request.user.id, run)
+            if replayed:
+                response = Response(data, status=status)
+                response[REPLAYED_HEADER] = 'true'
+            return response
+        return wrapper
+    return decorator
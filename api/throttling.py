@@ -0,0 +1,238 @@
+"""
+Sliding window throttle with several keys per request. Each limit is
+an ident (what is counted) and a scope (rate name in DRF
+DEFAULT_THROTTLE_RATES), declared per viewset action:
+
+    throttle_classes = (SlidingWindowThrottle,)
+    throttle_limits = {
+        'create': (('ip', 'suggest_ip'), ('spread', 'suggest_spread'),),
+    }
+
+Action not declared get ('user', 'user') and ('anon', 'anon') like
+DRF UserRateThrottle and AnonRateThrottle. All limits checked and
+counted with one Lua script on redis, request over any limit not
+counted. Without django_redis fallback to the cache, not atomic.
+
+Counter per window, weighted with the previous window:
+    estimated = previous * (window - elapsed) / window + current
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+# KEYS: current and previous window counter per limit
+# ARGV: limit, window ms and elapsed ms per limit
+SLIDING_WINDOW_LUA = """
+local wait = 0
+local n = #KEYS / 2
+
+for i = 1, n do
+    local limit = tonumber(ARGV[i * 3 - 2])
+    local window = tonumber(ARGV[i * 3 - 1])
+    local elapsed = tonumber(ARGV[i * 3])
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or '0')
+    local estimated = previous * (window - elapsed) / window + current
+
+    if estimated + 1 > limit then
+        local until_ok = window - elapsed
+        if current + 1 <= limit and previous > 0 then
+            until_ok = (estimated + 1 - limit) * window / previous
+        end
+        if until_ok > wait then
+            wait = until_ok
+        end
+    end
+end
+
+if wait > 0 then
+    return math.ceil(wait)
+end
+
+for i = 1, n do
+    local window = tonumber(ARGV[i * 3 - 1])
+    redis.call('INCR', KEYS[i * 2 - 1])
+    redis.call('PEXPIRE', KEYS[i * 2 - 1], window * 2)
+end
+return 0
+"""
+
+DEFAULT_LIMITS = (('user', 'user'), ('anon', 'anon'),)
+
+_script = None
+_script_client = None
+
+
+def _redis():
+    if get_redis_connection is None:
+        return None
+
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        # default cache not django_redis
+        return None
+
+
+def _get_script(client):
+    global _script, _script_client
+    if _script is None or _script_client is not client:
+        _script = client.register_script(SLIDING_WINDOW_LUA)
+        _script_client = client
+    return _script
+
+
+def _digest(value):
+    return hashlib.sha1(str(value).encode()).hexdigest()[:20]
+
+
+# ident name: function(throttle, request, view) return list of values
+
+def ident_ip(throttle, request, view):
+    return [throttle.get_ident(request)]
+
+
+def ident_user(throttle, request, view):
+    user = request.user
+    return [user.id] if user and user.is_authenticated else []
+
+
+def ident_anon(throttle, request, view):
+    user = request.user
+    if user and user.is_authenticated:
+        return []
+    return ident_ip(throttle, request, view)
+
+
+def ident_spread(throttle, request, view):
+    spread = request.data.get('spread') if hasattr(request.data, 'get') else None
+    return [spread] if isinstance(spread, str) and spread else []
+
+
+def ident_canal(throttle, request, view):
+    canals = request.data.get('canals') if hasattr(request.data, 'get') else None
+    if not isinstance(canals, list):
+        return []
+
+    values = set()
+    for canal in canals:
+        if isinstance(canal, dict) and canal.get('value'):
+            values.add(str(canal['value']).strip().lower())
+    return list(values)
+
+
+def ident_issuer(throttle, request, view):
+    issuer = request.data.get('issuer') if hasattr(request.data, 'get') else None
+    return [issuer.strip().lower()] if isinstance(issuer, str) and issuer else []
+
+
+IDENTS = {
+    'ip': ident_ip,
+    'user': ident_user,
+    'anon': ident_anon,
+    'spread': ident_spread,
+    'canal': ident_canal,
+    'issuer': ident_issuer,
+}
+
+
+def rule_key(scope, ident, value):
+    return 'throttle:%s:%s:%s' % (scope, ident, _digest(value))
+
+
+def window_keys(rules, now=None):
+    """Return (keys, args) of the script for [(key, limit, window ms)]"""
+    now = now or int(time.time() * 1000)
+    keys = list()
+    args = list()
+
+    for key, num, window in rules:
+        index = now // window
+        keys.extend(('%s:%s' % (key, index), '%s:%s' % (key, index - 1)))
+        args.extend((num, window, now % window))
+    return keys, args
+
+
+def parse_rate(rate):
+    """'10/minute' to (10, window in ms)"""
+    num, period = rate.split('/')
+    duration = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(num), duration * 1000
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    def __init__(self):
+        self.wait_ms = 0
+
+    def get_limits(self, view):
+        limits = getattr(view, 'throttle_limits', None) or {}
+        return limits.get(getattr(view, 'action', None), DEFAULT_LIMITS)
+
+    def get_rules(self, request, view):
+        """Return [(key, limit, window ms)] for this request"""
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        rules = list()
+
+        for ident, scope in self.get_limits(view):
+            rate = rates.get(scope)
+            if not rate:
+                continue
+
+            num, window = parse_rate(rate)
+            for value in IDENTS[ident](self, request, view):
+                rules.append((rule_key(scope, ident, value), num, window))
+        return rules
+
+    def allow_request(self, request, view):
+        rules = self.get_rules(request, view)
+        if not rules:
+            return True
+
+        keys, args = window_keys(rules)
+        client = _redis()
+        if client is not None:
+            self.wait_ms = int(_get_script(client)(keys=keys, args=args))
+        else:
+            self.wait_ms = self.check_cache(keys, args)
+        return self.wait_ms == 0
+
+    def check_cache(self, keys, args):
+        """Same as the script on plain cache"""
+        values = cache.get_many(keys)
+        wait = 0
+
+        for i in range(0, len(keys), 2):
+            num, window, elapsed = args[i // 2 * 3:i // 2 * 3 + 3]
+            current = values.get(keys[i], 0)
+            previous = values.get(keys[i + 1], 0)
+            estimated = previous * (window - elapsed) / window + current
+
+            if estimated + 1 > num:
+                until_ok = window - elapsed
+                if current + 1 <= num and previous > 0:
+                    until_ok = (estimated + 1 - num) * window / previous
+                wait = max(wait, until_ok)
+
+        if wait:
+            return int(-(-wait // 1))
+
+        for i in range(0, len(keys), 2):
+            window = args[i // 2 * 3 + 1]
+            if not cache.add(keys[i], 1, window * 2 // 1000):
+                try:
+                    cache.incr(keys[i])
+                except ValueError:
+                    cache.set(keys[i], 1, window * 2 // 1000)
+        return 0
+
+    def wait(self):
+        return self.wait_ms / 1000 if self.wait_ms else None
@@ -4,12 +4,13 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.permissions import AllowAny
-from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+
+from .throttling import SlidingWindowThrottle
 
 
 class RootAPIView(APIView):
     permission_classes = (AllowAny,)
-    throttle_classes = (AnonRateThrottle, UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def get(self, request, format=None):
         return Response({
@@ -2,6 +2,8 @@ from django.contrib import admin
 from django.apps import apps
 from django.contrib.auth import get_user_model
 
+from .changelist import LargeTableAdmin
+
 Listing = apps.get_registered_model('feeder', 'Listing')
 Product = apps.get_registered_model('feeder', 'Product')
 Fragment = apps.get_registered_model('feeder', 'Fragment')
@@ -20,6 +22,32 @@ OrderMeta = apps.get_registered_model('feeder', 'OrderMeta')
 OrderItem = apps.get_registered_model('feeder', 'OrderItem')
 
 
+"""
+LISTING
+"""
+
+
+class ListingExtend(LargeTableAdmin):
+    model = Listing
+    list_display = ('label', 'user', 'create_at',)
+    list_select_related = ('user',)
+    search_fields = ('=uuid',)
+
+
+class ProductExtend(LargeTableAdmin):
+    model = Product
+    list_display = ('label', 'listing', 'user', 'create_at',)
+    list_select_related = ('listing', 'user',)
+    search_fields = ('=uuid',)
+
+
+class FragmentExtend(LargeTableAdmin):
+    model = Fragment
+    list_display = ('label', 'product', 'listing', 'start_at', 'expiry_at',)
+    list_select_related = ('product', 'listing',)
+    search_fields = ('=uuid',)
+
+
 """
 SUGGEST
 """
@@ -29,32 +57,84 @@ class CanalInline(admin.StackedInline):
     model = Canal
 
 
-class SuggestExtend(admin.ModelAdmin):
+class SuggestExtend(LargeTableAdmin):
     model = Suggest
     inlines = (CanalInline,)
+    list_display = ('__str__', 'spread', 'user', 'rating', 'create_at',)
+    list_select_related = ('spread', 'user',)
+    search_fields = ('=uuid',)
 
 
-class SpreadExtend(admin.ModelAdmin):
+class SpreadExtend(LargeTableAdmin):
     model = Spread
+    list_display = ('identifier', 'content_type', 'object_id', 'allocation',
+                    'expiry_at',)
+    list_select_related = ('content_type',)
+    search_fields = ('=identifier', '=uuid',)
+
+
+class CanalExtend(LargeTableAdmin):
+    model = Canal
+    list_display = ('suggest', 'method', 'value', 'create_at',)
+    list_select_related = ('suggest',)
+    search_fields = ('=uuid',)
 
 
-class TakenExtend(admin.ModelAdmin):
+class CouponExtend(LargeTableAdmin):
+    model = Coupon
+    list_display = ('identifier', 'state', 'reward', 'suggest', 'create_at',)
+    list_select_related = ('reward', 'suggest',)
+    list_filter = ('state',)
+    search_fields = ('=identifier', '=uuid',)
+
+
+class RedeemExtend(LargeTableAdmin):
+    model = Redeem
+    list_display = ('coupon', 'user', 'create_at',)
+    list_select_related = ('coupon', 'user',)
+    search_fields = ('=coupon__identifier', '=uuid',)
+
+
+class TakenExtend(LargeTableAdmin):
     model = Taken
+    list_display = ('__str__', 'actor', 'create_at',)
+    list_select_related = ('redeem__coupon', 'actor',)
+    search_fields = ('=redeem__coupon__identifier', '=uuid',)
+
+
+class RewardExtend(LargeTableAdmin):
+    model = Reward
+    list_display = ('label', 'type', 'amount', 'unit_label', 'allocation',
+                    'expiry_at',)
+    search_fields = ('^unit_slug', '=uuid',)
+
 
-    def get_queryset(self, request):
-        qs = super().get_queryset(request) \
-            .prefetch_related('actor', 'redeem') \
-            .select_related('actor', 'redeem')
+class InteractionExtend(LargeTableAdmin):
+    model = Interaction
+    list_display = ('__str__', 'suggest', 'user', 'is_product_owner',
+                    'create_at',)
+    list_select_related = ('suggest', 'user',)
+    search_fields = ('=uuid',)
 
-        return qs
 
-    def formfield_for_foreignkey(self, db_field, request, **kwargs):
-        if db_field.name == 'redeem':
-            kwargs['queryset'] = Redeem.objects \
-                .prefetch_related('user', 'coupon') \
-                .select_related('user', 'coupon')
+"""
+BROADCAST
+"""
+
+
+class BroadcastExtend(LargeTableAdmin):
+    model = Broadcast
+    list_display = ('label', 'identifier', 'listing', 'product', 'fragment',
+                    'create_at',)
+    list_select_related = ('listing', 'product', 'fragment',)
+    search_fields = ('=identifier', '=uuid',)
 
-        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+class TargetExtend(LargeTableAdmin):
+    model = Target
+    list_display = ('suggest', 'broadcast', 'method', 'value', 'price',)
+    list_select_related = ('suggest', 'broadcast',)
+    search_fields = ('=uuid',)
 
 
 """
@@ -66,23 +146,34 @@ class OrderMetaInline(admin.StackedInline):
     model = OrderMeta
 
 
-class OrderExtend(admin.ModelAdmin):
+class OrderExtend(LargeTableAdmin):
     model = Order
     inlines = (OrderMetaInline,)
+    list_display = ('identifier', 'broadcast', 'fragment', 'user',
+                    'create_at',)
+    list_select_related = ('broadcast', 'fragment', 'user',)
+    search_fields = ('=identifier', '=uuid',)
+
+
+class OrderItemExtend(LargeTableAdmin):
+    model = OrderItem
+    list_display = ('__str__', 'order', 'target', 'method', 'create_at',)
+    list_select_related = ('order__broadcast', 'target__suggest',)
+    search_fields = ('=uuid',)
 
 
-admin.site.register(Listing)
-admin.site.register(Product)
+admin.site.register(Listing, ListingExtend)
+admin.site.register(Product, ProductExtend)
 admin.site.register(Spread, SpreadExtend)
-admin.site.register(Fragment)
+admin.site.register(Fragment, FragmentExtend)
 admin.site.register(Suggest, SuggestExtend)
-admin.site.register(Canal)
-admin.site.register(Coupon)
-admin.site.register(Redeem)
+admin.site.register(Canal, CanalExtend)
+admin.site.register(Coupon, CouponExtend)
+admin.site.register(Redeem, RedeemExtend)
 admin.site.register(Taken, TakenExtend)
-admin.site.register(Broadcast)
-admin.site.register(Target)
-admin.site.register(Reward)
-admin.site.register(Interaction)
+admin.site.register(Broadcast, BroadcastExtend)
+admin.site.register(Target, TargetExtend)
+admin.site.register(Reward, RewardExtend)
+admin.site.register(Interaction, InteractionExtend)
 admin.site.register(Order, OrderExtend)
-admin.site.register(OrderItem)
+admin.site.register(OrderItem, OrderItemExtend)
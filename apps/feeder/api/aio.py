@@ -0,0 +1,181 @@
+"""
+Helpers for native async views, enabled per endpoint with
+FEEDER_ASYNC_ENDPOINTS and only worth it when served by ASGI.
+
+Cache and throttle awaited on redis (FEEDER_ASYNC_REDIS_URL), ORM work
+run in a bounded thread pool so a burst of scans never hold more
+database connections than FEEDER_ASYNC_ORM_WORKERS.
+"""
+import asyncio
+import hashlib
+import math
+import weakref
+
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+from api import throttling
+
+from ..conf import settings
+from .renderers import FastJSONRenderer
+
+try:
+    from redis import asyncio as aioredis
+except ImportError:
+    try:
+        import aioredis
+    except (ImportError, TypeError):
+        # aioredis 2.0 can't import on python 3.11
+        aioredis = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+_executor = None
+_clients = weakref.WeakKeyDictionary()
+_sync_client = None
+
+
+def is_enabled(name):
+    return name in settings.FEEDER_ASYNC_ENDPOINTS
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.FEEDER_ASYNC_ORM_WORKERS,
+            thread_name_prefix='feeder-orm'
+        )
+    return _executor
+
+
+def run_orm(func, *args, **kwargs):
+    """
+    Awaitable func(*args, **kwargs) in the bounded pool, database
+    connection handled like a request (closed when obsolete)
+    """
+    def job():
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(job, thread_sensitive=False, executor=get_executor())()
+
+
+def get_redis():
+    """Async client bound to running loop, None without redis"""
+    url = settings.FEEDER_ASYNC_REDIS_URL
+    if not url or aioredis is None:
+        return None
+
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.from_url(url)
+        _clients[loop] = client
+    return client
+
+
+def get_sync_redis():
+    global _sync_client
+    url = settings.FEEDER_ASYNC_REDIS_URL
+    if not url or redis is None:
+        return None
+
+    if _sync_client is None:
+        _sync_client = redis.Redis.from_url(url)
+    return _sync_client
+
+
+async def cache_get(key):
+    client = get_redis()
+    if client is not None:
+        return await client.get(key)
+    return await sync_to_async(cache.get, thread_sensitive=False)(key)
+
+
+async def cache_set(key, value, timeout):
+    client = get_redis()
+    if client is not None:
+        await client.set(key, value, ex=timeout)
+    else:
+        await sync_to_async(cache.set, thread_sensitive=False)(key, value, timeout)
+
+
+def public_spread_key(identifier):
+    return 'feeder:public-spread:%s' % identifier
+
+
+def forget(key):
+    """Sync delete for signal handler, same store as cache_set"""
+    client = get_sync_redis()
+    if client is not None:
+        client.delete(key)
+    else:
+        cache.delete(key)
+
+
+class _Ident(SimpleRateThrottle):
+    # only for get_ident
+    rate = '1/second'
+
+
+async def throttle(request):
+    """
+    SlidingWindowThrottle default limits checked before authentication
+    run in the pool, same script and keys so `anon` per ip shared with
+    the sync views, `user` counted per credential. Return seconds to
+    wait when over the rate else None.
+    """
+    credential = request.META.get('HTTP_AUTHORIZATION')
+    if credential:
+        scope, ident = 'user', 'credential'
+        value = hashlib.sha1(credential.encode()).hexdigest()
+    else:
+        scope, ident = 'anon', 'anon'
+        value = _Ident().get_ident(request)
+
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+    if not rate:
+        return None
+
+    num, window = throttling.parse_rate(rate)
+    keys, args = throttling.window_keys([(throttling.rule_key(scope, ident, value), num, window)])
+
+    client = get_redis()
+    if client is not None:
+        wait_ms = await client.eval(throttling.SLIDING_WINDOW_LUA, len(keys), *keys, *args)
+    else:
+        check = throttling.SlidingWindowThrottle().check_cache
+        wait_ms = await sync_to_async(check, thread_sensitive=False)(keys, args)
+
+    if wait_ms:
+        return math.ceil(int(wait_ms) / 1000)
+    return None
+
+
+def json_response(data=None, status=200, content=None):
+    if content is None:
+        content = FastJSONRenderer().render(data)
+    return HttpResponse(content, status=status, content_type='application/json')
+
+
+def throttled_response(wait):
+    response = json_response(
+        {'detail': 'Request was throttled. Expected available in %d seconds.' % wait},
+        status=429
+    )
+    response['Retry-After'] = '%d' % wait
+    return response
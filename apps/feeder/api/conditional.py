@@ -0,0 +1,91 @@
+import hashlib
+import time
+
+from functools import wraps
+
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from rest_framework.response import Response
+
+from ..conf import settings
+from .. import replicas
+from ..versions import get_version
+
+
+def make_etag(request, resource, version):
+    key = '%s:%r:%s:%s:%s' % (
+        resource,
+        version,
+        request.user.id,
+        request.build_absolute_uri(),
+        request.META.get('HTTP_ACCEPT', '')
+    )
+    return '"%s"' % hashlib.md5(key.encode()).hexdigest()
+
+
+def conditional(resource, when=None):
+    """
+    ETag and Last-Modified from owner data version, return 304 when
+    client has the current one, else serve data cached by the same version.
+    Only for owner scoped response, `when(request, **kwargs)` return False
+    to skip for request which not. ie:
+
+        @conditional(Resource.SUGGEST)
+        def list(self, request, format=None):
+            ...
+
+    Last-Modified only accurate to second, client should use ETag.
+    Version bumped within FEEDER_REPLICA_STICKY_SECONDS computed on
+    primary, replica may not have it yet. Older one may read replica
+    but such response neither cached nor tagged.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, request, *args, **kwargs):
+            user = request.user
+            if request.method not in ('GET', 'HEAD') \
+                    or not user.is_authenticated \
+                    or (when and not when(request, **kwargs)):
+                return func(self, request, *args, **kwargs)
+
+            version = get_version(user.id, resource)
+            etag = make_etag(request, resource, version)
+            last_modified = int(version)
+
+            not_modified = get_conditional_response(
+                request,
+                etag=etag,
+                last_modified=last_modified
+            )
+
+            if not_modified is not None:
+                response = not_modified
+            else:
+                timeout = settings.FEEDER_CONDITIONAL_CACHE_TIMEOUT
+                cache_key = 'feeder:response:%s' % etag.strip('"')
+                data = cache.get(cache_key) if timeout else None
+
+                if data is not None:
+                    response = Response(data)
+                elif time.time() - version < settings.FEEDER_REPLICA_STICKY_SECONDS:
+                    # replica may lag behind a fresh version
+                    with replicas.use_primary():
+                        response = func(self, request, *args, **kwargs)
+                elif replicas.is_replica_read():
+                    # may be behind the version, not cached nor validated as it
+                    return func(self, request, *args, **kwargs)
+                else:
+                    response = func(self, request, *args, **kwargs)
+
+                if data is None and timeout and response.status_code == 200:
+                    cache.set(cache_key, response.data, timeout)
+
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                response['Last-Modified'] = http_date(last_modified)
+                patch_cache_control(response, private=True, no_cache=True)
+            return response
+        return wrapper
+    return decorator
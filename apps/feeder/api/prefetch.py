@@ -0,0 +1,254 @@
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch, prefetch_related_objects
+from django.db.models.constants import LOOKUP_SEP
+
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField
+
+# Cache plan per (serializer, model)
+_PLANS = dict()
+
+
+def serializer_paths(serializer, prefix=''):
+    """
+    Yield ORM paths read by serializer fields, nested serializer included.
+    SerializerMethodField and model property can't be inspected,
+    declare them in `Meta.prefetch_hints`
+    """
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        path = prefix + LOOKUP_SEP.join(field.source_attrs)
+
+        if isinstance(field, serializers.ListSerializer):
+            yield path
+            yield from serializer_paths(field.child, path + LOOKUP_SEP)
+        elif isinstance(field, serializers.BaseSerializer):
+            yield path
+            yield from serializer_paths(field, path + LOOKUP_SEP)
+        elif isinstance(field, PrimaryKeyRelatedField):
+            # read from <field>_id, only the parents need joined
+            yield prefix + LOOKUP_SEP.join(field.source_attrs[:-1])
+        elif isinstance(field, (ManyRelatedField, serializers.RelatedField)):
+            yield path
+        else:
+            yield prefix + LOOKUP_SEP.join(field.source_attrs[:-1])
+
+    meta = getattr(serializer, 'Meta', None)
+    for hint in getattr(meta, 'prefetch_hints', ()):
+        yield prefix + hint
+
+
+def resolve_path(model, path):
+    """
+    Return (kind, lookup, tail) for path start from model;
+        :select     forward foreign key chain, use select_related
+        :prefetch   cross multi valued relation, use prefetch_related
+        :generic    cross GenericForeignKey, lookup prefetched then
+                    tail resolved per content type
+    Non relation parts (field, property, annotation) dropped.
+    """
+    names = path.split(LOOKUP_SEP) if path else []
+    kind = 'select'
+    current = model
+
+    for index, name in enumerate(names):
+        try:
+            field = current._meta.get_field(name)
+        except FieldDoesNotExist:
+            names = names[:index]
+            break
+
+        if isinstance(field, GenericForeignKey):
+            lookup = LOOKUP_SEP.join(names[:index + 1])
+            tail = LOOKUP_SEP.join(names[index + 1:])
+            return 'generic', lookup, tail
+
+        if not field.is_relation:
+            names = names[:index]
+            break
+
+        if field.one_to_many or field.many_to_many:
+            kind = 'prefetch'
+
+        current = field.related_model
+
+    return kind, LOOKUP_SEP.join(names), ''
+
+
+class PrefetchPlan:
+    """
+    Relations needed by a serializer, so list endpoints run a fixed
+    number of queries regardless of page size.
+
+        plan = PrefetchPlan.for_serializer(ListSuggestSerializer)
+        queryset = plan.apply(Suggest.objects.all())
+        paginator = _PAGINATOR.paginate_queryset(queryset, request)
+        plan.prefetch(paginator)
+
+    `apply` add select_related and prefetch_related to queryset,
+    `prefetch` follow GenericForeignKey to FK chains on fetched
+    instances grouped by content type.
+    """
+
+    def __init__(self, model, paths):
+        self.model = model
+        self.select_related = list()
+        self.prefetch_related = list()
+        self.generic_related = list()
+
+        for path in sorted(set(paths)):
+            kind, lookup, tail = resolve_path(model, path)
+            if not lookup:
+                continue
+
+            if kind == 'select':
+                self.select_related.append(lookup)
+            elif kind == 'prefetch':
+                self.prefetch_related.append(lookup)
+            else:
+                self.prefetch_related.append(lookup)
+                if tail:
+                    self.generic_related.append((lookup, tail))
+
+        # drop lookups covered by longer one, ie: coupons by coupons__reward
+        self.select_related = self._longest(self.select_related)
+        self.prefetch_related = sorted(set(self.prefetch_related))
+        self.generic_related = sorted(set(self.generic_related))
+
+    def __repr__(self):
+        return '<PrefetchPlan %s select=%s prefetch=%s generic=%s>' % (
+            self.model._meta.label,
+            self.select_related,
+            self.prefetch_related,
+            self.generic_related
+        )
+
+    @classmethod
+    def for_serializer(cls, serializer_class, model=None):
+        model = model or serializer_class.Meta.model
+        key = (serializer_class, model)
+
+        if key not in _PLANS:
+            paths = serializer_paths(serializer_class())
+            _PLANS[key] = cls(model, paths)
+        return _PLANS[key]
+
+    @staticmethod
+    def _longest(lookups):
+        return [
+            lookup for lookup in lookups
+            if not any(
+                other.startswith(lookup + LOOKUP_SEP) for other in lookups
+            )
+        ]
+
+    def get_prefetches(self, exclude=()):
+        """
+        Turn each multi valued lookup into Prefetch with forward relations
+        after it select_related. ie: coupons__reward become
+        Prefetch('coupons', queryset=Coupon.objects.select_related('reward'))
+        """
+        prefetches = dict()
+        lookups = list()
+
+        for lookup in self._longest(self.prefetch_related):
+            names = lookup.split(LOOKUP_SEP)
+            current = self.model
+
+            for index, name in enumerate(names):
+                field = current._meta.get_field(name)
+                if isinstance(field, GenericForeignKey):
+                    lookups.append(lookup)
+                    break
+
+                current = field.related_model
+                if not (field.one_to_many or field.many_to_many):
+                    continue
+
+                prefetch_to = LOOKUP_SEP.join(names[:index + 1])
+                rest = names[index + 1:]
+                if prefetch_to in exclude:
+                    lookups.append(lookup)
+                    break
+
+                select = list()
+                related = current
+                for rest_name in rest:
+                    rest_field = related._meta.get_field(rest_name)
+                    if rest_field.one_to_many or rest_field.many_to_many \
+                            or isinstance(rest_field, GenericForeignKey):
+                        lookups.append(lookup)
+                        break
+                    select.append(rest_name)
+                    related = rest_field.related_model
+
+                prefetches.setdefault(prefetch_to, (current, set()))
+                if select:
+                    prefetches[prefetch_to][1].add(LOOKUP_SEP.join(select))
+                break
+
+        ret = list()
+        for prefetch_to, (model, select) in prefetches.items():
+            queryset = model._default_manager.all()
+
+            # select_related() without args mean all, only pass if any
+            if select:
+                queryset = queryset.select_related(*select)
+            ret.append(Prefetch(prefetch_to, queryset=queryset))
+
+        return ret + sorted(set(lookups))
+
+    def apply(self, queryset):
+        existing = set(
+            getattr(lookup, 'prefetch_to', lookup)
+            for lookup in queryset._prefetch_related_lookups
+        )
+
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+
+        prefetches = [
+            lookup for lookup in self.get_prefetches(exclude=existing)
+            if getattr(lookup, 'prefetch_to', lookup) not in existing
+        ]
+
+        if prefetches:
+            queryset = queryset.prefetch_related(*prefetches)
+        return queryset
+
+    def prefetch(self, instances):
+        """
+        Prefetch the part after GenericForeignKey on content object
+        which has the relation, others skipped.
+        """
+        instances = list(instances)
+
+        for lookup, tail in self.generic_related:
+            grouped = dict()
+            for obj in self._traverse(instances, lookup.split(LOOKUP_SEP)):
+                grouped.setdefault(obj.__class__, []).append(obj)
+
+            for model, objs in grouped.items():
+                _kind, valid_tail, _tail = resolve_path(model, tail)
+                if valid_tail:
+                    prefetch_related_objects(objs, valid_tail)
+        return instances
+
+    def _traverse(self, instances, names):
+        objs = instances
+        for name in names:
+            values = list()
+            for obj in objs:
+                value = getattr(obj, name, None)
+                if value is None:
+                    continue
+
+                if hasattr(value, 'all'):
+                    values.extend(value.all())
+                else:
+                    values.append(value)
+            objs = values
+        return objs
@@ -0,0 +1,86 @@
+from django.urls import reverse
+
+from rest_framework import serializers
+
+from ..conf import settings
+
+# Same output as DRF field without the field machinery per row
+datetime_representation = serializers.DateTimeField().to_representation
+
+
+def is_enabled(name):
+    """Endpoint listed in FEEDER_PROJECTION_ENDPOINTS use projection"""
+    return name in settings.FEEDER_PROJECTION_ENDPOINTS
+
+
+class Permalink:
+    """
+    Replace HyperlinkedIdentityField, reverse() run once
+    then each row only format the template
+    """
+    PLACEHOLDER = '__lookup__'
+
+    def __init__(self, view_name, lookup_field='uuid'):
+        self.view_name = view_name
+        self.lookup_field = lookup_field
+        self._path = None
+
+    def template(self, request=None):
+        if self._path is None:
+            self._path = reverse(
+                self.view_name,
+                kwargs={self.lookup_field: self.PLACEHOLDER}
+            )
+
+        url = request.build_absolute_uri(self._path) if request else self._path
+        return url.replace(self.PLACEHOLDER, '{}')
+
+
+class Projection:
+    """
+    Read only list serializer on `.values()` rows. Same output as
+    the ModelSerializer it replace, used as:
+
+        paginator = _PAGINATOR.paginate_queryset(
+            ListSuggestProjection.values(queryset),
+            request
+        )
+        serializer = ListSuggestProjection(paginator, context=self.context)
+        serializer.data
+
+    :fields     passed to `.values()`
+    :permalink  Permalink, template available as `self.link`
+    """
+    fields = ()
+    permalink = None
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or dict()
+        self.link = None
+
+    @classmethod
+    def values(cls, queryset):
+        # prefetch can't run on dict rows
+        return queryset.prefetch_related(None).values(*cls.fields)
+
+    @property
+    def request(self):
+        return self.context.get('request')
+
+    def prepare(self, rows):
+        """Load related data for all rows at once"""
+        pass
+
+    def to_representation(self, row):
+        raise NotImplementedError
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+
+        if self.permalink is not None:
+            self.link = self.permalink.template(self.request)
+
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
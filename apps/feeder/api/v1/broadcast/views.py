@@ -8,10 +8,11 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.idempotency import idempotent
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateBroadcastSerializer,
     ListBroadcastSerializer,
@@ -19,6 +20,8 @@ from .serializers import (
     UpdateBroadcastSerializer
 )
 from ....helpers import build_result_pagination
+from ...conditional import conditional
+from ....versions import Resource
 
 Broadcast = apps.get_registered_model('feeder', 'Broadcast')
 
@@ -66,7 +69,7 @@ class BroadcastViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def queryset(self):
         return Broadcast.objects \
@@ -83,6 +86,7 @@ class BroadcastViewSet(BaseViewSet):
         except ObjectDoesNotExist:
             raise NotFound()
 
+    @idempotent('broadcast')
     @transaction.atomic
     def create(self, request, format=None):
         serializer = CreateBroadcastSerializer(
@@ -136,6 +140,7 @@ class BroadcastViewSet(BaseViewSet):
         )
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.BROADCAST)
     def list(self, request, format=None):
         queryset = self.queryset()
         paginator = _PAGINATOR.paginate_queryset(queryset, request)
@@ -148,6 +153,7 @@ class BroadcastViewSet(BaseViewSet):
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.BROADCAST)
     def retrieve(self, request, uuid=None, format=None):
         instance = self.queryset_instance(uuid)
         serializer = RetrieveBroadcastSerializer(
@@ -0,0 +1,47 @@
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import status as response_status
+from rest_framework.views import APIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from .... import changes
+
+
+def get_number(request, name):
+    value = request.query_params.get(name, None)
+    if value in (None, ''):
+        return 0
+
+    try:
+        value = int(value)
+    except ValueError:
+        value = -1
+
+    if value < 0:
+        raise ValidationError(detail=_("%s must be a positive number.") % name)
+    return value
+
+
+class ChangeAPIView(APIView):
+    """
+    Delta sync of owner dashboard, ?cursor= from the previous
+    response (0 or none for the first sync), ask again while `more`.
+    410 when cursor older than the log, client must reload everything.
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, format=None):
+        cursor = get_number(request, 'cursor')
+        limit = get_number(request, 'limit')
+
+        try:
+            results, cursor, more = changes.feed(request.user.id, cursor, limit)
+        except changes.Expired:
+            return Response(
+                {'detail': _("Cursor expired, resync required.")},
+                status=response_status.HTTP_410_GONE
+            )
+
+        return Response({'cursor': cursor, 'more': more, 'results': results})
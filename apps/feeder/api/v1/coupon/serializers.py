@@ -0,0 +1,34 @@
+from rest_framework import serializers
+
+from ....conf import settings
+from .... import coupons
+
+
+class CheckCouponSerializer(serializers.Serializer):
+    identifiers = serializers.ListField(
+        child=serializers.CharField(max_length=7),
+        allow_empty=False,
+        max_length=settings.FEEDER_COUPON_CHECK_MAX
+    )
+
+
+def coupon_check_representation(identifier, entry, user, now=None):
+    """
+    Coupon of other owner answered as not found,
+    `redeem` uuid used to create taken when redeemable
+    """
+    if entry is None or entry['owner_id'] != user.id:
+        return {
+            'identifier': identifier,
+            'is_found': False,
+            'is_redeemable': False,
+        }
+
+    return {
+        'identifier': identifier,
+        'is_found': True,
+        'is_redeemable': coupons.is_redeemable(entry, now=now),
+        'state': entry['state'],
+        'redeem': entry['redeem'],
+        'reward': entry['reward'],
+    }
@@ -0,0 +1,69 @@
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import viewsets, status as response_status
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from api.throttling import SlidingWindowThrottle
+from .serializers import CheckCouponSerializer, coupon_check_representation
+from .... import coupons
+from ...renderers import FAST_RENDERER_CLASSES
+
+
+class BaseViewSet(viewsets.ViewSet):
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.context = dict()
+
+    def initialize_request(self, request, *args, **kwargs):
+        self.context.update({'request': request})
+        return super().initialize_request(request, *args, **kwargs)
+
+
+class CouponViewSet(BaseViewSet):
+    """
+    Coupon check for merchant at point of sale
+
+    GET
+    -----
+        ../coupons/ZaWBiG/
+
+
+    POST
+    -----
+        ../coupons/check/
+
+        {
+            "identifiers": ["ZaWBiG", "a8hUq2"]
+        }
+    """
+    lookup_field = 'identifier'
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (SlidingWindowThrottle,)
+    renderer_classes = FAST_RENDERER_CLASSES
+
+    def retrieve(self, request, identifier=None, format=None):
+        entry = coupons.lookup([identifier]).get(identifier)
+        ret = coupon_check_representation(identifier, entry, request.user)
+
+        if not ret['is_found']:
+            raise NotFound(_("Coupon not found."))
+        return Response(ret, status=response_status.HTTP_200_OK)
+
+    @action(methods=['POST'], detail=False, url_name='check', url_path='check')
+    def check(self, request, format=None):
+        serializer = CheckCouponSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        identifiers = serializer.validated_data['identifiers']
+        entries = coupons.lookup(identifiers)
+        now = timezone.now()
+
+        results = [
+            coupon_check_representation(i, entries.get(i), request.user, now=now)
+            for i in identifiers
+        ]
+        return Response({'results': results}, status=response_status.HTTP_200_OK)
@@ -12,8 +12,6 @@ class BaseInteractionSerializer(serializers.ModelSerializer):
 
 
 class ListInteractionSerializer(BaseInteractionSerializer):
-    is_product_owner = serializers.BooleanField(read_only=True)
-
     class Meta(BaseInteractionSerializer.Meta):
         fields = ('description', 'create_at', 'is_product_owner',)
 
@@ -37,17 +35,11 @@ class CreateInteractionSerializer(BaseInteractionSerializer):
         }
 
     def to_representation(self, instance):
-        data = {
-            'is_product_owner': instance.suggest.spread.content_object.product.listing.user.id == instance.user.id
-        }
-
         serializer = RetrieveInteractionSerializer(
             instance,
             context=self.context
         )
-
-        data.update(serializer.data)
-        return data
+        return serializer.data
 
 
 class UpdateInteractionSerializer(BaseInteractionSerializer):
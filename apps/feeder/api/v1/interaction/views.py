@@ -2,7 +2,6 @@ from copy import copy
 
 from django.db import transaction
 from django.db.models import Q
-from django.db.models.expressions import Exists, OuterRef
 from django.apps import apps
 from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
 from django.utils.translation import gettext_lazy as _
@@ -10,16 +9,15 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import CreateInteractionSerializer, ListInteractionSerializer, RetrieveInteractionSerializer, UpdateInteractionSerializer
 from ....helpers import build_result_pagination
 
 Interaction = apps.get_registered_model('feeder', 'Interaction')
 Suggest = apps.get_registered_model('feeder', 'Suggest')
-Product = apps.get_registered_model('feeder', 'Product')
 
 # Define to avoid used ...().paginate__
 _PAGINATOR = LimitOffsetPagination()
@@ -55,23 +53,19 @@ class InteractionViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
-    def queryset(self):
-        product_queryset = Product.objects \
-            .filter(
-                fragments__spreads__suggests__interactions__id=OuterRef('id'),
-                listing__user_id=OuterRef('user__id')
-            )
+    def participant_filter(self, prefix=''):
+        # suggester or owner of the suggest
+        return Q(**{prefix + 'user_id': self.request.user.id}) \
+            | Q(**{prefix + 'spread__fragment__listing__user_id': self.request.user.id})
 
+    def queryset(self):
         return Interaction.objects \
             .prefetch_related('user', 'user__profile') \
             .select_related('user', 'user__profile') \
-            .annotate(is_product_owner=Exists(product_queryset)) \
-            .filter(
-                Q(suggest__user_id=self.request.user.id)
-                | Q(suggest__spread__fragment__listing__user_id=self.request.user.id)
-            )
+            .filter(self.participant_filter(prefix='suggest__')) \
+            .filter(suggest__delete_at__isnull=True)
 
     def queryset_instance(self, uuid, for_update=False):
         try:
@@ -137,7 +131,6 @@ class InteractionViewSet(BaseViewSet):
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
     def list(self, request, format=None):
-        queryset = self.queryset()
         suggest = request.query_params.get('suggest')
 
         if not suggest:
@@ -145,11 +138,22 @@ class InteractionViewSet(BaseViewSet):
                 'suggest': _("Suggest required")
             })
 
+        # check participant once, then thread read by (suggest, create_at)
         try:
-            queryset = queryset.filter(suggest__uuid=suggest)
-        except Exception as e:
+            suggest_id = Suggest.objects \
+                .filter(self.participant_filter()) \
+                .values_list('id', flat=True) \
+                .get(uuid=suggest)
+        except ObjectDoesNotExist:
+            raise NotFound()
+        except DjangoValidationError as e:
             raise ValidationError(detail=str(e))
 
+        queryset = Interaction.objects \
+            .prefetch_related('user', 'user__profile') \
+            .select_related('user', 'user__profile') \
+            .filter(suggest_id=suggest_id)
+
         paginator = _PAGINATOR.paginate_queryset(queryset, request)
         serializer = ListInteractionSerializer(
             paginator,
@@ -8,10 +8,11 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.idempotency import idempotent
+from api.throttling import SlidingWindowThrottle
 from .serializers import CreateOrderSerializer, ListOrderSerializer, RetrieveOrderSerializer
 from ....helpers import build_result_pagination
 
@@ -56,7 +57,7 @@ class OrderViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def queryset(self):
         return Order.objects \
@@ -72,6 +73,7 @@ class OrderViewSet(BaseViewSet):
         except ObjectDoesNotExist:
             raise NotFound()
 
+    @idempotent('order')
     @transaction.atomic
     def create(self, request, format=None):
         serializer = CreateOrderSerializer(
@@ -8,10 +8,10 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateProductSerializer,
     ListProductSerializer,
@@ -56,7 +56,7 @@ class ProductViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def queryset(self):
         return Product.objects \
@@ -117,8 +117,8 @@ class ProductViewSet(BaseViewSet):
         # copy for response
         instance_copy = copy(instance)
 
-        # run delete
-        instance.delete()
+        # hidden now, dependents purged in background
+        instance.soft_delete()
 
         # return object
         serializer = RetrieveProductSerializer(
@@ -2,6 +2,8 @@ from django.apps import apps
 
 from rest_framework import serializers
 
+from ...projection import Permalink, Projection, datetime_representation
+
 Redeem = apps.get_registered_model('feeder', 'Redeem')
 Reward = apps.get_registered_model('feeder', 'Reward')
 
@@ -43,3 +45,35 @@ class ListRedeemSerializer(BaseRedeemSerializer):
 class RetrieveRedeemSerializer(ListRedeemSerializer):
     class Meta(ListRedeemSerializer.Meta):
         pass
+
+
+class ListRedeemProjection(Projection):
+    """Same output as ListRedeemSerializer"""
+    reward_fields = RewardSerializer.Meta.fields
+    reward_datetime_fields = ('start_at', 'expiry_at',)
+
+    fields = ('uuid', 'coupon_id', 'coupon__identifier', 'coupon__reward_id',
+              'is_taken',) + tuple('coupon__reward__%s' % f for f in reward_fields)
+    permalink = Permalink('feeder_api:redeem-detail')
+
+    def reward_representation(self, row):
+        if row['coupon__reward_id'] is None:
+            return None
+
+        ret = dict()
+        for field in self.reward_fields:
+            value = row['coupon__reward__%s' % field]
+            if field in self.reward_datetime_fields and value is not None:
+                value = datetime_representation(value)
+            ret[field] = value
+        return ret
+
+    def to_representation(self, row):
+        return {
+            'uuid': str(row['uuid']),
+            'permalink': self.link.format(row['uuid']),
+            'coupon': row['coupon_id'],
+            'coupon_identifier': row['coupon__identifier'],
+            'coupon_reward': self.reward_representation(row),
+            'is_taken': row['is_taken'],
+        }
@@ -7,12 +7,18 @@ from django.db.models import OuterRef, Subquery
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
-from .serializers import ListRedeemSerializer, RetrieveRedeemSerializer
+from api.throttling import SlidingWindowThrottle
+from .serializers import (
+    ListRedeemSerializer,
+    ListRedeemProjection,
+    RetrieveRedeemSerializer
+)
 from ....helpers import build_result_pagination
+from ... import projection
+from ...renderers import FAST_RENDERER_CLASSES
 
 Redeem = apps.get_registered_model('feeder', 'Redeem')
 Taken = apps.get_registered_model('feeder', 'Taken')
@@ -39,7 +45,8 @@ class RedeemViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
+    renderer_classes = FAST_RENDERER_CLASSES
 
     def queryset(self):
         taken_subquery = Taken.objects.filter(redeem_id=OuterRef('id'))
@@ -71,12 +78,19 @@ class RedeemViewSet(BaseViewSet):
                 coupon__identifier__icontains=identifier
             )
 
-        paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = ListRedeemSerializer(
-            paginator,
-            context=self.context,
-            many=True
-        )
+        if projection.is_enabled('redeem'):
+            paginator = _PAGINATOR.paginate_queryset(
+                ListRedeemProjection.values(queryset),
+                request
+            )
+            serializer = ListRedeemProjection(paginator, context=self.context)
+        else:
+            paginator = _PAGINATOR.paginate_queryset(queryset, request)
+            serializer = ListRedeemSerializer(
+                paginator,
+                context=self.context,
+                many=True
+            )
 
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
@@ -34,6 +34,7 @@ class RetrieveRewardSerializer(BaseRewardSerializer):
 
     class Meta(BaseRewardSerializer.Meta):
         fields = '__all__'
+        prefetch_hints = ('content_object',)
 
 
 class CreateRewardSerializer(BaseRewardSerializer):
@@ -9,10 +9,10 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateRewardSerializer,
     ListRewardSerializer,
@@ -20,6 +20,9 @@ from .serializers import (
     UpdateRewardSerializer
 )
 from ....helpers import build_result_pagination
+from ...conditional import conditional
+from ...prefetch import PrefetchPlan
+from ....versions import Resource
 
 Reward = apps.get_registered_model('feeder', 'Reward')
 
@@ -82,25 +85,31 @@ class RewardViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def queryset(self):
         return Reward.objects \
-            .prefetch_related('content_type') \
             .select_related('content_type') \
             .filter(
-                Q(fragment__user_id=self.request.user.id)
+                # not of a soft deleted fragment
+                Q(fragment__user_id=self.request.user.id, fragment__delete_at__isnull=True)
                 | Q(broadcast__user_id=self.request.user.id)
             )
 
     def queryset_instance(self, uuid, for_update=False):
         try:
             if for_update:
+                # lock only, update response not the retrieve one
                 return self.queryset().select_for_update().get(uuid=uuid)
-            return self.queryset().get(uuid=uuid)
+
+            plan = PrefetchPlan.for_serializer(RetrieveRewardSerializer)
+            instance = plan.apply(self.queryset()).get(uuid=uuid)
         except ObjectDoesNotExist:
             raise NotFound()
 
+        plan.prefetch([instance])
+        return instance
+
     @transaction.atomic
     def create(self, request, format=None):
         serializer = CreateRewardSerializer(
@@ -154,6 +163,7 @@ class RewardViewSet(BaseViewSet):
         )
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.REWARD)
     def list(self, request, format=None):
         queryset = self.queryset()
         fragment = request.query_params.get('fragment', None)
@@ -186,7 +196,10 @@ class RewardViewSet(BaseViewSet):
                 'param': str(e)
             })
 
-        paginator = _PAGINATOR.paginate_queryset(queryset, request)
+        plan = PrefetchPlan.for_serializer(ListRewardSerializer)
+        paginator = _PAGINATOR.paginate_queryset(plan.apply(queryset), request)
+        plan.prefetch(paginator)
+
         serializer = ListRewardSerializer(
             paginator,
             context=self.context,
@@ -196,6 +209,7 @@ class RewardViewSet(BaseViewSet):
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.REWARD)
     def retrieve(self, request, uuid=None, format=None):
         instance = self.queryset_instance(uuid)
         serializer = RetrieveRewardSerializer(instance, context=self.context)
@@ -1,8 +1,8 @@
-from django.urls import path, include
+from django.urls import path, re_path, include
 
 from rest_framework.routers import DefaultRouter
 
-from .stat.views import StatAPIView
+from .stat.views import StatAPIView, RollupAPIView
 from .listing.views import ListingViewSet
 from .product.views import ProductViewSet
 from .fragment.views import FragmentViewSet
@@ -13,8 +13,13 @@ from .target.views import TargetViewSet
 from .reward.views import RewardViewSet
 from .redeem.views import RedeemViewSet
 from .taken.views import TakenViewSet
+from .coupon.views import CouponViewSet
 from .order.views import OrderViewSet
 from .interaction.views import InteractionViewSet
+from .change.views import ChangeAPIView
+from .spread.async_views import public_spread_view
+from .suggest.async_views import suggest_view
+from .. import aio
 
 router = DefaultRouter(trailing_slash=True)
 router.register('listings', ListingViewSet, basename='listing')
@@ -27,10 +32,27 @@ router.register('targets', TargetViewSet, basename='target')
 router.register('rewards', RewardViewSet, basename='reward')
 router.register('redeems', RedeemViewSet, basename='redeem')
 router.register('takens', TakenViewSet, basename='taken')
+router.register('coupons', CouponViewSet, basename='coupon')
 router.register('orders', OrderViewSet, basename='order')
 router.register('interactions', InteractionViewSet, basename='interaction')
 
-urlpatterns = [
+# Native async for anonymous hot paths, before the router
+async_urlpatterns = list()
+
+if aio.is_enabled('spread_public'):
+    async_urlpatterns.append(
+        re_path(r'^spreads/(?P<identifier>[a-zA-Z0-9]{1,7})/$',
+                public_spread_view, name='spread-public')
+    )
+
+if aio.is_enabled('suggest_create'):
+    async_urlpatterns.append(
+        path('suggests/', suggest_view, name='suggest-async')
+    )
+
+urlpatterns = async_urlpatterns + [
     path('', include(router.urls)),
-    path('stats/', StatAPIView.as_view(), name='stat')
+    path('stats/', StatAPIView.as_view(), name='stat'),
+    path('stats/rollups/', RollupAPIView.as_view(), name='rollup'),
+    path('changes/', ChangeAPIView.as_view(), name='change')
 ]
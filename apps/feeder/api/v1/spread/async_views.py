@@ -0,0 +1,51 @@
+from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist
+
+from .serializers import RetrievePublicSpreadSerializer
+from ... import aio
+from ...prefetch import PrefetchPlan
+from ....conf import settings
+
+Spread = apps.get_registered_model('feeder', 'Spread')
+
+
+def retrieve_public_spread(identifier):
+    plan = PrefetchPlan.for_serializer(RetrievePublicSpreadSerializer)
+    queryset = plan.apply(Spread.objects.select_related('content_type'))
+
+    try:
+        instance = queryset.get(identifier=identifier)
+    except ObjectDoesNotExist:
+        return None
+
+    plan.prefetch([instance])
+    serializer = RetrievePublicSpreadSerializer(instance)
+    return serializer.data
+
+
+async def public_spread_view(request, identifier):
+    """
+    GET
+    -----
+        Same as ../spreads/<identifier>/ of SpreadViewSet for
+        QR scan, rendered response cached by identifier
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return aio.json_response({'detail': 'Method not allowed.'}, status=405)
+
+    wait = await aio.throttle(request)
+    if wait:
+        return aio.throttled_response(wait)
+
+    key = aio.public_spread_key(identifier)
+    content = await aio.cache_get(key)
+
+    if content is None:
+        data = await aio.run_orm(retrieve_public_spread, identifier)
+        if data is None:
+            return aio.json_response({'detail': 'Not found.'}, status=404)
+
+        content = aio.FastJSONRenderer().render(data)
+        await aio.cache_set(key, content, settings.FEEDER_PUBLIC_SPREAD_CACHE_TIMEOUT)
+
+    return aio.json_response(content=content)
@@ -6,6 +6,8 @@ from django.contrib.contenttypes.models import ContentType
 from rest_framework import serializers
 from rest_framework.exceptions import NotFound
 
+from ...projection import Permalink, Projection, datetime_representation
+
 Fragment = apps.get_registered_model('feeder', 'Fragment')
 Spread = apps.get_registered_model('feeder', 'Spread')
 
@@ -32,12 +34,45 @@ class ListSpreadSerializer(BaseSpreadSerializer):
                   'identifier', 'qrcode', 'url', 'introduction',)
 
 
+class ListSpreadProjection(Projection):
+    """Same output as ListSpreadSerializer"""
+    fields = ('uuid', 'allocation', 'expiry_at', 'identifier', 'qrcode',
+              'url', 'introduction',)
+    permalink = Permalink('feeder_api:spread-detail')
+
+    def prepare(self, rows):
+        self.storage = Spread._meta.get_field('qrcode').storage
+
+    def qrcode_url(self, name):
+        if not name:
+            return None
+
+        url = self.storage.url(name)
+        if self.request is not None:
+            return self.request.build_absolute_uri(url)
+        return url
+
+    def to_representation(self, row):
+        expiry_at = row['expiry_at']
+        return {
+            'permalink': self.link.format(row['uuid']),
+            'uuid': str(row['uuid']),
+            'allocation': row['allocation'],
+            'expiry_at': datetime_representation(expiry_at) if expiry_at else None,
+            'identifier': row['identifier'],
+            'qrcode': self.qrcode_url(row['qrcode']),
+            'url': row['url'],
+            'introduction': row['introduction'],
+        }
+
+
 class RetrieveSpreadSerializer(BaseSpreadSerializer):
     content_object_label = serializers.CharField()
     content_object_uuid = serializers.URLField()
 
     class Meta(BaseSpreadSerializer.Meta):
         fields = '__all__'
+        prefetch_hints = ('content_object__product',)
 
 
 class RetrievePublicSpreadSerializer(BaseSpreadSerializer):
@@ -55,11 +90,13 @@ class RetrievePublicSpreadSerializer(BaseSpreadSerializer):
             'product',
             'introduction'
         )
+        prefetch_hints = ('content_object__product',
+                          'content_object__rewards',)
 
     def get_rewards(self, instance):
-        try:
-            fragment = instance.fragment.first()
-        except ObjectDoesNotExist:
+        # use content_object, it was prefetched
+        fragment = instance.content_object
+        if not isinstance(fragment, Fragment):
             return None
 
         rewards = fragment.rewards.all()
@@ -10,18 +10,24 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateSpreadSerializer,
     ListSpreadSerializer,
+    ListSpreadProjection,
     RetrieveSpreadSerializer,
     RetrievePublicSpreadSerializer,
     UpdateSpreadSerializer
 )
 from ....helpers import build_result_pagination
+from ... import projection
+from ...conditional import conditional
+from ...prefetch import PrefetchPlan
+from ...renderers import FAST_RENDERER_CLASSES
+from ....versions import Resource
 
 Spread = apps.get_registered_model('feeder', 'Spread')
 
@@ -29,6 +35,15 @@ Spread = apps.get_registered_model('feeder', 'Spread')
 _PAGINATOR = LimitOffsetPagination()
 
 
+def is_private_retrieve(request, uuid=None, **kwargs):
+    # public retrieve use identifier, not scoped to one owner
+    try:
+        UUID(uuid)
+    except (TypeError, ValueError):
+        return False
+    return True
+
+
 class BaseViewSet(viewsets.ViewSet):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
@@ -70,7 +85,8 @@ class SpreadViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle, AnonRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
+    renderer_classes = FAST_RENDERER_CLASSES
     permission_action = {
         'retrieve': (AllowAny,),
     }
@@ -89,7 +105,6 @@ class SpreadViewSet(BaseViewSet):
 
     def queryset(self):
         return Spread.objects \
-            .prefetch_related('content_type', 'content_object') \
             .select_related('content_type') \
             .filter(
                 Q(fragment__user_id=self.request.user.id)
@@ -99,17 +114,29 @@ class SpreadViewSet(BaseViewSet):
     def queryset_instance(self, uuid, for_update=False):
         try:
             if for_update:
+                # lock only, update response not the retrieve one
                 return self.queryset().select_for_update().get(uuid=uuid)
-            return self.queryset().get(uuid=uuid)
+
+            plan = PrefetchPlan.for_serializer(RetrieveSpreadSerializer)
+            instance = plan.apply(self.queryset()).get(uuid=uuid)
         except ObjectDoesNotExist:
             raise NotFound()
 
+        plan.prefetch([instance])
+        return instance
+
     def queryset_public_instance(self, identifier):
+        plan = PrefetchPlan.for_serializer(RetrievePublicSpreadSerializer)
+        queryset = plan.apply(self.queryset())
+
         try:
-            return self.queryset().get(identifier=identifier)
+            instance = queryset.get(identifier=identifier)
         except ObjectDoesNotExist:
             raise NotFound()
 
+        plan.prefetch([instance])
+        return instance
+
     @transaction.atomic
     def create(self, request, format=None):
         serializer = CreateSpreadSerializer(
@@ -153,8 +180,8 @@ class SpreadViewSet(BaseViewSet):
         # copy for response
         instance_copy = copy(instance)
 
-        # run delete
-        instance.delete()
+        # hidden now, dependents purged in background
+        instance.soft_delete()
 
         # return object
         serializer = RetrieveSpreadSerializer(
@@ -163,6 +190,7 @@ class SpreadViewSet(BaseViewSet):
         )
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.SPREAD)
     def list(self, request, format=None):
         queryset = self.queryset()
         fragment = request.query_params.get('fragment', None)
@@ -195,16 +223,27 @@ class SpreadViewSet(BaseViewSet):
                 'param': str(e)
             })
 
-        paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = ListSpreadSerializer(
-            paginator,
-            context=self.context,
-            many=True
-        )
+        if projection.is_enabled('spread'):
+            paginator = _PAGINATOR.paginate_queryset(
+                ListSpreadProjection.values(queryset),
+                request
+            )
+            serializer = ListSpreadProjection(paginator, context=self.context)
+        else:
+            plan = PrefetchPlan.for_serializer(ListSpreadSerializer)
+            paginator = _PAGINATOR.paginate_queryset(plan.apply(queryset), request)
+            plan.prefetch(paginator)
+
+            serializer = ListSpreadSerializer(
+                paginator,
+                context=self.context,
+                many=True
+            )
 
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.SPREAD, when=is_private_retrieve)
     def retrieve(self, request, uuid=None, format=None):
         valid_uuid = True
         try:
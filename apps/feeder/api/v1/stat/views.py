@@ -1,18 +1,51 @@
+import datetime
+
+from collections import Counter
+
 from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
 from django.db.models import Count
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework.views import APIView
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from ...conditional import conditional
+from .... import rollups
+from ....conf import settings
+from ....versions import Resource
+
 Listing = apps.get_registered_model('feeder', 'Listing')
 Suggest = apps.get_registered_model('feeder', 'Suggest')
 Redeem = apps.get_registered_model('feeder', 'Redeem')
+Rollup = apps.get_registered_model('feeder', 'Rollup')
+
+
+def rollup_representation(row):
+    count = row['suggest_count']
+    ratings = {str(r): row['rating_%s' % r] for r in range(1, 6)}
+    average = sum(int(r) * n for r, n in ratings.items()) / count if count else None
+
+    ret = {
+        'suggest_count': count,
+        'rating': ratings,
+        'rating_average': round(average, 2) if average is not None else None,
+        'coupon_issued': row['coupon_issued'],
+        'coupon_redeemed': row['coupon_redeemed'],
+    }
+
+    if 'day' in row:
+        ret = {'day': row['day'], **ret}
+    return ret
 
 
 class StatAPIView(APIView):
     permission_classes = (IsAuthenticated,)
 
+    @conditional(Resource.STAT)
     def get(self, request, format=None):
         listing = Listing.objects \
             .prefetch_related('user', 'products') \
@@ -43,3 +76,56 @@ class StatAPIView(APIView):
                 'redeem_accepted': redeem.filter(takens__isnull=False).count(),
             }
         })
+
+
+class RollupAPIView(APIView):
+    """
+    GET
+    -----
+        Daily suggest and coupon counters of owned object
+
+        .../stats/rollups/?scope=<spread,fragment,product,listing>&uuid=uuid4&since=2021-09-01&until=2021-09-30
+    """
+    permission_classes = (IsAuthenticated,)
+
+    def get(self, request, format=None):
+        scope = request.query_params.get('scope', None)
+        uuid = request.query_params.get('uuid', None)
+
+        if scope not in Rollup.Scope.values:
+            raise ValidationError(detail=_("Invalid scope."))
+
+        try:
+            until = request.query_params.get('until', None)
+            until = datetime.date.fromisoformat(until) if until else timezone.localdate()
+
+            since = request.query_params.get('since', None)
+            since = datetime.date.fromisoformat(since) if since \
+                else until - datetime.timedelta(days=29)
+        except ValueError:
+            raise ValidationError(detail=_("Date must be YYYY-MM-DD."))
+
+        if since > until or (until - since).days >= settings.FEEDER_ROLLUP_MAX_DAYS:
+            raise ValidationError(detail=_("Invalid date range."))
+
+        model = apps.get_registered_model('feeder', scope)
+        try:
+            object_id = model.objects.values_list('id', flat=True).get(uuid=uuid)
+        except (ObjectDoesNotExist, DjangoValidationError):
+            raise NotFound()
+
+        results = list()
+        total = Counter()
+
+        for row in rollups.series(scope, object_id, request.user.id, since, until):
+            total.update({k: row[k] for k in rollups.COUNTERS})
+            results.append(rollup_representation(row))
+
+        return Response({
+            'scope': scope,
+            'uuid': uuid,
+            'since': since,
+            'until': until,
+            'total': rollup_representation(total),
+            'results': results,
+        })
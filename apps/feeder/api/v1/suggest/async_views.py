@@ -0,0 +1,79 @@
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import transaction
+
+from rest_framework.exceptions import APIException, Throttled, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework.views import exception_handler
+
+from api import idempotency
+from api.throttling import SlidingWindowThrottle
+from .serializers import CreateSuggestSerializer
+from .views import SuggestViewSet
+from ... import aio
+
+_suggest_list = SuggestViewSet.as_view({'get': 'list', 'post': 'create'})
+
+
+def create_suggest(request):
+    """
+    SuggestViewSet.create without the viewset, return (status, data,
+    wait) with wait seconds when throttled. Authentication and the
+    viewset throttle_limits (spread, canal, user) run here, they read
+    the database and the payload. Idempotency-Key shared with the viewset.
+    """
+    drf_request = Request(
+        request,
+        parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES],
+        authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    )
+    context = {'request': drf_request}
+    view = SuggestViewSet(action='create', request=drf_request, format_kwarg=None)
+    throttle = SlidingWindowThrottle()
+
+    def create():
+        with transaction.atomic():
+            serializer = CreateSuggestSerializer(data=drf_request.data, context=context)
+            serializer.is_valid(raise_exception=True)
+
+            try:
+                serializer.save()
+            except DjangoValidationError as e:
+                raise ValidationError(detail=str(e))
+            return 201, serializer.data
+
+    try:
+        if not throttle.allow_request(drf_request, view):
+            raise Throttled(throttle.wait())
+
+        status, data, _replayed = idempotency.execute(
+            drf_request, 'suggest', drf_request.user.id, create
+        )
+        return status, data, None
+    except Throttled as e:
+        return e.status_code, None, e.wait
+    except APIException as e:
+        response = exception_handler(e, context)
+        return response.status_code, response.data, None
+
+
+async def suggest_view(request):
+    """
+    POST
+    -----
+        Same as ../suggests/ of SuggestViewSet, other method
+        served by the viewset
+    """
+    if request.method != 'POST':
+        return await sync_to_async(_suggest_list)(request)
+
+    # throttled in create_suggest with the viewset limits, no pre-check
+    status, data, wait = await aio.run_orm(create_suggest, request)
+    if wait:
+        return aio.throttled_response(wait)
+    return aio.json_response(data, status=status)
+
+
+# token authenticated like DRF view
+suggest_view.csrf_exempt = True
@@ -5,10 +5,14 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.apps import apps
 
+from django.contrib.contenttypes.models import ContentType
+
 from rest_framework import serializers
 from apps.feeder.utils import censor_email, censor_msisdn
 from apps.feeder.validators import validate_msisdn
 
+from ...projection import Permalink, Projection
+
 Spread = apps.get_registered_model('feeder', 'Spread')
 Suggest = apps.get_registered_model('feeder', 'Suggest')
 Canal = apps.get_registered_model('feeder', 'Canal')
@@ -33,14 +37,17 @@ class ListCanalSerializer(BaseCanalSerializer):
         fields = ('method', 'value',)
 
     def get_value(self, instance):
-        method = instance.Method
-        try:
-            if instance.method != method.EMAIL:
-                return censor_msisdn(instance.value)
-            else:
-                return censor_email(instance.value)
-        except Exception:
-            return None
+        return censor_canal_value(instance.method, instance.value)
+
+
+def censor_canal_value(method, value):
+    try:
+        if method != Canal.Method.EMAIL:
+            return censor_msisdn(value)
+        else:
+            return censor_email(value)
+    except Exception:
+        return None
 
 
 class CreateCanalSerializer(BaseCanalSerializer):
@@ -95,7 +102,7 @@ class _CouponsPublicSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Coupon
-        fields = ('identifier', 'is_active', 'is_used', 'reward', )
+        fields = ('identifier', 'state', 'is_active', 'is_used', 'reward', )
 
 
 class ListSuggestSerializer(BaseSuggestSerializer):
@@ -110,6 +117,9 @@ class ListSuggestSerializer(BaseSuggestSerializer):
     class Meta(BaseSuggestSerializer.Meta):
         fields = ('permalink', 'uuid', 'rating', 'description',
                   'canals', 'product_label', 'count_interaction',)
+        # read by method field and to_representation
+        prefetch_hints = ('user', 'spread__content_object__product',
+                          'coupons__reward',)
 
     def get_product_label(self, instance):
         return instance.spread.product('label')
@@ -264,3 +274,96 @@ class UpdateSuggestSerializer(BaseSuggestSerializer):
     def to_representation(self, instance):
         serializer = RetrieveSuggestSerializer(instance, context=self.context)
         return serializer.data
+
+
+"""
+PROJECTION
+"""
+
+
+class ListSuggestProjection(Projection):
+    """Same output as ListSuggestSerializer"""
+    fields = ('id', 'uuid', 'rating', 'description', 'user_id',
+              'spread__content_type_id', 'spread__object_id',
+              'count_interaction',)
+    permalink = Permalink('feeder_api:suggest-detail')
+
+    coupon_fields = ('suggest_id', 'identifier', 'state', 'is_active',
+                     'is_used', 'reward_id',)
+    reward_fields = _RewardPublicSerializer.Meta.fields
+
+    def prepare(self, rows):
+        ids = [row['id'] for row in rows]
+
+        self.canals = dict()
+        canals = Canal.objects \
+            .filter(suggest_id__in=ids) \
+            .values_list('suggest_id', 'method', 'value')
+
+        for suggest_id, method, value in canals:
+            self.canals.setdefault(suggest_id, []).append({
+                'method': method,
+                'value': censor_canal_value(method, value)
+            })
+
+        # product label from spread content object, per content type
+        self.product_labels = dict()
+        objects = dict()
+        for row in rows:
+            objects.setdefault(row['spread__content_type_id'], set()) \
+                .add(row['spread__object_id'])
+
+        for content_type_id, object_ids in objects.items():
+            model = ContentType.objects.get_for_id(content_type_id).model_class()
+            labels = model._default_manager \
+                .filter(id__in=object_ids) \
+                .values_list('id', 'product__label')
+
+            for object_id, label in labels:
+                self.product_labels[(content_type_id, str(object_id))] = label
+
+        # only suggester can see coupons
+        self.coupons = dict()
+        self.suggester_ids = set()
+        user = getattr(self.request, 'user', None)
+
+        if user and user.is_authenticated:
+            self.suggester_ids = set(
+                row['id'] for row in rows if row['user_id'] == user.id
+            )
+            reward_values = ['reward__%s' % f for f in self.reward_fields]
+            coupons = Coupon.objects \
+                .filter(suggest_id__in=self.suggester_ids) \
+                .values(*self.coupon_fields, *reward_values)
+
+            for coupon in coupons:
+                reward = None
+                if coupon['reward_id'] is not None:
+                    reward = {
+                        f: coupon['reward__%s' % f] for f in self.reward_fields
+                    }
+
+                self.coupons.setdefault(coupon['suggest_id'], []).append({
+                    'identifier': coupon['identifier'],
+                    'state': coupon['state'],
+                    'is_active': coupon['is_active'],
+                    'is_used': coupon['is_used'],
+                    'reward': reward,
+                })
+
+    def to_representation(self, row):
+        ret = {
+            'permalink': self.link.format(row['uuid']),
+            'uuid': str(row['uuid']),
+            'rating': row['rating'],
+            'description': row['description'],
+            'canals': self.canals.get(row['id'], []),
+            'product_label': self.product_labels.get(
+                (row['spread__content_type_id'], row['spread__object_id'])
+            ),
+            'count_interaction': row['count_interaction'],
+        }
+
+        if row['id'] in self.suggester_ids:
+            ret['coupons'] = self.coupons.get(row['id'], [])
+        return ret
@@ -4,22 +4,32 @@ from django.db import transaction
 from django.db.models import Count, Q
 from django.apps import apps
 from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
+from django.http import StreamingHttpResponse
 from django.utils.translation import gettext_lazy as _
 
 from rest_framework import viewsets, status as response_status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.throttling import AnonRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.idempotency import idempotent
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateSuggestSerializer,
     ListSuggestSerializer,
+    ListSuggestProjection,
     RetrieveSuggestSerializer,
     UpdateSuggestSerializer
 )
 from ....helpers import build_result_pagination
+from .... import exports
+from ... import projection
+from ...conditional import conditional
+from ...prefetch import PrefetchPlan
+from ...renderers import FAST_RENDERER_CLASSES
+from ....versions import Resource
 
 Suggest = apps.get_registered_model('feeder', 'Suggest')
 
@@ -27,6 +37,11 @@ Suggest = apps.get_registered_model('feeder', 'Suggest')
 _PAGINATOR = LimitOffsetPagination()
 
 
+def is_private_list(request, **kwargs):
+    # public list matched by canal, not scoped to one owner
+    return request.query_params.get('permit', 'private') == 'private'
+
+
 class BaseViewSet(viewsets.ViewSet):
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
@@ -44,6 +59,10 @@ class SuggestViewSet(BaseViewSet):
 
         .../suggests/?product=uuid4&fragment=uuid4&canal=<msisdn,email,telegram,whatsapp>&rating=<1-5>&permit=<public,private>
 
+        Streamed export, resume with cursor of the last received row
+
+        .../suggests/export/?output=<csv,ndjson>&cursor=<int>&product=uuid4&fragment=uuid4&rating=<1-5>
+
 
     POST & PATCH
     -----
@@ -63,7 +82,16 @@ class SuggestViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (AnonRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
+    throttle_limits = {
+        'create': (
+            ('ip', 'suggest_ip'),
+            ('user', 'suggest_user'),
+            ('spread', 'suggest_spread'),
+            ('canal', 'suggest_canal'),
+        ),
+    }
+    renderer_classes = FAST_RENDERER_CLASSES
     permission_action = {
         'create': (AllowAny,),
     }
@@ -82,20 +110,25 @@ class SuggestViewSet(BaseViewSet):
 
     def queryset(self):
         return Suggest.objects \
-            .prefetch_related('user', 'spread', 'spread__content_object', 'canals',
-                              'coupons', 'coupons__reward', 'interactions') \
             .select_related('user', 'spread') \
             .annotate(count_interaction=Count('interactions'))
 
     def queryset_instance(self, uuid, for_update=False):
         try:
             if for_update:
+                # lock only, update response not the retrieve one
                 return self.queryset().select_for_update() \
                     .get(uuid=uuid, user_id=self.request.user.id)
-            return self.queryset().get(uuid=uuid)
+
+            plan = PrefetchPlan.for_serializer(RetrieveSuggestSerializer)
+            instance = plan.apply(self.queryset()).get(uuid=uuid)
         except ObjectDoesNotExist:
             raise NotFound()
 
+        plan.prefetch([instance])
+        return instance
+
+    @idempotent('suggest')
     @transaction.atomic
     def create(self, request, format=None):
         serializer = CreateSuggestSerializer(
@@ -140,8 +173,8 @@ class SuggestViewSet(BaseViewSet):
         # copy for response
         instance_copy = copy(instance)
 
-        # run delete
-        instance.delete()
+        # hidden now, dependents purged in background
+        instance.soft_delete()
 
         # return object
         serializer = RetrieveSuggestSerializer(
@@ -150,6 +183,7 @@ class SuggestViewSet(BaseViewSet):
         )
         return Response(serializer.data, status=response_status.HTTP_200_OK)
 
+    @conditional(Resource.SUGGEST, when=is_private_list)
     def list(self, request, format=None):
         permit = request.query_params.get('permit', 'private')
         canal = request.query_params.get('canal', None)
@@ -217,16 +251,49 @@ class SuggestViewSet(BaseViewSet):
                 .order_by('-create_at') \
                 .distinct()
 
-        paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = ListSuggestSerializer(
-            paginator,
-            context=self.context,
-            many=True
-        )
+        if projection.is_enabled('suggest'):
+            paginator = _PAGINATOR.paginate_queryset(
+                ListSuggestProjection.values(queryset),
+                request
+            )
+            serializer = ListSuggestProjection(paginator, context=self.context)
+        else:
+            plan = PrefetchPlan.for_serializer(ListSuggestSerializer)
+            paginator = _PAGINATOR.paginate_queryset(plan.apply(queryset), request)
+            plan.prefetch(paginator)
+
+            serializer = ListSuggestSerializer(
+                paginator,
+                context=self.context,
+                many=True
+            )
 
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
 
+    @action(methods=['GET'], detail=False, url_name='export', url_path='export')
+    def export(self, request, format=None):
+        output = request.query_params.get('output', 'csv')
+        cursor = request.query_params.get('cursor', None)
+
+        if output not in exports.OUTPUTS:
+            raise ValidationError(detail=_("Output must be csv or ndjson."))
+
+        if cursor and not cursor.isdigit():
+            raise ValidationError(detail=_("Invalid cursor."))
+
+        try:
+            filters = exports.clean_filters(request.query_params)
+        except ValueError as e:
+            raise ValidationError(detail=str(e))
+
+        rows = exports.suggest_rows(request.user.id, filters=filters, cursor=cursor)
+
+        writer, content_type, extension = exports.OUTPUTS[output]
+        response = StreamingHttpResponse(writer(rows), content_type=content_type)
+        response['Content-Disposition'] = 'attachment; filename="suggests.%s"' % extension
+        return response
+
     def retrieve(self, request, uuid=None, format=None):
         instance = self.queryset_instance(uuid)
         serializer = RetrieveSuggestSerializer(instance, context=self.context)
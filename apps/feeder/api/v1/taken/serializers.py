@@ -50,10 +50,13 @@ class CreateTakenSerializer(BaseTakenSerializer):
 
     @transaction.atomic
     def create(self, validated_data):
-        instance, _created = self.Meta.model.objects \
-            .get_or_create(**validated_data)
+        instance = self.Meta.model(**validated_data)
 
-        if _created:
-            instance.mark_coupon_used()
+        # compare and set, only one of concurrent request take the coupon
+        if not instance.mark_coupon_used():
+            raise serializers.ValidationError({
+                'redeem': _("Coupon already taken or not redeemable.")
+            })
 
+        instance.save()
         return instance
@@ -8,10 +8,10 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateTakenSerializer,
     ListTakenSerializer,
@@ -54,7 +54,7 @@ class TakenViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def queryset(self):
         return Taken.objects \
@@ -96,7 +96,8 @@ class TakenViewSet(BaseViewSet):
         # copy for response
         instance_copy = copy(instance)
 
-        # run delete
+        # run delete, coupon can be taken again
+        instance.release_coupon()
         instance.delete()
 
         # return object
@@ -7,6 +7,8 @@ from django.apps import apps
 
 from rest_framework import serializers
 
+from ...projection import Permalink, Projection
+
 Broadcast = apps.get_registered_model('feeder', 'Broadcast')
 Suggest = apps.get_registered_model('feeder', 'Suggest')
 Target = apps.get_registered_model('feeder', 'Target')
@@ -70,3 +72,15 @@ class CreateTargetSerializer(BaseTargetSerializer):
             context=self.context
         )
         return serializer.data
+
+
+class ListTargetProjection(Projection):
+    """Same output as ListTargetSerializer"""
+    fields = ('uuid',)
+    permalink = Permalink('feeder_api:target-detail')
+
+    def to_representation(self, row):
+        return {
+            'permalink': self.link.format(row['uuid']),
+            'uuid': str(row['uuid']),
+        }
@@ -9,16 +9,19 @@ from django.utils.translation import gettext_lazy as _
 from rest_framework import viewsets, status as response_status
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
-from rest_framework.throttling import UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.pagination import LimitOffsetPagination
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateTargetSerializer,
     ListTargetSerializer,
+    ListTargetProjection,
     RetrieveTargetSerializer
 )
 from ....helpers import build_result_pagination
+from ... import projection
+from ...renderers import FAST_RENDERER_CLASSES
 
 Target = apps.get_registered_model('feeder', 'Target')
 
@@ -57,7 +60,8 @@ class TargetViewSet(BaseViewSet):
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
-    throttle_classes = (UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
+    renderer_classes = FAST_RENDERER_CLASSES
 
     def queryset(self):
         return Target.objects \
@@ -143,12 +147,19 @@ class TargetViewSet(BaseViewSet):
             except Exception:
                 pass
 
-        paginator = _PAGINATOR.paginate_queryset(queryset, request)
-        serializer = ListTargetSerializer(
-            paginator,
-            context=self.context,
-            many=True
-        )
+        if projection.is_enabled('target'):
+            paginator = _PAGINATOR.paginate_queryset(
+                ListTargetProjection.values(queryset),
+                request
+            )
+            serializer = ListTargetProjection(paginator, context=self.context)
+        else:
+            paginator = _PAGINATOR.paginate_queryset(queryset, request)
+            serializer = ListTargetSerializer(
+                paginator,
+                context=self.context,
+                many=True
+            )
 
         results = build_result_pagination(self, _PAGINATOR, serializer)
         return Response(results, status=response_status.HTTP_200_OK)
@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
 
 class FeederConfig(AppConfig):
@@ -9,10 +9,75 @@ class FeederConfig(AppConfig):
 
     def ready(self):
         from django.conf import settings
-        from .signals import suggest_save_handler
+        from .signals import (
+            suggest_save_handler,
+            coupon_delete_handler,
+            msisdn_verified_handler,
+            spread_public_handler,
+            suggest_rollup_save_handler,
+            suggest_rollup_delete_handler,
+            coupon_rollup_handler,
+            redeem_rollup_handler,
+            version_bump_handler,
+            change_handler,
+            VERSION_RESOURCES
+        )
+        from .changes import RESOURCES
+        from . import metrics
 
         Suggest = self.get_model('Suggest')
+        Coupon = self.get_model('Coupon')
+        Redeem = self.get_model('Redeem')
+        Spread = self.get_model('Spread')
 
         # Suggest
         post_save.connect(suggest_save_handler, sender=Suggest,
                           dispatch_uid='suggest_save_signal')
+
+        # Coupon, issued one activated when suggester verified
+        post_save.connect(msisdn_verified_handler, sender=settings.AUTH_USER_MODEL,
+                          dispatch_uid='msisdn_verified_signal')
+
+        # Coupon, state change forgotten by transition
+        post_delete.connect(coupon_delete_handler, sender=Coupon,
+                            dispatch_uid='coupon_delete_signal')
+
+        # Spread, cached public retrieve of async view
+        post_save.connect(spread_public_handler, sender=Spread,
+                          dispatch_uid='spread_public_save_signal')
+        post_delete.connect(spread_public_handler, sender=Spread,
+                            dispatch_uid='spread_public_delete_signal')
+
+        # Daily rollup
+        post_save.connect(suggest_rollup_save_handler, sender=Suggest,
+                          dispatch_uid='suggest_rollup_save_signal')
+        post_delete.connect(suggest_rollup_delete_handler, sender=Suggest,
+                            dispatch_uid='suggest_rollup_delete_signal')
+
+        for model, handler in ((Coupon, coupon_rollup_handler),
+                               (Redeem, redeem_rollup_handler)):
+            name = model._meta.model_name
+            post_save.connect(handler, sender=model,
+                              dispatch_uid='%s_rollup_save_signal' % name)
+            post_delete.connect(handler, sender=model,
+                                dispatch_uid='%s_rollup_delete_signal' % name)
+
+        # Data version for conditional GET
+        for model_name in VERSION_RESOURCES:
+            model = self.get_model(model_name)
+            post_save.connect(version_bump_handler, sender=model,
+                              dispatch_uid='%s_version_save_signal' % model_name)
+            post_delete.connect(version_bump_handler, sender=model,
+                                dispatch_uid='%s_version_delete_signal' % model_name)
+
+        # Change log for delta sync feed
+        for model_name in RESOURCES:
+            model = self.get_model(model_name)
+            post_save.connect(change_handler, sender=model,
+                              dispatch_uid='%s_change_save_signal' % model_name)
+            post_delete.connect(change_handler, sender=model,
+                                dispatch_uid='%s_change_delete_signal' % model_name)
+
+        # time serializer and signal for MetricsMiddleware
+        if settings.FEEDER_METRICS_ENABLED:
+            metrics.install()
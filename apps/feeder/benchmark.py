@@ -0,0 +1,365 @@
+import gc
+import json
+import time
+import tracemalloc
+import uuid
+
+from unittest import mock
+
+from django.apps import apps
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse, NoReverseMatch
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.views import APIView
+
+Listing = apps.get_registered_model('feeder', 'Listing')
+Spread = apps.get_registered_model('feeder', 'Spread')
+Target = apps.get_registered_model('feeder', 'Target')
+
+# Metrics compared against baseline, lower is better
+COMPARED_METRICS = ('p50', 'p95', 'p99', 'queries', 'peak_kb')
+
+
+def percentile(values, percent):
+    """Nearest rank percentile, values must sorted"""
+    if not values:
+        return 0
+    index = max(0, int(round(percent / 100.0 * len(values) + 0.5)) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+class Skip(Exception):
+    pass
+
+
+class Failed(Exception):
+    """Endpoint answered another status than the scenario expect"""
+
+
+class Scenario:
+    """
+    One endpoint call, `request` return (method, path, data, user)
+    for each iteration. User None mean anonymous.
+    """
+    name = None
+    status = 200
+
+    def __init__(self, fixtures):
+        self.fixtures = fixtures
+
+    def request(self, iteration):
+        raise NotImplementedError
+
+
+class SuggestCreateScenario(Scenario):
+    name = 'suggest_create'
+    status = 201
+
+    def request(self, iteration):
+        spread = self.fixtures['spread']
+        data = {
+            'spread': spread.identifier,
+            'rating': iteration % 5 + 1,
+            'description': 'Benchmark suggest %s' % iteration,
+            # unique canal, else rejected by validation
+            'canals': [
+                {'method': 'email', 'value': '%s@bench.local' % uuid.uuid4().hex}
+            ]
+        }
+        return 'post', reverse('feeder_api:suggest-list'), data, None
+
+
+class SpreadPublicRetrieveScenario(Scenario):
+    name = 'spread_public_retrieve'
+
+    def request(self, iteration):
+        spread = self.fixtures['spread']
+        path = reverse('feeder_api:spread-detail',
+                       kwargs={'uuid': spread.identifier})
+        return 'get', path, None, None
+
+
+class SuggestOwnerListScenario(Scenario):
+    name = 'suggest_owner_list'
+
+    def request(self, iteration):
+        path = reverse('feeder_api:suggest-list')
+        return 'get', path, None, self.fixtures['owner']
+
+
+class StatScenario(Scenario):
+    name = 'stat'
+
+    def request(self, iteration):
+        return 'get', reverse('feeder_api:stat'), None, self.fixtures['owner']
+
+
+class NotificationListScenario(Scenario):
+    name = 'notification_list'
+
+    def request(self, iteration):
+        try:
+            path = reverse('notifier_api:notification-list')
+        except NoReverseMatch:
+            raise Skip("notifier api not routed")
+        return 'get', path, None, self.fixtures['owner']
+
+
+SCENARIOS = (
+    SuggestCreateScenario,
+    SpreadPublicRetrieveScenario,
+    SuggestOwnerListScenario,
+    StatScenario,
+    NotificationListScenario,
+)
+
+
+def get_fixtures():
+    """
+    Pick the busiest owner from seeded data and one of their
+    fragment spread. Run `seed_feeder` first.
+    """
+    listing = Listing.objects \
+        .annotate(total=Count('fragments__spreads__suggests')) \
+        .select_related('user') \
+        .order_by('-total') \
+        .first()
+
+    if listing is None:
+        return None
+
+    spread = Spread.objects \
+        .filter(fragment__listing_id=listing.id) \
+        .first()
+
+    if spread is None:
+        return None
+
+    return {'owner': listing.user, 'spread': spread}
+
+
+def run_scenario(scenario, iterations=50, warmup=5, using=DEFAULT_DB_ALIAS):
+    """
+    Call the endpoint in-process through the full django stack and
+    record latency of each call. Query count and peak memory taken by
+    one more call after, tracing would inflate the timings.
+    """
+    client = APIClient()
+    connection = connections[using]
+    timings = list()
+
+    def call(iteration):
+        method, path, data, user = scenario.request(iteration)
+        client.force_authenticate(user)
+
+        start = time.perf_counter()
+        response = getattr(client, method)(path, data, format='json')
+        elapsed = time.perf_counter() - start
+
+        if response.status_code != scenario.status:
+            # ie: 400 from ALLOWED_HOSTS, timing of an error page
+            raise Failed("%s %s returned %s, expected %s: %s" % (
+                method.upper(), path, response.status_code, scenario.status,
+                ' '.join(response.content[:200].decode('utf-8', 'replace').split())
+            ))
+        return elapsed
+
+    for iteration in range(warmup + iterations):
+        elapsed = call(iteration)
+        if iteration >= warmup:
+            timings.append(elapsed * 1000)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as captured:
+            call(warmup + iterations)
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'status': [scenario.status],
+        'p50': round(percentile(timings, 50), 2),
+        'p95': round(percentile(timings, 95), 2),
+        'p99': round(percentile(timings, 99), 2),
+        'queries': len(captured.captured_queries),
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def run(names=None, iterations=50, warmup=5, throttle=False, response_cache=False):
+    """
+    Run scenarios and return {name: result}, skipped scenario
+    has `skipped` key with the reason, failed one `failed`.
+    Conditional response cache disabled unless response_cache,
+    else owner scenarios only measure cache hits.
+    """
+    fixtures = get_fixtures()
+    if fixtures is None:
+        raise Skip("No seeded data, run seed_feeder first")
+
+    results = dict()
+    patcher = mock.patch.object(APIView, 'check_throttles', lambda *args: None)
+    no_cache = override_settings(FEEDER_CONDITIONAL_CACHE_TIMEOUT=0)
+
+    if not throttle:
+        patcher.start()
+    if not response_cache:
+        no_cache.enable()
+
+    try:
+        for scenario_class in SCENARIOS:
+            if names and scenario_class.name not in names:
+                continue
+
+            scenario = scenario_class(fixtures)
+            try:
+                results[scenario.name] = run_scenario(
+                    scenario,
+                    iterations=iterations,
+                    warmup=warmup
+                )
+            except Skip as e:
+                results[scenario.name] = {'skipped': str(e)}
+            except Failed as e:
+                results[scenario.name] = {'failed': str(e)}
+    finally:
+        if not throttle:
+            patcher.stop()
+        if not response_cache:
+            no_cache.disable()
+
+    return results
+
+
+def serializer_pairs(owner):
+    """
+    (name, queryset, serializer, projection) for owner, queryset
+    taken from the viewset so both path read same rows
+    """
+    from .api.v1.redeem.views import RedeemViewSet
+    from .api.v1.redeem.serializers import ListRedeemSerializer, ListRedeemProjection
+    from .api.v1.spread.views import SpreadViewSet
+    from .api.v1.spread.serializers import ListSpreadSerializer, ListSpreadProjection
+    from .api.v1.suggest.views import SuggestViewSet
+    from .api.v1.suggest.serializers import ListSuggestSerializer, ListSuggestProjection
+    from .api.v1.target.serializers import ListTargetSerializer, ListTargetProjection
+
+    request = Request(APIRequestFactory().get('/'))
+    request.user = owner
+
+    def view(viewset_class):
+        viewset = viewset_class()
+        viewset.request = request
+        return viewset
+
+    suggests = view(SuggestViewSet).queryset() \
+        .filter(spread__fragment__listing__user_id=owner.id) \
+        .order_by('-create_at')
+
+    return request, (
+        ('suggest', suggests, ListSuggestSerializer, ListSuggestProjection),
+        ('spread', view(SpreadViewSet).queryset(),
+         ListSpreadSerializer, ListSpreadProjection),
+        ('target', Target.objects.filter(broadcast__user_id=owner.id),
+         ListTargetSerializer, ListTargetProjection),
+        ('redeem', view(RedeemViewSet).queryset(),
+         ListRedeemSerializer, ListRedeemProjection),
+    )
+
+
+def run_serializers(rows=100, iterations=20):
+    """
+    CPU time per row to fetch, serialize and render a page,
+    ModelSerializer + JSONRenderer against projection + FastJSONRenderer
+    """
+    from .api.prefetch import PrefetchPlan
+    from .api.renderers import FastJSONRenderer
+
+    fixtures = get_fixtures()
+    if fixtures is None:
+        raise Skip("No seeded data, run seed_feeder first")
+
+    request, pairs = serializer_pairs(fixtures['owner'])
+    context = {'request': request}
+    results = dict()
+
+    def serializer_path(queryset, serializer_class):
+        plan = PrefetchPlan.for_serializer(serializer_class)
+        page = list(plan.apply(queryset)[:rows])
+        plan.prefetch(page)
+        data = serializer_class(page, many=True, context=context).data
+        return len(page), JSONRenderer().render(data)
+
+    def projection_path(queryset, projection_class):
+        page = list(projection_class.values(queryset)[:rows])
+        data = projection_class(page, context=context).data
+        return len(page), FastJSONRenderer().render(data)
+
+    for name, queryset, serializer_class, projection_class in pairs:
+        timings = dict()
+
+        for label, func, klass in (('serializer', serializer_path, serializer_class),
+                                   ('projection', projection_path, projection_class)):
+            best = None
+            for _ in range(iterations):
+                start = time.process_time()
+                count, _content = func(queryset, klass)
+                elapsed = time.process_time() - start
+                best = elapsed if best is None else min(best, elapsed)
+            timings[label] = best / count * 1000000 if count else 0
+
+        results[name] = {
+            'rows': count,
+            'serializer_us': round(timings['serializer'], 1),
+            'projection_us': round(timings['projection'], 1),
+            'speedup': round(timings['serializer'] / timings['projection'], 1)
+            if timings['projection'] else None,
+        }
+
+    return results
+
+
+def compare(results, baseline, tolerance=0.2):
+    """
+    Return list of (name, metric, baseline, current) for metric
+    worse than baseline by more than tolerance (0.2 = 20%).
+    Query count compared exactly.
+    """
+    regressions = list()
+
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or 'skipped' in result or 'skipped' in base \
+                or 'failed' in result or 'failed' in base:
+            continue
+
+        for metric in COMPARED_METRICS:
+            current = result.get(metric)
+            previous = base.get(metric)
+            if current is None or previous is None:
+                continue
+
+            limit = previous if metric == 'queries' else previous * (1 + tolerance)
+            if current > limit:
+                regressions.append((name, metric, previous, current))
+
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, results):
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
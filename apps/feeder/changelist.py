@@ -0,0 +1,149 @@
+"""
+Admin for big tables. Count read from table statistics instead of
+COUNT(*), filtered count stop at FEEDER_ADMIN_COUNT_LIMIT, and pages
+walk by primary key (?before=<pk>) so deep page cost the same as the
+first one. Foreign key as raw id input, never a dropdown of the table.
+"""
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList, PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+from .conf import settings
+
+CURSOR_VAR = 'before'
+
+
+def estimate_count(model, using):
+    """Row count from table statistics, None when backend can't tell"""
+    connection = connections[using]
+    table = model._meta.db_table
+
+    if connection.vendor == 'mysql':
+        sql = "SELECT TABLE_ROWS FROM information_schema.TABLES " \
+              "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s"
+    elif connection.vendor == 'postgresql':
+        sql = "SELECT reltuples::bigint FROM pg_class WHERE relname = %s"
+    else:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [table])
+        row = cursor.fetchone()
+
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Unfiltered count estimated when the table is big, filtered count
+    exact up to FEEDER_ADMIN_COUNT_LIMIT, beyond it estimated and
+    capped (shown as "10000+")
+    """
+    is_estimated = False
+    is_capped = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        limit = settings.FEEDER_ADMIN_COUNT_LIMIT
+
+        if not queryset.query.where:
+            estimate = estimate_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                self.is_estimated = True
+                return estimate
+
+        # one more row tell whether the limit was hit
+        count = queryset.order_by()[:limit + 1].count()
+        if count > limit:
+            self.is_estimated = self.is_capped = True
+            return limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """Page read as pk < cursor ordered by -pk, no offset"""
+
+    def __init__(self, request, *args, **kwargs):
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.next_cursor = None
+        super().__init__(request, *args, **kwargs)
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_ordering(self, request, queryset):
+        return ['-pk']
+
+    def get_results(self, request):
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                queryset = queryset.filter(pk__lt=int(self.cursor))
+            except ValueError:
+                raise IncorrectLookupParameters
+
+        self.result_list = list(queryset[:self.list_per_page + 1])
+        if len(self.result_list) > self.list_per_page:
+            self.result_list = self.result_list[:self.list_per_page]
+            self.next_cursor = self.result_list[-1].pk
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.is_estimated = self.paginator.is_estimated
+        self.is_capped = self.paginator.is_capped
+        self.show_full_result_count = False
+        self.full_result_count = None
+        self.show_admin_actions = bool(self.result_list)
+        self.can_show_all = False
+        self.multi_page = False
+
+    @property
+    def is_keyset(self):
+        return True
+
+    @property
+    def first_url(self):
+        if not self.cursor:
+            return None
+        return self.get_query_string(remove=[CURSOR_VAR, PAGE_VAR])
+
+    @property
+    def next_url(self):
+        if self.next_cursor is None:
+            return None
+        return self.get_query_string({CURSOR_VAR: self.next_cursor}, [PAGE_VAR])
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for tables too big for offset paging and COUNT(*).
+    Foreign keys default to raw id, search only indexed lookups,
+    put joined columns of list_display in list_select_related.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    ordering = ('-pk',)
+    sortable_by = ()
+    list_select_related = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not self.raw_id_fields:
+            # every relation, dropdown would load the whole table
+            self.raw_id_fields = tuple(
+                field.name for field in self.opts.get_fields()
+                if (field.many_to_one or field.one_to_one or field.many_to_many)
+                and field.concrete and not field.auto_created
+                and field.name not in self.autocomplete_fields
+            )
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
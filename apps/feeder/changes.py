@@ -0,0 +1,189 @@
+"""
+Delta sync feed for dashboards. Save and delete of owner visible
+objects appended to Change by signals, one bulk insert per
+savepoint after commit. Client keep the returned cursor and ask
+again with it, in sync client cost one index probe.
+
+Concurrent transactions may commit in another order than their ids,
+feed only return rows older than FEEDER_CHANGE_SETTLE_SECONDS so a
+lower id never show up behind a cursor already handed out.
+"""
+import datetime
+import uuid
+
+from django.apps import apps
+from django.utils import timezone
+
+from .api.projection import datetime_representation
+from .conf import settings
+from .oncommit import Pending
+
+Change = apps.get_registered_model('feeder', 'Change')
+
+Action = Change.Action
+
+# resource: (model name, fields in data)
+RESOURCES = {
+    'listing': ('Listing', (
+        'label', 'description', 'create_at', 'update_at',
+    )),
+    'product': ('Product', (
+        'label', 'description', 'listing__uuid', 'create_at', 'update_at',
+    )),
+    'fragment': ('Fragment', (
+        'label', 'description', 'product__uuid', 'listing__uuid',
+        'start_at', 'expiry_at', 'create_at', 'update_at',
+    )),
+    'spread': ('Spread', (
+        'identifier', 'url', 'cause', 'introduction', 'allocation',
+        'fragment__uuid', 'broadcast__uuid', 'start_at', 'expiry_at',
+        'create_at', 'update_at',
+    )),
+    'reward': ('Reward', (
+        'label', 'description', 'term', 'type', 'amount', 'unit_slug',
+        'unit_label', 'allocation', 'fragment__uuid', 'broadcast__uuid',
+        'start_at', 'expiry_at', 'create_at', 'update_at',
+    )),
+    'suggest': ('Suggest', (
+        'rating', 'description', 'spread__identifier', 'create_at',
+        'update_at',
+    )),
+    'interaction': ('Interaction', (
+        'type', 'label', 'description', 'suggest__uuid', 'is_product_owner',
+        'create_at', 'update_at',
+    )),
+}
+
+
+class Expired(Exception):
+    """Cursor older than the retained log, client must resync"""
+
+
+def merge(previous, action):
+    # created then updated in one transaction still a create
+    if action == Action.DELETE or previous is None:
+        return action
+    return previous
+
+
+class _Pending(Pending):
+    """Changes of one savepoint, written once after commit"""
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.entries = dict()
+
+    def add(self, resource, object_uuid, action, owner_ids):
+        for owner_id in owner_ids:
+            key = (owner_id, resource, object_uuid)
+            self.entries[key] = merge(self.entries.get(key), action)
+
+    def __call__(self):
+        Change.objects.using(self.using).bulk_create([
+            Change(user_id=owner_id, resource=resource, object_uuid=object_uuid, action=action)
+            for (owner_id, resource, object_uuid), action in self.entries.items()
+        ])
+
+
+def record(resource, object_uuid, action, owner_ids, using=None):
+    """Queue change of object for every owner"""
+    owner_ids = set(i for i in owner_ids if i)
+    if owner_ids:
+        _Pending.record(resource, object_uuid, action, owner_ids, using=using)
+
+
+def to_json(value):
+    if isinstance(value, datetime.datetime):
+        return datetime_representation(value)
+    if isinstance(value, (uuid.UUID, datetime.date)):
+        return str(value)
+    return value
+
+
+def load(resource, uuids):
+    """Current data of alive objects, {uuid: data}"""
+    model_name, fields = RESOURCES[resource]
+    model = apps.get_registered_model('feeder', model_name)
+    rows = model.objects \
+        .filter(uuid__in=uuids) \
+        .order_by() \
+        .values('uuid', *fields)
+
+    return {
+        row.pop('uuid'): {k: to_json(v) for k, v in row.items()}
+        for row in rows
+    }
+
+
+def feed(owner_id, cursor=0, limit=None):
+    """
+    Return (results, cursor, more) of changes after cursor, latest
+    change per object with its current data (None when deleted).
+    Raise Expired when rows after cursor already pruned.
+    """
+    limit = min(limit or settings.FEEDER_CHANGE_PAGE_SIZE, settings.FEEDER_CHANGE_PAGE_SIZE)
+    settled = timezone.now() - datetime.timedelta(seconds=settings.FEEDER_CHANGE_SETTLE_SECONDS)
+
+    rows = list(
+        Change.objects
+        .filter(user_id=owner_id, id__gt=cursor, create_at__lt=settled)
+        .order_by('id')
+        .values_list('id', 'resource', 'object_uuid', 'action', 'create_at')[:limit + 1]
+    )
+
+    if cursor:
+        oldest = Change.objects.order_by('id').values_list('id', flat=True).first()
+        if oldest is not None and cursor < oldest - 1:
+            raise Expired()
+
+    more = len(rows) > limit
+    rows = rows[:limit]
+    if not rows:
+        return [], cursor, False
+
+    # latest change of each object only
+    latest = dict()
+    for seq, resource, object_uuid, action, create_at in rows:
+        latest[(resource, object_uuid)] = (seq, action, create_at)
+
+    wanted = dict()
+    for (resource, object_uuid), (_seq, action, _at) in latest.items():
+        if action != Action.DELETE:
+            wanted.setdefault(resource, []).append(object_uuid)
+
+    data = {
+        resource: load(resource, uuids) for resource, uuids in wanted.items()
+    }
+
+    results = list()
+    for (resource, object_uuid), (seq, action, create_at) in sorted(latest.items(), key=lambda item: item[1][0]):
+        current = data.get(resource, {}).get(object_uuid)
+        if current is None:
+            # deleted or soft deleted since
+            action = Action.DELETE
+
+        results.append({
+            'seq': seq,
+            'resource': resource,
+            'uuid': str(object_uuid),
+            'action': action,
+            'at': datetime_representation(create_at),
+            'data': current,
+        })
+    return results, rows[-1][0], more
+
+
+def prune(days=None, batch_size=1000):
+    """Delete log rows older than days by id batches, return count"""
+    days = days if days is not None else settings.FEEDER_CHANGE_RETENTION_DAYS
+    cutoff = timezone.now() - datetime.timedelta(days=days)
+    queryset = Change.objects.filter(create_at__lt=cutoff)
+    total = 0
+
+    while True:
+        ids = list(queryset.order_by('id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+
+        Change.objects.filter(id__in=ids).delete()
+        total += len(ids)
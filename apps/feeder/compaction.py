@@ -0,0 +1,223 @@
+"""
+Trim historical tables of every model tracked by simple_history
+(feeder, person, notifier).
+
+    :collapse   `~` record equal to the previous record of the same
+                object, only ignored fields (update_at) changed
+    :prune      record older than the retention of its model, written
+                to gzip NDJSON first when an archive dir given
+
+Rows deleted FEEDER_HISTORY_COMPACT_BATCH_SIZE at a time ordered by
+history_id, each batch in its own transaction, optionally limited
+to some rows per second so replicas and other writers keep up.
+"""
+import gzip
+import json
+import os
+import time
+
+from collections import Counter
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .conf import settings
+
+
+class Action:
+    COLLAPSE = 'collapse'
+    PRUNE = 'prune'
+
+
+class RateLimit:
+    """Sleep between batches so rows stay under rate per second"""
+
+    def __init__(self, rate=None):
+        self.rate = rate
+        self.start = time.monotonic()
+        self.rows = 0
+
+    def wait(self, rows):
+        if not self.rate:
+            return
+
+        self.rows += rows
+        ahead = self.rows / self.rate - (time.monotonic() - self.start)
+        if ahead > 0:
+            time.sleep(ahead)
+
+
+def historical_models(labels=None):
+    """[(model label, historical model)] of tracked models"""
+    ret = list()
+    for model in apps.get_models():
+        name = getattr(model._meta, 'simple_history_manager_attribute', None)
+        if not name or (labels and model._meta.label not in labels):
+            continue
+        ret.append((model._meta.label, getattr(model, name).model))
+    return ret
+
+
+def get_retention(label):
+    """Days kept for model label, None keep forever"""
+    retention = settings.FEEDER_HISTORY_RETENTION
+    return retention.get(label, settings.FEEDER_HISTORY_DEFAULT_RETENTION)
+
+
+def tracked_fields(history_model):
+    """Columns compared by collapse, history_* and ignored excluded"""
+    ignored = settings.FEEDER_HISTORY_IGNORE_FIELDS
+    return [
+        field.attname for field in history_model._meta.concrete_fields
+        if not field.name.startswith('history_') and field.name not in ignored
+    ]
+
+
+def _delete(history_model, ids, dry_run, limit):
+    if dry_run:
+        return
+
+    with transaction.atomic():
+        history_model._base_manager.filter(pk__in=ids).delete()
+    limit.wait(len(ids))
+
+
+def archive_path(archive_dir, label, started):
+    app_label, model_name = label.lower().split('.')
+    directory = os.path.join(archive_dir, app_label, model_name)
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, '%s.ndjson.gz' % started.strftime('%Y%m%d%H%M%S'))
+
+
+def archive(history_model, ids, path):
+    """
+    Append rows as one gzip member, on disk before the rows deleted.
+    Members concatenated still read as one file by gzip.
+    """
+    rows = history_model._base_manager \
+        .filter(pk__in=ids) \
+        .order_by('pk') \
+        .values()
+
+    with open(path, 'ab') as raw:
+        with gzip.GzipFile(fileobj=raw, mode='wb') as f:
+            for row in rows:
+                line = json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+                f.write(line.encode('utf-8'))
+
+        raw.flush()
+        os.fsync(raw.fileno())
+
+
+def collapse(label, history_model, batch_size, dry_run=False, limit=None, report=None):
+    """Remove no-op `~` records, return count"""
+    limit = limit or RateLimit()
+    key = history_model.instance_type._meta.pk.attname
+    fields = tracked_fields(history_model)
+    manager = history_model._base_manager
+
+    total = 0
+    last = None
+
+    while True:
+        # keyset over tracked objects, history of a batch read in order
+        objects = manager.order_by(key).values_list(key, flat=True).distinct()
+        if last is not None:
+            objects = objects.filter(**{'%s__gt' % key: last})
+
+        object_ids = list(objects[:batch_size])
+        if not object_ids:
+            return total
+        last = object_ids[-1]
+
+        rows = manager \
+            .filter(**{'%s__in' % key: object_ids}) \
+            .order_by(key, 'history_date', 'pk') \
+            .values_list('pk', 'history_type', *fields)
+
+        noop = list()
+        previous = None
+
+        for pk, history_type, *values in rows.iterator(chunk_size=batch_size):
+            # key is one of the fields, other object never equal
+            if history_type == '~' and values == previous:
+                noop.append(pk)
+            previous = values
+
+        noop.sort()
+        for i in range(0, len(noop), batch_size):
+            ids = noop[i:i + batch_size]
+            _delete(history_model, ids, dry_run, limit)
+            total += len(ids)
+
+            if report is not None:
+                report(label, Action.COLLAPSE, total)
+
+
+def prune(label, history_model, days, batch_size, archive_dir=None,
+          dry_run=False, limit=None, report=None):
+    """Remove records older than days, return count"""
+    limit = limit or RateLimit()
+    started = timezone.now()
+    cutoff = started - timezone.timedelta(days=days)
+    queryset = history_model._base_manager.filter(history_date__lt=cutoff)
+    path = archive_path(archive_dir, label, started) \
+        if archive_dir and not dry_run else None
+
+    total = 0
+    last = None
+
+    while True:
+        chunk = queryset
+        # deleted rows gone, dry run need keyset to move on
+        if dry_run and last is not None:
+            chunk = chunk.filter(pk__gt=last)
+
+        ids = list(chunk.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return total
+        last = ids[-1]
+
+        if path:
+            archive(history_model, ids, path)
+
+        _delete(history_model, ids, dry_run, limit)
+        total += len(ids)
+
+        if report is not None:
+            report(label, Action.PRUNE, total)
+
+
+def compact(labels=None, actions=(Action.COLLAPSE, Action.PRUNE), archive_dir=None,
+            dry_run=False, rate=None, batch_size=None, report=None):
+    """
+    Run actions on historical tables of labels (ie: feeder.Spread),
+    default every tracked model. Return Counter {(label, action): rows}.
+
+    :rate       rows deleted per second at most, None unlimited
+    :report     called with (label, action, rows so far) per batch
+    """
+    batch_size = batch_size or settings.FEEDER_HISTORY_COMPACT_BATCH_SIZE
+    archive_dir = archive_dir or settings.FEEDER_HISTORY_ARCHIVE_DIR
+    limit = RateLimit(rate)
+    result = Counter()
+
+    for label, history_model in historical_models(labels):
+        # collapse first, pruned archive hold less no-op
+        if Action.COLLAPSE in actions:
+            result[(label, Action.COLLAPSE)] = collapse(
+                label, history_model, batch_size,
+                dry_run=dry_run, limit=limit, report=report
+            )
+
+        days = get_retention(label)
+        if Action.PRUNE in actions and days is not None:
+            result[(label, Action.PRUNE)] = prune(
+                label, history_model, days, batch_size,
+                archive_dir=archive_dir, dry_run=dry_run,
+                limit=limit, report=report
+            )
+    return result
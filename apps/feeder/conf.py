@@ -10,5 +10,78 @@ class FeederAppConf(AppConf):
     PRICE_WHATSAPP_METHOD = 600
     PRICE_TELEGRAM_METHOD = 400
 
+    # History writer, see apps.feeder.history.Policy
+    # ie: {'feeder.Coupon': 'async', 'feeder.Spread': 'sampled'}
+    HISTORY_DEFAULT_POLICY = 'deferred'
+    HISTORY_POLICIES = {}
+    HISTORY_SAMPLE_RATE = 0.1
+    HISTORY_BATCH_SIZE = 500
+
+    # History compaction of every tracked model, see apps.feeder.compaction
+    # model label: days kept, ie: {'feeder.Spread': 90, 'person.SecureCode': 30}
+    # DEFAULT_RETENTION None keep forever
+    HISTORY_RETENTION = {}
+    HISTORY_DEFAULT_RETENTION = None
+    HISTORY_IGNORE_FIELDS = ('update_at',)
+    HISTORY_ARCHIVE_DIR = None
+    HISTORY_COMPACT_BATCH_SIZE = 1000
+
+    # Per route histograms, exposed at /metrics/ for staff or scraper
+    # sending `Authorization: Bearer <METRICS_TOKEN>`
+    # set SLOW_REQUEST_MS to log slow request with SQL fingerprints
+    METRICS_ENABLED = True
+    METRICS_SLOW_REQUEST_MS = None
+    METRICS_TOKEN = None
+
+    # Owner data version for ETag, bumped by signals
+    # response cached by version for CONDITIONAL_CACHE_TIMEOUT, 0 to disable
+    VERSION_TIMEOUT = 60 * 60 * 24 * 7
+    CONDITIONAL_CACHE_TIMEOUT = 60 * 5
+
+    # List endpoint served from .values() projection, see api/projection.py
+    PROJECTION_ENDPOINTS = ('suggest', 'target', 'spread', 'redeem',)
+
+    # Coupon check at point of sale, see apps.feeder.coupons
+    # 0 to always read database
+    COUPON_CACHE_TIMEOUT = 60 * 5
+    COUPON_CHECK_MAX = 50
+
+    # Create coupons of new suggest by celery through the outbox
+    COUPON_VIA_OUTBOX = False
+
+    # Suggest per query when streaming export
+    EXPORT_CHUNK_SIZE = 2000
+
+    # Daily rollup, spread to fragment, product and listing map cached
+    ROLLUP_SCOPE_TIMEOUT = 60 * 60 * 24
+    ROLLUP_MAX_DAYS = 366
+
+    # Read replica aliases from DATABASES, empty to read from primary
+    # client stay on primary for STICKY_SECONDS after a write
+    REPLICA_DATABASES = ()
+    REPLICA_STICKY_SECONDS = 10
+    REPLICA_COOKIE_NAME = 'feeder_primary'
+
+    # Native async views, only when served by ASGI
+    # ie: ('spread_public', 'suggest_create',)
+    # ORM work of async views run in a pool of ORM_WORKERS threads
+    ASYNC_ENDPOINTS = ()
+    ASYNC_ORM_WORKERS = 8
+    ASYNC_REDIS_URL = None
+    PUBLIC_SPREAD_CACHE_TIMEOUT = 30
+
+    # Admin changelist, count of filtered rows stop at COUNT_LIMIT,
+    # unfiltered table bigger than that use table statistics
+    ADMIN_COUNT_LIMIT = 10000
+
+    # Soft deleted aggregate removed by celery, rows per delete
+    PURGE_BATCH_SIZE = 500
+
+    # Delta sync feed, see apps.feeder.changes
+    # row visible SETTLE_SECONDS after commit, pruned after RETENTION_DAYS
+    CHANGE_PAGE_SIZE = 500
+    CHANGE_SETTLE_SECONDS = 2
+    CHANGE_RETENTION_DAYS = 30
+
     class Meta:
         perefix = 'feeder'
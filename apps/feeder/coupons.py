@@ -0,0 +1,168 @@
+"""
+Coupon lookup for point of sale. Identifier to state, owner, redeem
+and reward summary kept in a redis hash, miss read through the
+unique index on Coupon.identifier. Without django_redis fallback
+to plain cache keys.
+
+Hash rotated every FEEDER_COUPON_CACHE_TIMEOUT, so entry written
+from a read racing with a transition stale at most that long.
+"""
+import json
+import time
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .conf import settings
+
+try:
+    from django_redis import get_redis_connection
+except ImportError:
+    get_redis_connection = None
+
+
+def _redis():
+    if get_redis_connection is None:
+        return None
+
+    try:
+        return get_redis_connection('default')
+    except NotImplementedError:
+        # default cache not django_redis
+        return None
+
+
+def _hash_key():
+    timeout = settings.FEEDER_COUPON_CACHE_TIMEOUT
+    return 'feeder:coupon:%d' % (time.time() // timeout)
+
+
+def _key(identifier):
+    return 'feeder:coupon:id:%s' % identifier
+
+
+def _get_many(identifiers):
+    client = _redis()
+    if client is not None:
+        values = client.hmget(_hash_key(), identifiers)
+        return {
+            identifier: json.loads(value)
+            for identifier, value in zip(identifiers, values) if value
+        }
+
+    values = cache.get_many([_key(i) for i in identifiers])
+    return {i: values[_key(i)] for i in identifiers if _key(i) in values}
+
+
+def _set_many(entries):
+    timeout = settings.FEEDER_COUPON_CACHE_TIMEOUT
+    client = _redis()
+
+    if client is not None:
+        key = _hash_key()
+        pipe = client.pipeline()
+        pipe.hset(key, mapping={i: json.dumps(e) for i, e in entries.items()})
+        pipe.expire(key, timeout * 2)
+        pipe.execute()
+    else:
+        cache.set_many({_key(i): e for i, e in entries.items()}, timeout)
+
+
+def forget(identifiers, using=None):
+    """Drop cached entries now and again after commit"""
+    identifiers = list(identifiers)
+    if not identifiers or not settings.FEEDER_COUPON_CACHE_TIMEOUT:
+        return
+
+    def _forget():
+        client = _redis()
+        if client is not None:
+            client.hdel(_hash_key(), *identifiers)
+        else:
+            cache.delete_many([_key(i) for i in identifiers])
+
+    _forget()
+    transaction.on_commit(_forget, using=using)
+
+
+def load(identifiers):
+    """
+    Read coupons from database with one query,
+    return {identifier: entry}
+    """
+    Coupon = apps.get_registered_model('feeder', 'Coupon')
+    rows = Coupon.objects \
+        .filter(identifier__in=identifiers) \
+        .values(
+            'identifier',
+            'state',
+            'redeem__uuid',
+            'reward__fragment__listing__user_id',
+            'reward__uuid',
+            'reward__label',
+            'reward__amount',
+            'reward__unit_slug',
+            'reward__unit_label',
+            'reward__expiry_at'
+        )
+
+    entries = dict()
+    for row in rows:
+        reward = None
+        if row['reward__uuid'] is not None:
+            expiry_at = row['reward__expiry_at']
+            reward = {
+                'uuid': str(row['reward__uuid']),
+                'label': row['reward__label'],
+                'amount': row['reward__amount'],
+                'unit_slug': row['reward__unit_slug'],
+                'unit_label': row['reward__unit_label'],
+                'expiry_at': expiry_at.isoformat() if expiry_at else None,
+            }
+
+        entries[row['identifier']] = {
+            'state': row['state'],
+            'owner_id': row['reward__fragment__listing__user_id'],
+            'redeem': str(row['redeem__uuid']) if row['redeem__uuid'] else None,
+            'reward': reward,
+        }
+    return entries
+
+
+def lookup(identifiers):
+    """
+    Return {identifier: entry} for found coupons,
+    cache first then database for the rest
+    """
+    identifiers = list(dict.fromkeys(identifiers))
+    if not identifiers:
+        return dict()
+
+    if not settings.FEEDER_COUPON_CACHE_TIMEOUT:
+        return load(identifiers)
+
+    entries = _get_many(identifiers)
+    missing = [i for i in identifiers if i not in entries]
+
+    if missing:
+        loaded = load(missing)
+        if loaded:
+            _set_many(loaded)
+        entries.update(loaded)
+    return entries
+
+
+def is_redeemable(entry, now=None):
+    """Redeemed and not taken yet, reward not expired"""
+    Coupon = apps.get_registered_model('feeder', 'Coupon')
+    if entry['state'] != Coupon.State.REDEEMED or not entry['redeem']:
+        return False
+
+    reward = entry['reward']
+    if reward and reward['expiry_at']:
+        now = now or timezone.now()
+        return parse_datetime(reward['expiry_at']) >= now
+    return True
@@ -0,0 +1,139 @@
+import csv
+import json
+import uuid
+
+from django.apps import apps
+
+from rest_framework.utils.encoders import JSONEncoder
+
+from .api.projection import datetime_representation
+from .api.v1.suggest.serializers import censor_canal_value
+from .conf import settings
+
+Suggest = apps.get_registered_model('feeder', 'Suggest')
+Canal = apps.get_registered_model('feeder', 'Canal')
+Coupon = apps.get_registered_model('feeder', 'Coupon')
+
+CSV_HEADER = ('cursor', 'uuid', 'create_at', 'rating', 'description',
+              'product_label', 'canals', 'coupons',)
+
+# filter name: (lookup, cast)
+FILTERS = {
+    'product': ('spread__fragment__product__uuid', uuid.UUID),
+    'fragment': ('spread__fragment__uuid', uuid.UUID),
+    'rating': ('rating', int),
+}
+
+
+def clean_filters(params):
+    """
+    Cast filter from query params or options before streaming start,
+    raise ValueError for invalid one
+    """
+    filters = dict()
+    for name, (lookup, cast) in FILTERS.items():
+        value = params.get(name)
+        if value:
+            filters[lookup] = cast(value)
+    return filters
+
+
+def suggest_rows(owner_id, filters=None, cursor=None, chunk_size=None):
+    """
+    Yield suggests of owner as dict ordered by id, each chunk read
+    by keyset (id > last id) then canals and coupons for the chunk
+    with one query each. Memory bound by chunk size, not total rows.
+
+    :filters    from clean_filters
+    :cursor     id of last exported row, export resume after it
+    """
+    chunk_size = chunk_size or settings.FEEDER_EXPORT_CHUNK_SIZE
+    queryset = Suggest.objects \
+        .filter(spread__fragment__listing__user_id=owner_id) \
+        .order_by('id')
+
+    if filters:
+        queryset = queryset.filter(**filters)
+
+    while True:
+        chunk = queryset
+        if cursor:
+            chunk = chunk.filter(id__gt=cursor)
+
+        rows = list(chunk.values(
+            'id', 'uuid', 'create_at', 'rating', 'description',
+            'spread__fragment__product__label'
+        )[:chunk_size])
+
+        if not rows:
+            return
+
+        ids = [row['id'] for row in rows]
+        canals = dict()
+        coupons = dict()
+
+        for suggest_id, method, value in Canal.objects \
+                .filter(suggest_id__in=ids) \
+                .values_list('suggest_id', 'method', 'value'):
+            canals.setdefault(suggest_id, []).append({
+                'method': method,
+                'value': censor_canal_value(method, value)
+            })
+
+        for suggest_id, identifier, state in Coupon.objects \
+                .filter(suggest_id__in=ids) \
+                .values_list('suggest_id', 'identifier', 'state'):
+            coupons.setdefault(suggest_id, []).append({
+                'identifier': identifier,
+                'state': state
+            })
+
+        for row in rows:
+            yield {
+                'cursor': row['id'],
+                'uuid': str(row['uuid']),
+                'create_at': datetime_representation(row['create_at']),
+                'rating': row['rating'],
+                'description': row['description'],
+                'product_label': row['spread__fragment__product__label'],
+                'canals': canals.get(row['id'], []),
+                'coupons': coupons.get(row['id'], []),
+            }
+
+        cursor = rows[-1]['id']
+
+
+class _Echo:
+    """csv.writer target, return the line instead of buffering"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(CSV_HEADER)
+
+    for row in rows:
+        yield writer.writerow((
+            row['cursor'],
+            row['uuid'],
+            row['create_at'],
+            row['rating'],
+            row['description'],
+            row['product_label'],
+            '; '.join('%s:%s' % (c['method'], c['value']) for c in row['canals']),
+            '; '.join('%s:%s' % (c['identifier'], c['state']) for c in row['coupons']),
+        ))
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=JSONEncoder, ensure_ascii=False) + '\n'
+
+
+# output name: (line writer, content type, file extension)
+OUTPUTS = {
+    'csv': (csv_lines, 'text/csv', 'csv'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson', 'ndjson'),
+}
@@ -0,0 +1,221 @@
+import random
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+from simple_history.models import HistoricalRecords
+from simple_history.signals import (
+    pre_create_historical_record,
+    post_create_historical_record
+)
+
+from .conf import settings
+
+
+class Policy:
+    """
+    How historical records of a model written;
+        :sync       same as simple_history, one INSERT per save
+        :deferred   buffered, one bulk_create per historical model after commit
+        :async      buffered, shipped to celery worker after commit
+        :sampled    as :deferred but only a fraction of updates recorded
+        :off        no history at all
+    """
+    SYNC = 'sync'
+    DEFERRED = 'deferred'
+    ASYNC = 'async'
+    SAMPLED = 'sampled'
+    OFF = 'off'
+
+
+_local = Local()
+
+
+def get_policy(model):
+    """
+    Return policy for model by label (ie: feeder.Suggest),
+    fallback to default policy
+    """
+    policies = settings.FEEDER_HISTORY_POLICIES
+    return policies.get(model._meta.label, settings.FEEDER_HISTORY_DEFAULT_POLICY)
+
+
+def write_historical_records(records, using=None):
+    """
+    Write historical instances with one bulk_create per historical model
+    """
+    grouped = defaultdict(list)
+    for record in records:
+        grouped[record.__class__].append(record)
+
+    for model, objs in grouped.items():
+        # bulk_create open a transaction, not worth for single row
+        if len(objs) == 1:
+            objs[0].save(using=using, force_insert=True)
+        else:
+            model.objects.using(using).bulk_create(
+                objs,
+                batch_size=settings.FEEDER_HISTORY_BATCH_SIZE
+            )
+
+        if not post_create_historical_record.has_listeners(model):
+            continue
+
+        for obj in objs:
+            post_create_historical_record.send(
+                sender=model,
+                instance=obj.instance,
+                history_instance=obj,
+                history_date=obj.history_date,
+                history_user=obj.history_user,
+                history_change_reason=obj.history_change_reason,
+                using=using,
+            )
+
+
+class HistoryBuffer:
+    """
+    Hold committed historical records until the current scope closed.
+    Outside any scope each record written directly.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.records = defaultdict(list)
+
+    def add(self, record, policy, using):
+        self.records[(using, policy)].append(record)
+
+        if self.depth == 0:
+            self.flush()
+
+    def flush(self):
+        records, self.records = self.records, defaultdict(list)
+
+        for (using, policy), objs in records.items():
+            if policy == Policy.ASYNC:
+                from .tasks import write_history
+
+                data = {
+                    'using': using,
+                    'records': serializers.serialize('json', objs)
+                }
+
+                if settings.DEBUG:
+                    write_history(data)  # without celery
+                else:
+                    write_history.delay(data)  # with celery
+            else:
+                write_historical_records(objs, using=using)
+
+
+def get_buffer():
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None:
+        buffer = HistoryBuffer()
+        _local.buffer = buffer
+    return buffer
+
+
+@contextmanager
+def deferred_history():
+    """
+    Collect historical records inside the block and write them
+    once the block finished. Usable for request, task or command.
+
+        with deferred_history():
+            for suggest in suggests:
+                suggest.save()
+    """
+    buffer = get_buffer()
+    buffer.depth += 1
+
+    try:
+        yield buffer
+    finally:
+        buffer.depth -= 1
+        if buffer.depth == 0:
+            buffer.flush()
+
+
+class DeferredHistoricalRecords(HistoricalRecords):
+    """
+    HistoricalRecords with per-model write policy. Non sync records
+    enqueued with `transaction.on_commit` so rolled back changes never
+    reach the buffer.
+    """
+
+    def __init__(self, *args, policy=None, **kwargs):
+        self.policy = policy
+        super().__init__(*args, **kwargs)
+
+    def get_policy(self, instance):
+        return self.policy or get_policy(instance._meta.model)
+
+    def create_historical_record(self, instance, history_type, using=None):
+        policy = self.get_policy(instance)
+
+        if policy == Policy.OFF:
+            return
+
+        # m2m history need the saved parent, keep it synchronous
+        if policy == Policy.SYNC or getattr(self, 'm2m_fields', None):
+            return super().create_historical_record(
+                instance,
+                history_type,
+                using=using
+            )
+
+        # only updates sampled, create and delete always recorded
+        if policy == Policy.SAMPLED and history_type == '~':
+            if random.random() >= settings.FEEDER_HISTORY_SAMPLE_RATE:
+                return
+
+        using = using if self.use_base_model_db else None
+        record = self.build_historical_record(instance, history_type, using)
+
+        transaction.on_commit(
+            lambda: get_buffer().add(record, policy, using),
+            using=using
+        )
+
+    def build_historical_record(self, instance, history_type, using=None):
+        """Same as simple_history create_historical_record without save"""
+        history_date = getattr(instance, '_history_date', timezone.now())
+        history_user = self.get_history_user(instance)
+        history_change_reason = self.get_change_reason_for_object(
+            instance, history_type, using
+        )
+        manager = getattr(instance, self.manager_name)
+
+        attrs = {}
+        for field in self.fields_included(instance):
+            attrs[field.attname] = getattr(instance, field.attname)
+
+        relation_field = getattr(manager.model, 'history_relation', None)
+        if relation_field is not None:
+            attrs['history_relation'] = instance
+
+        history_instance = manager.model(
+            history_date=history_date,
+            history_type=history_type,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            **attrs,
+        )
+
+        pre_create_historical_record.send(
+            sender=manager.model,
+            instance=instance,
+            history_date=history_date,
+            history_user=history_user,
+            history_change_reason=history_change_reason,
+            history_instance=history_instance,
+            using=using,
+        )
+
+        return history_instance
@@ -0,0 +1,93 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from apps.feeder.models.suggest import COUPON_STATE_FLAGS, CouponState
+
+Coupon = apps.get_registered_model('feeder', 'Coupon')
+Redeem = apps.get_registered_model('feeder', 'Redeem')
+Taken = apps.get_registered_model('feeder', 'Taken')
+
+
+class Command(BaseCommand):
+    """
+    Set `state` of coupons written before the column existed (all
+    'issued' after the migration) from their redeem, taken and flags:
+
+        taken       has taken or is_used
+        redeemed    has redeem
+        active      is_active
+        issued      the rest
+
+    Run once after migrate, batches of --batch-size ids each in their
+    own transaction. Safe to run again.
+
+        python manage.py backfill_coupon_state
+    """
+    help = "Backfill coupon lifecycle state from redeem, taken and flags"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        has_redeem = Exists(Redeem.objects.filter(coupon_id=OuterRef('pk')))
+        has_taken = Exists(Taken.objects.filter(redeem__coupon_id=OuterRef('pk')))
+
+        # first match win
+        rules = (
+            (CouponState.TAKEN, Q(has_taken=True) | Q(is_used=True)),
+            (CouponState.REDEEMED, Q(has_redeem=True)),
+            (CouponState.ACTIVE, Q(is_active=True)),
+            (CouponState.ISSUED, Q()),
+        )
+
+        total = 0
+        last = 0
+
+        while True:
+            ids = list(
+                Coupon.objects
+                .filter(id__gt=last)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last = ids[-1]
+
+            with transaction.atomic():
+                left = set(ids)
+                for state, condition in rules:
+                    matched = set(
+                        Coupon.objects
+                        .filter(id__in=left)
+                        .annotate(has_redeem=has_redeem, has_taken=has_taken)
+                        .filter(condition)
+                        .values_list('id', flat=True)
+                    )
+                    left -= matched
+
+                    # rows already right not touched
+                    changed = list(
+                        Coupon.objects
+                        .filter(id__in=matched)
+                        .exclude(state=state)
+                        .values_list('id', flat=True)
+                    )
+                    if not changed:
+                        continue
+
+                    Coupon.objects \
+                        .filter(id__in=changed) \
+                        .update(state=state, update_at=timezone.now(),
+                                **COUPON_STATE_FLAGS[state])
+                    Coupon.objects.filter(id__in=changed).changed()
+                    total += len(changed)
+
+            if options['verbosity'] > 1:
+                self.stdout.write("Up to id %s" % last)
+
+        self.stdout.write(self.style.SUCCESS("%s coupons updated" % total))
@@ -0,0 +1,81 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from apps.feeder.versions import Resource, bump
+
+Interaction = apps.get_registered_model('feeder', 'Interaction')
+
+
+class Command(BaseCommand):
+    """
+    Set `is_product_owner` of interactions written before the column
+    existed (all False after the migration), true when the author own
+    the listing of the suggested fragment. Same rule as
+    Interaction.resolve_is_product_owner.
+
+    Run once after migrate, batches of --batch-size ids each in their
+    own transaction. Safe to run again.
+
+        python manage.py backfill_product_owner
+    """
+    help = "Backfill interaction is_product_owner"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        total = 0
+        last = 0
+
+        while True:
+            ids = list(
+                Interaction.objects
+                .filter(id__gt=last)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last = ids[-1]
+
+            with transaction.atomic():
+                owned = set(
+                    Interaction.objects
+                    .filter(id__in=ids, user_id=F('suggest__spread__fragment__product__listing__user_id'))
+                    .values_list('id', flat=True)
+                )
+
+                # rows already right not touched
+                wrong = set(
+                    Interaction.objects
+                    .filter(id__in=ids)
+                    .exclude(id__in=owned, is_product_owner=True)
+                    .exclude(is_product_owner=False, id__in=set(ids) - owned)
+                    .values_list('id', flat=True)
+                )
+                if wrong:
+                    Interaction.objects \
+                        .filter(id__in=wrong & owned) \
+                        .update(is_product_owner=True)
+                    Interaction.objects \
+                        .filter(id__in=wrong - owned) \
+                        .update(is_product_owner=False)
+
+                    # UPDATE send no signal
+                    rows = Interaction.objects \
+                        .filter(id__in=wrong) \
+                        .values_list(
+                            'suggest__user_id',
+                            'suggest__spread__fragment__user_id',
+                            'suggest__spread__broadcast__user_id'
+                        )
+                    bump(set(i for row in rows for i in row), (Resource.SUGGEST,))
+                    total += len(wrong)
+
+            if options['verbosity'] > 1:
+                self.stdout.write("Up to id %s" % last)
+
+        self.stdout.write(self.style.SUCCESS("%s interactions updated" % total))
@@ -0,0 +1,128 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.feeder import benchmark
+
+
+class Command(BaseCommand):
+    """
+    Run endpoint benchmark against seeded data (see seed_feeder).
+    Write run as baseline with --save, compare with --baseline.
+
+        python manage.py benchmark_api --save benchmark.json
+        python manage.py benchmark_api --baseline benchmark.json
+        python manage.py benchmark_api --serializers
+    """
+    help = "Benchmark feeder API endpoints in-process"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', dest='scenarios',
+                            choices=[s.name for s in benchmark.SCENARIOS],
+                            help="Only run this scenario, repeatable")
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=5)
+        parser.add_argument('--throttle', action='store_true',
+                            help="Keep DRF throttles, disabled by default")
+        parser.add_argument('--response-cache', action='store_true',
+                            help="Keep conditional response cache, disabled by default")
+        parser.add_argument('--baseline', default=None,
+                            help="Baseline json to compare with")
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help="Allowed slow down before fail, 0.2 = 20%%")
+        parser.add_argument('--save', default=None,
+                            help="Write results as baseline json")
+        parser.add_argument('--serializers', action='store_true',
+                            help="Compare per row CPU of list serializers and projections")
+        parser.add_argument('--rows', type=int, default=100,
+                            help="Page size for --serializers")
+
+    def handle(self, *args, **options):
+        if options['serializers']:
+            return self.handle_serializers(options)
+
+        try:
+            results = benchmark.run(
+                names=options['scenarios'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                throttle=options['throttle'],
+                response_cache=options['response_cache']
+            )
+        except benchmark.Skip as e:
+            raise CommandError(str(e))
+
+        self.write_table(results)
+
+        failed = [name for name, result in results.items() if 'failed' in result]
+        if failed:
+            raise CommandError("%s scenario failed: %s" % (len(failed), ', '.join(failed)))
+
+        if options['save']:
+            benchmark.save_baseline(options['save'], results)
+            self.stdout.write('Saved to %s' % options['save'])
+
+        baseline_path = options['baseline']
+        if baseline_path:
+            if not os.path.exists(baseline_path):
+                raise CommandError("Baseline %s not found" % baseline_path)
+
+            baseline = benchmark.load_baseline(baseline_path)
+            regressions = benchmark.compare(
+                results,
+                baseline,
+                tolerance=options['tolerance']
+            )
+
+            if regressions:
+                for name, metric, previous, current in regressions:
+                    self.stderr.write('%s %s: %s -> %s' % (name, metric, previous, current))
+                raise CommandError("%s regression found" % len(regressions))
+
+            self.stdout.write(self.style.SUCCESS("No regression"))
+
+    def handle_serializers(self, options):
+        try:
+            results = benchmark.run_serializers(
+                rows=options['rows'],
+                iterations=options['iterations']
+            )
+        except benchmark.Skip as e:
+            raise CommandError(str(e))
+
+        row = '{:<12}{:>8}{:>16}{:>16}{:>10}'
+        self.stdout.write(row.format('list', 'rows', 'serializer us', 'projection us', 'speedup'))
+
+        for name, result in results.items():
+            self.stdout.write(row.format(
+                name,
+                result['rows'],
+                result['serializer_us'],
+                result['projection_us'],
+                result['speedup'] or '-'
+            ))
+
+    def write_table(self, results):
+        header = ('scenario', 'status', 'p50 ms', 'p95 ms', 'p99 ms',
+                  'queries', 'peak kb')
+        row = '{:<24}{:<12}{:>10}{:>10}{:>10}{:>9}{:>10}'
+        self.stdout.write(row.format(*header))
+
+        for name, result in results.items():
+            if 'skipped' in result:
+                self.stdout.write('{:<24}skipped: {}'.format(name, result['skipped']))
+                continue
+
+            if 'failed' in result:
+                self.stdout.write('{:<24}failed: {}'.format(name, result['failed']))
+                continue
+
+            self.stdout.write(row.format(
+                name,
+                ','.join(str(s) for s in result['status']),
+                result['p50'],
+                result['p95'],
+                result['p99'],
+                result['queries'],
+                result['peak_kb']
+            ))
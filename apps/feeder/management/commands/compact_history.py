@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.feeder import compaction
+
+
+class Command(BaseCommand):
+    """
+    Collapse no-op history records and prune records older than
+    FEEDER_HISTORY_RETENTION, archived to gzip NDJSON when an archive
+    dir given. Check with --dry-run first.
+
+        python manage.py compact_history --dry-run
+        python manage.py compact_history --model feeder.Spread --rate 2000 \\
+            --archive-dir /var/backups/history
+    """
+    help = "Compact and prune historical tables"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', action='append', dest='labels',
+                            help="Model label, repeatable, default every tracked model")
+        parser.add_argument('--action', action='append', dest='actions',
+                            choices=(compaction.Action.COLLAPSE, compaction.Action.PRUNE))
+        parser.add_argument('--archive-dir', default=None)
+        parser.add_argument('--dry-run', action='store_true')
+        parser.add_argument('--rate', type=int, default=None,
+                            help="Rows deleted per second at most")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        labels = options['labels']
+        known = [label for label, _model in compaction.historical_models()]
+
+        for label in labels or []:
+            if label not in known:
+                raise CommandError("%s has no history" % label)
+
+        def report(label, action, rows):
+            if options['verbosity'] > 1:
+                self.stdout.write("%s %s: %s" % (label, action, rows))
+
+        result = compaction.compact(
+            labels=labels,
+            actions=options['actions'] or (compaction.Action.COLLAPSE, compaction.Action.PRUNE),
+            archive_dir=options['archive_dir'],
+            dry_run=options['dry_run'],
+            rate=options['rate'],
+            batch_size=options['batch_size'],
+            report=report
+        )
+
+        verb = "would be removed" if options['dry_run'] else "removed"
+        for (label, action), rows in sorted(result.items()):
+            if rows:
+                self.stdout.write("%s %s: %s %s" % (label, action, rows, verb))
+        self.stdout.write(self.style.SUCCESS("%s records %s" % (sum(result.values()), verb)))
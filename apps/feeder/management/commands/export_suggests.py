@@ -0,0 +1,58 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.feeder import exports
+
+
+class Command(BaseCommand):
+    """
+    Stream suggests of one owner to file or stdout, memory stay
+    flat for any size. Resume with the cursor of the last written row.
+
+        python manage.py export_suggests 12 --output ndjson --file out.ndjson
+        python manage.py export_suggests 12 --cursor 98231 >> out.csv
+    """
+    help = "Export suggests, canals and coupons of an owner"
+
+    def add_arguments(self, parser):
+        parser.add_argument('owner', type=int, help="Owner user id")
+        parser.add_argument('--output', choices=list(exports.OUTPUTS), default='csv')
+        parser.add_argument('--file', default=None, help="Default to stdout")
+        parser.add_argument('--cursor', type=int, default=None,
+                            help="Resume after this row")
+        parser.add_argument('--chunk-size', type=int, default=None)
+        parser.add_argument('--product', default=None, help="Product uuid")
+        parser.add_argument('--fragment', default=None, help="Fragment uuid")
+        parser.add_argument('--rating', default=None)
+
+    def handle(self, *args, **options):
+        try:
+            filters = exports.clean_filters(options)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        rows = exports.suggest_rows(
+            options['owner'],
+            filters=filters,
+            cursor=options['cursor'],
+            chunk_size=options['chunk_size']
+        )
+
+        writer = exports.OUTPUTS[options['output']][0]
+        lines = writer(rows)
+
+        # header only for new export
+        if options['cursor'] and options['output'] == 'csv':
+            next(lines)
+
+        path = options['file']
+        mode = 'a' if options['cursor'] else 'w'
+        f = open(path, mode, newline='', encoding='utf-8') if path else sys.stdout
+
+        try:
+            for line in lines:
+                f.write(line)
+        finally:
+            if path:
+                f.close()
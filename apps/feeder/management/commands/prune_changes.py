@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from apps.feeder import changes
+from apps.feeder.conf import settings
+
+
+class Command(BaseCommand):
+    """
+    Delete change log rows older than FEEDER_CHANGE_RETENTION_DAYS,
+    client with an older cursor get 410 and resync.
+
+        python manage.py prune_changes --days 30
+    """
+    help = "Remove old rows of the delta sync change log"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.FEEDER_CHANGE_RETENTION_DAYS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = changes.prune(days=options['days'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS("%s change rows pruned" % total))
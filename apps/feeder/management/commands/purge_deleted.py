@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from apps.feeder import purge
+
+
+class Command(BaseCommand):
+    """
+    Purge every soft deleted listing, product, fragment, spread and
+    suggest left, normally done by celery right after the delete.
+
+        python manage.py purge_deleted
+    """
+    help = "Remove soft deleted aggregates and their dependents"
+
+    def handle(self, *args, **options):
+        def report(label, deleted):
+            if options['verbosity'] > 1:
+                self.stdout.write("%s: %s deleted" % (label, deleted))
+
+        progress = purge.purge_all(report=report)
+        for label, deleted in sorted(progress.items()):
+            self.stdout.write("%s: %s" % (label, deleted))
+        self.stdout.write(self.style.SUCCESS("%s rows purged" % sum(progress.values())))
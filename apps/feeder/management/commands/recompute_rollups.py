@@ -0,0 +1,41 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.feeder import rollups
+
+
+def parse_date(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError("Invalid date %s, use YYYY-MM-DD" % value)
+
+
+class Command(BaseCommand):
+    """
+    Rebuild daily rollup buckets from suggest, coupon and redeem rows.
+    Buckets in the range replaced, whole table without range.
+
+        python manage.py recompute_rollups --since 2021-09-01 --until 2021-09-30
+    """
+    help = "Recompute daily rating and coupon rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=parse_date, default=None)
+        parser.add_argument('--until', type=parse_date, default=None)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        since = options['since']
+        until = options['until']
+
+        if since and until and since > until:
+            raise CommandError("--since after --until")
+
+        total = rollups.recompute(
+            since=since,
+            until=until,
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS("%s buckets written" % total))
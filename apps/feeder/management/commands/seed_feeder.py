@@ -0,0 +1,325 @@
+import random
+
+from django.apps import apps
+from django.contrib.auth.hashers import make_password
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from apps.feeder.models.suggest import COUPON_STATE_FLAGS
+from apps.feeder.utils import create_random_identifier
+
+User = apps.get_registered_model('person', 'User')
+Profile = apps.get_registered_model('person', 'Profile')
+Listing = apps.get_registered_model('feeder', 'Listing')
+Product = apps.get_registered_model('feeder', 'Product')
+Fragment = apps.get_registered_model('feeder', 'Fragment')
+Reward = apps.get_registered_model('feeder', 'Reward')
+Spread = apps.get_registered_model('feeder', 'Spread')
+Suggest = apps.get_registered_model('feeder', 'Suggest')
+Canal = apps.get_registered_model('feeder', 'Canal')
+Coupon = apps.get_registered_model('feeder', 'Coupon')
+Redeem = apps.get_registered_model('feeder', 'Redeem')
+Taken = apps.get_registered_model('feeder', 'Taken')
+Interaction = apps.get_registered_model('feeder', 'Interaction')
+Broadcast = apps.get_registered_model('feeder', 'Broadcast')
+Target = apps.get_registered_model('feeder', 'Target')
+Notification = apps.get_registered_model('notifier', 'Notification')
+
+WORDS = ('fast', 'friendly', 'clean', 'slow', 'cheap', 'pricey', 'tasty',
+         'cold', 'warm', 'great', 'poor', 'service', 'staff', 'place',
+         'product', 'delivery', 'again', 'recommended', 'packaging')
+
+
+class Command(BaseCommand):
+    """
+    Seed synthetic feeder data for benchmark. Rows inserted with
+    bulk_create so signals, history and qrcode skipped.
+
+        python manage.py seed_feeder --owners 10 --suggests 1000000
+    """
+    help = "Seed synthetic listings, spreads, suggests, coupons and notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--owners', type=int, default=5)
+        parser.add_argument('--listings', type=int, default=2,
+                            help="Listing per owner")
+        parser.add_argument('--products', type=int, default=3,
+                            help="Product per listing")
+        parser.add_argument('--fragments', type=int, default=2,
+                            help="Fragment per product")
+        parser.add_argument('--rewards', type=int, default=1,
+                            help="Reward per fragment")
+        parser.add_argument('--suggesters', type=int, default=1000,
+                            help="Registered user giving suggest")
+        parser.add_argument('--suggests', type=int, default=10000,
+                            help="Total suggest spread over all fragments")
+        parser.add_argument('--interactions', type=int, default=2,
+                            help="Max interaction per suggest")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=None)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.now = timezone.now()
+        self.identifiers = set()
+
+        owners = self.create_users('owner', options['owners'])
+        suggesters = self.create_users('suggester', options['suggesters'])
+        spreads = self.create_catalog(owners, options)
+
+        total = options['suggests']
+        done = 0
+
+        while done < total:
+            size = min(self.batch_size, total - done)
+            with transaction.atomic():
+                self.create_suggests(spreads, suggesters, size, options)
+
+            done += size
+            self.stdout.write('Suggest %s/%s' % (done, total))
+
+        self.stdout.write(self.style.SUCCESS(
+            "Seeded %s owners, %s spreads, %s suggests"
+            % (len(owners), len(spreads), total)
+        ))
+
+    def bulk_create(self, model, objs):
+        """
+        bulk_create then set pk by uuid, MySQL not return them.
+        Use queryset to skip manager bulk_create, ie: CouponManager
+        make query per identifier.
+        """
+        if not objs:
+            return objs
+
+        queryset = model._default_manager.get_queryset()
+        queryset.bulk_create(objs, batch_size=self.batch_size)
+
+        if objs[0].pk is None:
+            ids = dict(
+                model._default_manager
+                .filter(uuid__in=[obj.uuid for obj in objs])
+                .values_list('uuid', 'id')
+            )
+
+            for obj in objs:
+                obj.pk = ids[obj.uuid]
+        return objs
+
+    def identifier(self):
+        """Random identifier unique in this run without query per row"""
+        while True:
+            value = create_random_identifier()
+            if value not in self.identifiers:
+                self.identifiers.add(value)
+                return value
+
+    @transaction.atomic
+    def create_users(self, prefix, total):
+        password = make_password(None)
+        tag = self.random.getrandbits(32)
+        users = list()
+
+        for index in range(total):
+            user = User(
+                username='%s%x%s' % (prefix, tag, index),
+                email='%s%x%s@bench.local' % (prefix, tag, index),
+                password=password,
+            )
+            user.hexid = hex(user.uuid.int)
+            users.append(user)
+
+        self.bulk_create(User, users)
+        self.bulk_create(Profile, [Profile(user=user) for user in users])
+        return users
+
+    @transaction.atomic
+    def create_catalog(self, owners, options):
+        fragment_ct = ContentType.objects.get_for_model(Fragment)
+        expiry_at = self.now + timezone.timedelta(days=365)
+
+        listings = self.bulk_create(Listing, [
+            Listing(user=owner, label='Listing %s' % index)
+            for owner in owners
+            for index in range(options['listings'])
+        ])
+
+        products = self.bulk_create(Product, [
+            Product(user=listing.user, listing=listing, label='Product %s' % index)
+            for listing in listings
+            for index in range(options['products'])
+        ])
+
+        fragments = self.bulk_create(Fragment, [
+            Fragment(
+                user=product.user,
+                product=product,
+                listing=product.listing,
+                label='Fragment %s' % index,
+                expiry_at=expiry_at
+            )
+            for product in products
+            for index in range(options['fragments'])
+        ])
+
+        self.bulk_create(Reward, [
+            Reward(
+                content_type=fragment_ct,
+                object_id=fragment.id,
+                provider='Benchmark',
+                label='Reward %s' % index,
+                amount='10',
+                unit_slug='pct',
+                unit_label='Percent',
+                expiry_at=expiry_at,
+                # Reward with 0 allocation never give coupon
+                allocation=10 ** 9
+            )
+            for fragment in fragments
+            for index in range(options['rewards'])
+        ])
+
+        spreads = list()
+        for fragment in fragments:
+            spread = Spread(
+                content_type=fragment_ct,
+                object_id=fragment.id,
+                expiry_at=expiry_at,
+                identifier=self.identifier()
+            )
+            spread.url = '{}://{}/{}'.format(spread.protocol, spread.domain,
+                                             spread.identifier)
+
+            # keep owner at hand for notification
+            spread.owner = fragment.user
+            spreads.append(spread)
+
+        self.bulk_create(Spread, spreads)
+
+        # one broadcast per product, suggests targeted later
+        broadcasts = self.bulk_create(Broadcast, [
+            Broadcast(
+                user=product.user,
+                product=product,
+                listing=product.listing,
+                identifier=self.identifier(),
+                label='Broadcast %s' % product.label,
+                message='Thanks for your suggest'
+            )
+            for product in products
+        ])
+
+        self.broadcasts = dict()
+        for broadcast in broadcasts:
+            self.broadcasts.setdefault(broadcast.user_id, []).append(broadcast)
+
+        rewards = dict()
+        for reward in Reward.objects.filter(content_type=fragment_ct,
+                                            object_id__in=[f.id for f in fragments]):
+            rewards.setdefault(int(reward.object_id), []).append(reward)
+
+        for spread in spreads:
+            spread.rewards = rewards.get(int(spread.object_id), [])
+        return spreads
+
+    def create_suggests(self, spreads, suggesters, total, options):
+        choice = self.random.choice
+        suggest_ct = ContentType.objects.get_for_model(Suggest)
+        suggests = list()
+
+        for index in range(total):
+            suggests.append(Suggest(
+                spread=choice(spreads),
+                # a third from anonymous
+                user=choice(suggesters) if suggesters and index % 3 else None,
+                rating=self.random.randint(1, 5),
+                description=' '.join(self.random.sample(WORDS, 6))
+            ))
+
+        self.bulk_create(Suggest, suggests)
+
+        canals = list()
+        coupons = list()
+        interactions = list()
+        notifications = list()
+        targets = list()
+
+        for suggest in suggests:
+            canals.append(Canal(
+                suggest=suggest,
+                method=Canal.Method.EMAIL,
+                value='%s@bench.local' % suggest.uuid.hex[:12]
+            ))
+
+            if self.random.random() < 0.5:
+                canals.append(Canal(
+                    suggest=suggest,
+                    method=Canal.Method.PHONE,
+                    value='08%s' % self.random.randint(10 ** 9, 10 ** 10 - 1)
+                ))
+
+            for reward in suggest.spread.rewards:
+                state = Coupon.State.ISSUED
+                if suggest.user_id is not None:
+                    state = Coupon.State.TAKEN if self.random.random() < 0.2 \
+                        else Coupon.State.REDEEMED
+
+                coupons.append(Coupon(
+                    suggest=suggest,
+                    reward=reward,
+                    identifier=self.identifier(),
+                    state=state,
+                    **COUPON_STATE_FLAGS[state]
+                ))
+
+            owner = suggest.spread.owner
+            broadcasts = self.broadcasts.get(owner.id)
+            if broadcasts and self.random.random() < 0.1:
+                targets.append(Target(
+                    broadcast=choice(broadcasts),
+                    suggest=suggest,
+                    method=Target.Method.EMAIL,
+                    value='%s@bench.local' % suggest.uuid.hex[:12],
+                    moment=str(int(self.now.timestamp()))
+                ))
+
+            for index in range(self.random.randint(0, options['interactions'])):
+                user = owner if index % 2 else (suggest.user or owner)
+                interactions.append(Interaction(
+                    user=user,
+                    suggest=suggest,
+                    description=' '.join(self.random.sample(WORDS, 4)),
+                    is_product_owner=user == owner
+                ))
+
+            notifications.append(Notification(
+                recipient=owner,
+                actor_content_type=suggest_ct,
+                actor_object_id=suggest.id,
+                verb='suggest',
+                target_content_type=suggest_ct,
+                target_object_id=suggest.id,
+                unread=self.random.random() < 0.7
+            ))
+
+        self.bulk_create(Canal, canals)
+        self.bulk_create(Coupon, coupons)
+
+        # redeem exist only for coupon past the active state
+        redeems = self.bulk_create(Redeem, [
+            Redeem(coupon=coupon, user=coupon.suggest.user)
+            for coupon in coupons
+            if coupon.state in (Coupon.State.REDEEMED, Coupon.State.TAKEN)
+        ])
+
+        self.bulk_create(Taken, [
+            Taken(redeem=redeem, actor=redeem.coupon.suggest.spread.owner)
+            for redeem in redeems if redeem.coupon.state == Coupon.State.TAKEN
+        ])
+
+        self.bulk_create(Interaction, interactions)
+        self.bulk_create(Target, targets)
+        self.bulk_create(Notification, notifications)
@@ -0,0 +1,51 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+
+from config import preload
+
+
+class Command(BaseCommand):
+    """
+    Cold start import time of web or celery worker, measured in a new
+    interpreter with -X importtime. Slowest modules and per package
+    total, lazy libraries reported when imported at startup.
+
+        python manage.py startup_report
+        python manage.py startup_report --target celery --top 40
+    """
+    help = "Import time breakdown of a worker cold start"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--target', choices=sorted(preload.TARGETS), default='web')
+        parser.add_argument('--top', type=int, default=25)
+        parser.add_argument('--sort', choices=('cumulative', 'self'), default='cumulative')
+
+    def handle(self, *args, **options):
+        try:
+            elapsed, rows = preload.import_times(options['target'])
+        except RuntimeError as e:
+            raise CommandError("Startup failed: %s" % e)
+
+        total = sum(row[1] for row in rows)
+        self.stdout.write("%s cold start %.2fs, %s modules, %.2fs importing" % (
+            options['target'], elapsed, len(rows), total / 1e6))
+
+        index = 2 if options['sort'] == 'cumulative' else 1
+        self.stdout.write("\nSlowest modules (%s ms)" % options['sort'])
+        for name, self_us, cumulative_us, depth in sorted(rows, key=lambda r: -r[index])[:options['top']]:
+            self.stdout.write("%9.1f %9.1f  %s" % (cumulative_us / 1e3, self_us / 1e3, name))
+
+        packages = defaultdict(int)
+        for name, self_us, _cumulative, _depth in rows:
+            packages[name.split('.')[0]] += self_us
+
+        self.stdout.write("\nPer package (self ms)")
+        for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write("%9.1f  %s" % (self_us / 1e3, name))
+
+        imported = {row[0] for row in rows}
+        eager = [name for name in preload.settings.PRELOAD_MODULES if name in imported]
+        if eager:
+            self.stdout.write(self.style.WARNING(
+                "\nImported at startup though lazy: %s" % ', '.join(eager)))
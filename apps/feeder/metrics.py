@@ -0,0 +1,263 @@
+import logging
+import re
+import threading
+import time
+
+from bisect import bisect_left
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.local import Local
+from django.db import connections
+from django.dispatch import Signal
+
+logger = logging.getLogger(__name__)
+
+_local = Local()
+_lock = threading.Lock()
+
+# Seconds, ie: 5ms to 10s
+TIME_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """
+    Cumulative histogram in Prometheus shape, one series per labels.
+    Kept in process memory, each worker expose their own.
+    """
+
+    def __init__(self, name, help, buckets):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = dict()
+
+    def observe(self, labels, value):
+        with _lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0,
+                    'count': 0
+                }
+
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series['buckets'][index] += 1
+
+            series['sum'] += value
+            series['count'] += 1
+
+    def expose(self):
+        lines = [
+            '# HELP %s %s' % (self.name, self.help),
+            '# TYPE %s histogram' % self.name
+        ]
+
+        with _lock:
+            items = sorted(self.series.items())
+            for labels, series in items:
+                label = ','.join('%s="%s"' % (k, _escape(v)) for k, v in labels)
+                total = 0
+
+                for bound, count in zip(self.buckets, series['buckets']):
+                    total += count
+                    lines.append('%s_bucket{%s,le="%s"} %s' % (self.name, label, bound, total))
+
+                lines.append('%s_bucket{%s,le="+Inf"} %s' % (self.name, label, series['count']))
+                lines.append('%s_sum{%s} %s' % (self.name, label, series['sum']))
+                lines.append('%s_count{%s} %s' % (self.name, label, series['count']))
+
+        return '\n'.join(lines)
+
+
+REQUEST_DURATION = Histogram(
+    'feeder_request_duration_seconds',
+    "Request latency per route",
+    TIME_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'feeder_db_queries',
+    "SQL queries per request",
+    COUNT_BUCKETS
+)
+DB_DURATION = Histogram(
+    'feeder_db_duration_seconds',
+    "Time spent in database per request",
+    TIME_BUCKETS
+)
+SERIALIZER_DURATION = Histogram(
+    'feeder_serializer_duration_seconds',
+    "Time spent building serializer data per request",
+    TIME_BUCKETS
+)
+SIGNAL_DURATION = Histogram(
+    'feeder_signal_duration_seconds',
+    "Time spent in signal receivers per request",
+    TIME_BUCKETS
+)
+
+HISTOGRAMS = (
+    REQUEST_DURATION,
+    DB_QUERIES,
+    DB_DURATION,
+    SERIALIZER_DURATION,
+    SIGNAL_DURATION
+)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_RE_STRING = re.compile(r"'(?:[^'\\]|\\.|'')*'")
+_RE_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_RE_IN = re.compile(r'\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)', re.IGNORECASE)
+_RE_SPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """
+    Normalize SQL so same statement with other params grouped, ie:
+    WHERE id IN (1, 2, 3) AND label = 'x' -> WHERE id IN (...) AND label = ?
+    """
+    sql = _RE_STRING.sub('?', sql)
+    sql = _RE_NUMBER.sub('?', sql)
+    sql = sql.replace('%s', '?')
+    sql = _RE_IN.sub('IN (...)', sql)
+    return _RE_SPACE.sub(' ', sql).strip()
+
+
+class RequestMetrics:
+    """Counter for the current request"""
+
+    def __init__(self, keep_sql=False):
+        self.queries = 0
+        self.db_time = 0
+        self.serializer_time = 0
+        self.signal_time = 0
+        self.keep_sql = keep_sql
+        self.statements = list()
+
+        # nested serializer and signal counted once
+        self.serializer_depth = 0
+        self.signal_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper, see connection.execute_wrapper"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+
+            if self.keep_sql:
+                self.statements.append((sql, elapsed))
+
+
+def get_current():
+    return getattr(_local, 'metrics', None)
+
+
+def collect(request_metrics):
+    """
+    Install execute wrapper on every connection,
+    use as `with collect(RequestMetrics()):`
+    """
+    stack = ExitStack()
+    _local.metrics = request_metrics
+
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(request_metrics))
+
+    stack.callback(setattr, _local, 'metrics', None)
+    return stack
+
+
+def observe(route, method, duration, request_metrics=None):
+    """Without request_metrics (async route) only the duration recorded"""
+    labels = (('method', method), ('route', route))
+
+    REQUEST_DURATION.observe(labels, duration)
+    if request_metrics is None:
+        return
+    DB_QUERIES.observe(labels, request_metrics.queries)
+    DB_DURATION.observe(labels, request_metrics.db_time)
+    SERIALIZER_DURATION.observe(labels, request_metrics.serializer_time)
+    SIGNAL_DURATION.observe(labels, request_metrics.signal_time)
+
+
+def log_slow_request(route, method, duration, request_metrics):
+    fingerprints = Counter()
+    timings = Counter()
+
+    for sql, elapsed in request_metrics.statements:
+        key = fingerprint(sql)
+        fingerprints[key] += 1
+        timings[key] += elapsed
+
+    lines = [
+        '%sx %.1fms %s' % (count, timings[key] * 1000, key)
+        for key, count in fingerprints.most_common()
+    ]
+
+    logger.warning(
+        "Slow request %s %s %.1fms, %s queries %.1fms\n%s",
+        method,
+        route,
+        duration * 1000,
+        request_metrics.queries,
+        request_metrics.db_time * 1000,
+        '\n'.join(lines)
+    )
+
+
+def expose():
+    return '\n'.join(h.expose() for h in HISTOGRAMS) + '\n'
+
+
+def _timed(original, attribute):
+    """Add elapsed time to RequestMetrics.<attribute>_time, outermost call only"""
+    depth_name = '%s_depth' % attribute
+    time_name = '%s_time' % attribute
+
+    def wrapper(*args, **kwargs):
+        metrics = get_current()
+        if metrics is None:
+            return original(*args, **kwargs)
+
+        depth = getattr(metrics, depth_name)
+        setattr(metrics, depth_name, depth + 1)
+        start = time.perf_counter()
+
+        try:
+            return original(*args, **kwargs)
+        finally:
+            setattr(metrics, depth_name, depth)
+            if depth == 0:
+                elapsed = time.perf_counter() - start
+                setattr(metrics, time_name, getattr(metrics, time_name) + elapsed)
+
+    wrapper.__wrapped__ = original
+    return wrapper
+
+
+def install():
+    """
+    Time serializer `data` and signal `send`. Called once
+    from FeederConfig.ready when metrics enabled.
+    """
+    from rest_framework import serializers
+
+    for klass in (serializers.Serializer, serializers.ListSerializer):
+        prop = klass.__dict__['data']
+        if hasattr(prop.fget, '__wrapped__'):
+            continue
+        klass.data = property(_timed(prop.fget, 'serializer'))
+
+    if not hasattr(Signal.send, '__wrapped__'):
+        Signal.send = _timed(Signal.send, 'signal')
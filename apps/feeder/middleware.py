@@ -0,0 +1,148 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from . import metrics, replicas
+from .conf import settings
+from .history import deferred_history, get_buffer
+
+
+class AsyncCapableMiddleware:
+    """
+    Run sync or async depending on the next handler, so async view
+    don't pay a thread switch per middleware. Subclass implement
+    `__acall__` for the async chain.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def __acall__(self, request):
+        raise NotImplementedError
+
+
+class HistoryBufferMiddleware(AsyncCapableMiddleware):
+    """
+    Buffer historical records for whole request,
+    written after response ready with one bulk_create per model
+    """
+
+    def handle(self, request):
+        with deferred_history():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        # buffer shared with ORM thread by context, flushed in thread
+        buffer = get_buffer()
+        buffer.depth += 1
+
+        try:
+            return await self.get_response(request)
+        finally:
+            buffer.depth -= 1
+            if buffer.depth == 0:
+                await sync_to_async(buffer.flush, thread_sensitive=False)()
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Record latency, query count, db, serializer and signal time
+    per route into histograms, see apps.feeder.metrics.
+    Request slower than FEEDER_METRICS_SLOW_REQUEST_MS logged with
+    SQL fingerprints.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.enabled = settings.FEEDER_METRICS_ENABLED
+        self.slow_ms = settings.FEEDER_METRICS_SLOW_REQUEST_MS
+
+    def handle(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        request_metrics = metrics.RequestMetrics(keep_sql=self.slow_ms is not None)
+        start = time.perf_counter()
+
+        with metrics.collect(request_metrics):
+            response = self.get_response(request)
+
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+
+        # don't measure the scrape
+        if route == 'metrics':
+            return response
+
+        metrics.observe(route, request.method, duration, request_metrics)
+
+        if self.slow_ms is not None and duration * 1000 >= self.slow_ms:
+            metrics.log_slow_request(route, request.method, duration, request_metrics)
+
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        # queries run in the ORM pool threads, only latency recorded,
+        # db, serializer and signal histograms left to sync routes
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        route = match.view_name if match else 'unmatched'
+        metrics.observe(route, request.method, duration)
+        return response
+
+
+class ReplicaMiddleware(AsyncCapableMiddleware):
+    """
+    Safe method request read from replica, unless the client wrote
+    something within FEEDER_REPLICA_STICKY_SECONDS (cookie or cache
+    marker by credential), so user always see their own writes.
+    """
+    SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+    def handle(self, request):
+        if not replicas.get_replicas():
+            return self.get_response(request)
+
+        is_safe = request.method in self.SAFE_METHODS
+        allow_replica = is_safe and not replicas.is_sticky(request)
+
+        with replicas.reading(allow_replica=allow_replica):
+            response = self.get_response(request)
+
+        if not is_safe:
+            replicas.stick(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if not replicas.get_replicas():
+            return await self.get_response(request)
+
+        is_safe = request.method in self.SAFE_METHODS
+        allow_replica = is_safe \
+            and not await sync_to_async(replicas.is_sticky, thread_sensitive=False)(request)
+
+        with replicas.reading(allow_replica=allow_replica):
+            response = await self.get_response(request)
+
+        if not is_safe:
+            await sync_to_async(replicas.stick, thread_sensitive=False)(request, response)
+        return response
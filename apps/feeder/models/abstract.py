@@ -1,6 +1,7 @@
 import uuid
 
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
 
@@ -11,3 +12,63 @@ class AbstractCommonField(models.Model):
 
     class Meta:
         abstract = True
+
+
+class SoftDeleteQuerySet(models.QuerySet):
+    def alive(self):
+        return self.filter(delete_at__isnull=True)
+
+    def deleted(self):
+        return self.filter(delete_at__isnull=False)
+
+
+class SoftDeleteManager(models.Manager.from_queryset(SoftDeleteQuerySet)):
+    """Default manager, soft deleted rows hidden"""
+
+    def get_queryset(self):
+        return super().get_queryset().alive()
+
+
+class AbstractSoftDelete(models.Model):
+    """
+    Aggregate deleted in two steps, hidden at once by `soft_delete`
+    with its soft delete dependents, then removed with every dependent
+    in batches, see apps.feeder.purge. Related access and save use the
+    base manager so still see it.
+    """
+    delete_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True
+    )
+
+    objects = SoftDeleteManager()
+    all_objects = models.Manager.from_queryset(SoftDeleteQuerySet)()
+
+    class Meta:
+        abstract = True
+
+    @property
+    def is_deleted(self):
+        return self.delete_at is not None
+
+    @transaction.atomic
+    def soft_delete(self):
+        from apps.notifier import outbox
+        from ..purge import hide_dependents
+        from ..versions import ALL_RESOURCES, bump
+
+        self.delete_at = timezone.now()
+        self.save(update_fields=['delete_at', 'update_at'])
+
+        # children hidden with it, UPDATE send no signal
+        owner_ids = set()
+        hide_dependents(self.__class__, [self.pk], self.delete_at, owner_ids)
+        bump(owner_ids, ALL_RESOURCES)
+
+        outbox.enqueue(
+            'apps.feeder.tasks.purge_deleted',
+            {'model': self._meta.label, 'id': self.pk},
+            'purge:%s:%s' % (self._meta.label_lower, self.pk)
+        )
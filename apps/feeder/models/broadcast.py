@@ -5,6 +5,7 @@ from django.contrib.contenttypes.fields import GenericRelation
 from .abstract import AbstractCommonField
 from ..conf import settings
 from ..utils import save_random_identifier
+from ..versions import Resource, bump
 
 
 class AbstractBroadcast(AbstractCommonField):
@@ -39,6 +40,7 @@ class AbstractBroadcast(AbstractCommonField):
     identifier = models.CharField(
         max_length=7,
         editable=False,
+        db_index=True,
         validators=[
             RegexValidator(
                 regex='^[a-zA-Z0-9]*$',
@@ -109,7 +111,12 @@ class TargetManager(models.Manager):
                 price = settings.FEEDER_PRICE_TELEGRAM_METHOD
 
             setattr(obj, 'price', price)
-        return super().bulk_create(objs, **kwargs)
+
+        objs = super().bulk_create(objs, **kwargs)
+
+        # bulk_create send no signal
+        bump(set(obj.broadcast.user_id for obj in objs), (Resource.BROADCAST,), using=self.db)
+        return objs
 
 
 class AbstractTarget(AbstractCommonField):
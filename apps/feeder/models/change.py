@@ -0,0 +1,38 @@
+from django.db import models
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+
+class AbstractChange(models.Model):
+    """
+    Append only change log of owner visible objects, id is the feed
+    sequence. Written by apps.feeder.changes, no uuid or update_at.
+    """
+    class Action(models.TextChoices):
+        CREATE = 'create', _("Create")
+        UPDATE = 'update', _("Update")
+        DELETE = 'delete', _("Delete")
+
+    # owner who see the change
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='changes',
+        on_delete=models.CASCADE
+    )
+
+    resource = models.CharField(max_length=15)
+    object_uuid = models.UUIDField()
+    action = models.CharField(choices=Action.choices, max_length=6)
+    create_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'feeder'
+        ordering = ['id']
+        indexes = [
+            # feed of owner after cursor as one range scan
+            models.Index(fields=['user', 'id']),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {} {}'.format(self.action, self.resource, self.object_uuid)
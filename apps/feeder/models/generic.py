@@ -1,4 +1,3 @@
-import qrcode
 import time
 import calendar
 
@@ -9,11 +8,11 @@ from django.utils.translation import ugettext_lazy as _
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
-from .abstract import AbstractCommonField
+from .abstract import AbstractCommonField, AbstractSoftDelete
 from ..utils import save_random_identifier
 
 
-class AbstractSpread(AbstractCommonField):
+class AbstractSpread(AbstractCommonField, AbstractSoftDelete):
     class Cause(models.TextChoices):
         N = 'n', _("New")
         R = 'r', _("Re")
@@ -43,6 +42,7 @@ class AbstractSpread(AbstractCommonField):
     identifier = models.CharField(
         max_length=7,
         editable=False,
+        db_index=True,
         validators=[
             RegexValidator(
                 regex='^[a-zA-Z0-9]*$',
@@ -110,6 +110,9 @@ class AbstractSpread(AbstractCommonField):
         return super().save(*args, **kwargs)
 
     def generate_qrcode(self):
+        # loaded on first spread, not at startup
+        import qrcode
+
         qr = qrcode.QRCode(
             version=1,
             error_correction=qrcode.constants.ERROR_CORRECT_L,
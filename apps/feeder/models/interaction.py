@@ -1,3 +1,4 @@
+from django.apps import apps
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
@@ -37,11 +38,32 @@ class AbstractInteraction(AbstractCommonField):
     label = models.CharField(max_length=255, null=True, blank=True)
     description = models.TextField()
 
+    # :user role in the room, resolved once when created
+    is_product_owner = models.BooleanField(default=False, editable=False)
+
     class Meta:
         abstract = True
         app_label = 'feeder'
         ordering = ['-create_at']
+        indexes = [
+            # thread of a suggest read as one index scan
+            models.Index(fields=['suggest', 'create_at']),
+        ]
 
     def __str__(self) -> str:
         text = '{}: {}'.format(self.get_type_display(), self.label)
         return text
+
+    def save(self, *args, **kwargs):
+        if not self.pk:
+            self.is_product_owner = self.resolve_is_product_owner()
+        return super().save(*args, **kwargs)
+
+    def resolve_is_product_owner(self):
+        Suggest = apps.get_registered_model('feeder', 'Suggest')
+        return Suggest.objects \
+            .filter(
+                id=self.suggest_id,
+                spread__fragment__product__listing__user_id=self.user_id
+            ) \
+            .exists()
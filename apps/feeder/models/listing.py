@@ -4,10 +4,10 @@ from django.db import models, transaction
 from django.conf import settings
 from django.utils.translation import ugettext_lazy as _
 
-from .abstract import AbstractCommonField
+from .abstract import AbstractCommonField, AbstractSoftDelete
 
 
-class AbstractListing(AbstractCommonField):
+class AbstractListing(AbstractCommonField, AbstractSoftDelete):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name='listings',
@@ -26,7 +26,7 @@ class AbstractListing(AbstractCommonField):
         return self.label
 
 
-class AbstractProduct(AbstractCommonField):
+class AbstractProduct(AbstractCommonField, AbstractSoftDelete):
     # we need know who add the :product
     # TODO: someday :listing allowed to organized with many user
     user = models.ForeignKey(
@@ -54,7 +54,7 @@ class AbstractProduct(AbstractCommonField):
         return self.label
 
 
-class AbstractFragment(AbstractCommonField):
+class AbstractFragment(AbstractCommonField, AbstractSoftDelete):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name='fragments',
@@ -1,5 +1,4 @@
-from simple_history.models import HistoricalRecords
-
+from ..history import DeferredHistoricalRecords
 from ..utils import is_model_registered
 from .listing import *
 from .generic import *
@@ -7,6 +6,8 @@ from .suggest import *
 from .broadcast import *
 from .interaction import *
 from .order import *
+from .rollup import *
+from .change import *
 
 __all__ = list()
 
@@ -14,7 +15,7 @@ __all__ = list()
 # 1
 if not is_model_registered('feeder', 'Listing'):
     class Listing(AbstractListing):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractListing.Meta):
             pass
@@ -25,7 +26,7 @@ if not is_model_registered('feeder', 'Listing'):
 # 2
 if not is_model_registered('feeder', 'Product'):
     class Product(AbstractProduct):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractProduct.Meta):
             pass
@@ -36,7 +37,7 @@ if not is_model_registered('feeder', 'Product'):
 # 3
 if not is_model_registered('feeder', 'Fragment'):
     class Fragment(AbstractFragment):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractFragment.Meta):
             pass
@@ -47,7 +48,7 @@ if not is_model_registered('feeder', 'Fragment'):
 # 4
 if not is_model_registered('feeder', 'Broadcast'):
     class Broadcast(AbstractBroadcast):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractBroadcast.Meta):
             pass
@@ -58,7 +59,7 @@ if not is_model_registered('feeder', 'Broadcast'):
 # 5
 if not is_model_registered('feeder', 'Target'):
     class Target(AbstractTarget):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractTarget.Meta):
             pass
@@ -69,7 +70,7 @@ if not is_model_registered('feeder', 'Target'):
 # 6
 if not is_model_registered('feeder', 'Reward'):
     class Reward(AbstractReward):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractReward.Meta):
             pass
@@ -80,7 +81,7 @@ if not is_model_registered('feeder', 'Reward'):
 # 7
 if not is_model_registered('feeder', 'Spread'):
     class Spread(AbstractSpread):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractSpread.Meta):
             pass
@@ -91,7 +92,7 @@ if not is_model_registered('feeder', 'Spread'):
 # 8
 if not is_model_registered('feeder', 'Suggest'):
     class Suggest(AbstractSuggest):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractSuggest.Meta):
             pass
@@ -102,7 +103,7 @@ if not is_model_registered('feeder', 'Suggest'):
 # 9
 if not is_model_registered('feeder', 'Canal'):
     class Canal(AbstractCanal):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractCanal.Meta):
             pass
@@ -113,7 +114,7 @@ if not is_model_registered('feeder', 'Canal'):
 # 10
 if not is_model_registered('feeder', 'Coupon'):
     class Coupon(AbstractCoupon):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractCoupon.Meta):
             pass
@@ -124,7 +125,7 @@ if not is_model_registered('feeder', 'Coupon'):
 # 11
 if not is_model_registered('feeder', 'Redeem'):
     class Redeem(AbstractRedeem):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractRedeem.Meta):
             pass
@@ -135,7 +136,7 @@ if not is_model_registered('feeder', 'Redeem'):
 # 12
 if not is_model_registered('feeder', 'Taken'):
     class Taken(AbstractTaken):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractTaken.Meta):
             pass
@@ -146,7 +147,7 @@ if not is_model_registered('feeder', 'Taken'):
 # 13
 if not is_model_registered('feeder', 'Interaction'):
     class Interaction(AbstractInteraction):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractInteraction.Meta):
             pass
@@ -157,7 +158,7 @@ if not is_model_registered('feeder', 'Interaction'):
 # 14
 if not is_model_registered('feeder', 'Order'):
     class Order(AbstractOrder):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractOrder.Meta):
             pass
@@ -168,7 +169,7 @@ if not is_model_registered('feeder', 'Order'):
 # 16
 if not is_model_registered('feeder', 'OrderMeta'):
     class OrderMeta(AbstractOrderMeta):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractOrderMeta.Meta):
             pass
@@ -179,9 +180,29 @@ if not is_model_registered('feeder', 'OrderMeta'):
 # 17
 if not is_model_registered('feeder', 'OrderItem'):
     class OrderItem(AbstractOrderItem):
-        history = HistoricalRecords(inherit=True)
+        history = DeferredHistoricalRecords(inherit=True)
 
         class Meta(AbstractOrderItem.Meta):
             pass
 
     __all__.append('OrderItem')
+
+
+# 18
+if not is_model_registered('feeder', 'Rollup'):
+    # counters only, no history
+    class Rollup(AbstractRollup):
+        class Meta(AbstractRollup.Meta):
+            pass
+
+    __all__.append('Rollup')
+
+
+# 19
+if not is_model_registered('feeder', 'Change'):
+    # append only log, no history
+    class Change(AbstractChange):
+        class Meta(AbstractChange.Meta):
+            pass
+
+    __all__.append('Change')
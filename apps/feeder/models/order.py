@@ -32,6 +32,7 @@ class AbstractOrder(AbstractCommonField):
     identifier = models.CharField(
         max_length=7,
         editable=False,
+        db_index=True,
         validators=[
             RegexValidator(
                 regex='^[a-zA-Z0-9]*$',
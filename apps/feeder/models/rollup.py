@@ -0,0 +1,49 @@
+from django.db import models
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+
+from .abstract import AbstractCommonField
+
+
+class AbstractRollup(AbstractCommonField):
+    """
+    Daily bucket of suggest and coupon counters per :scope object,
+    maintained by apps.feeder.rollups
+    """
+    class Scope(models.TextChoices):
+        SPREAD = 'spread', _("Spread")
+        FRAGMENT = 'fragment', _("Fragment")
+        PRODUCT = 'product', _("Product")
+        LISTING = 'listing', _("Listing")
+
+    # owner of the scope object
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='rollups',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True
+    )
+
+    scope = models.CharField(choices=Scope.choices, max_length=15)
+    object_id = models.BigIntegerField()
+    day = models.DateField()
+
+    suggest_count = models.IntegerField(default=0)
+    rating_1 = models.IntegerField(default=0)
+    rating_2 = models.IntegerField(default=0)
+    rating_3 = models.IntegerField(default=0)
+    rating_4 = models.IntegerField(default=0)
+    rating_5 = models.IntegerField(default=0)
+    coupon_issued = models.IntegerField(default=0)
+    coupon_redeemed = models.IntegerField(default=0)
+
+    class Meta:
+        abstract = True
+        app_label = 'feeder'
+        ordering = ['day']
+        # also the index for time-series range scan
+        unique_together = ('scope', 'object_id', 'day')
+
+    def __str__(self) -> str:
+        return '{} {} {}'.format(self.scope, self.object_id, self.day)
@@ -8,11 +8,13 @@ from django.utils.text import Truncator
 from django.apps import apps
 from django.db.models import Case, When, Value
 
-from .abstract import AbstractCommonField
+from .abstract import AbstractCommonField, AbstractSoftDelete
+from .. import coupons
+from ..versions import Resource, bump
 from ..utils import save_random_identifier
 
 
-class AbstractSuggest(AbstractCommonField):
+class AbstractSuggest(AbstractCommonField, AbstractSoftDelete):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name='suggests',
@@ -43,8 +45,17 @@ class AbstractSuggest(AbstractCommonField):
         text = '{} {}'.format(self.rating, self.description)
         return Truncator(text).words(10)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # rating as loaded, rollup move the count when it changed
+        instance._loaded_rating = instance.__dict__.get('rating')
+        return instance
+
     @transaction.atomic
     def create_coupon(self):
+        from .. import rollups
+
         Fragment = apps.get_registered_model('feeder', 'Fragment')
         Coupon = apps.get_registered_model('feeder', 'Coupon')
 
@@ -74,17 +85,18 @@ class AbstractSuggest(AbstractCommonField):
                     )
 
                 # check has user then user must have validated msisdn
-                is_active = False
+                state = CouponState.ISSUED
                 user = self.user
                 if user and user.is_msisdn_verified:
-                    is_active = True
+                    state = CouponState.ACTIVE
 
                 # create coupons
                 for reward in active_rewards:
                     c = Coupon(
                         suggest=self,
                         reward=reward,
-                        is_active=is_active
+                        state=state,
+                        **COUPON_STATE_FLAGS[state]
                     )
                     coupon_bulk.append(c)
 
@@ -96,30 +108,39 @@ class AbstractSuggest(AbstractCommonField):
                         )
                     except Exception as e:
                         print(e)
+                    else:
+                        # bulk_create send no signal
+                        rollups.record(self.spread_id, rollups.local_day(None),
+                                       coupon_issued=len(coupon_bulk))
 
     @transaction.atomic
     def redeem_coupon(self):
+        """
+        Redeem coupons moved active -> redeemed by this call only,
+        issued one redeemed after activated (see Coupon.objects.activate)
+        """
+        from .. import rollups
+
+        Coupon = apps.get_registered_model('feeder', 'Coupon')
         Redeem = apps.get_registered_model('feeder', 'Redeem')
 
-        if self.coupons.exists():
-            bulk_redeem = []
-            coupons = self.coupons \
-                .prefetch_related('redeem', 'reward', 'suggest') \
-                .select_related('redeem', 'reward', 'suggest') \
-                .filter(redeem__isnull=True)
-
-            for c in coupons:
-                o = Redeem(user=self.user, coupon=c)
-                bulk_redeem.append(o)
-
-            if len(bulk_redeem) > 0:
-                try:
-                    Redeem.objects.bulk_create(
-                        bulk_redeem,
-                        ignore_conflicts=False
-                    )
-                except Exception as e:
-                    print(e)
+        ids = self.coupons \
+            .filter(state=CouponState.ACTIVE, redeem__isnull=True) \
+            .values_list('id', flat=True)
+
+        # one CAS per coupon, a concurrent call win the others
+        redeemed = [i for i in ids if Coupon.objects.filter(id=i).transition('redeem')]
+        if not redeemed:
+            return
+
+        Redeem.objects.bulk_create(
+            [Redeem(user=self.user, coupon_id=i) for i in redeemed],
+            ignore_conflicts=False
+        )
+
+        # bulk_create send no signal
+        rollups.record(self.spread_id, rollups.local_day(None),
+                       coupon_redeemed=len(redeemed))
 
     @transaction.atomic
     def insert_canal(self, canal_dict):
@@ -197,16 +218,135 @@ class AbstractCanal(AbstractCommonField):
         return self.value
 
 
-class CouponManager(models.Manager):
+class CouponState(models.TextChoices):
+    ISSUED = 'issued', _("Issued")
+    ACTIVE = 'active', _("Active")
+    REDEEMED = 'redeemed', _("Redeemed")
+    TAKEN = 'taken', _("Taken")
+
+
+# :is_active and :is_used kept for api, follow the state
+COUPON_STATE_FLAGS = {
+    CouponState.ISSUED: {'is_active': False, 'is_used': False},
+    CouponState.ACTIVE: {'is_active': True, 'is_used': False},
+    CouponState.REDEEMED: {'is_active': True, 'is_used': False},
+    CouponState.TAKEN: {'is_active': True, 'is_used': True},
+}
+
+# name: (expected, target)
+COUPON_TRANSITIONS = {
+    'activate': (CouponState.ISSUED, CouponState.ACTIVE),
+    'redeem': (CouponState.ACTIVE, CouponState.REDEEMED),
+    'take': (CouponState.REDEEMED, CouponState.TAKEN),
+    'release': (CouponState.TAKEN, CouponState.REDEEMED),
+}
+
+
+class CouponQuerySet(models.QuerySet):
+    def transition(self, name):
+        """
+        Compare and set, move coupons still in expected state to target:
+
+            UPDATE ... SET state = target WHERE ... AND state = expected
+
+        Return affected rows, coupon changed by other request
+        in between simply not counted. No row lock held.
+        Filter on coupon columns only, mysql run joined UPDATE
+        as select ids first then update without the state check.
+        """
+        expected, target = COUPON_TRANSITIONS[name]
+        affected = self.filter(state=expected).update(
+            state=target,
+            update_at=timezone.now(),
+            **COUPON_STATE_FLAGS[target]
+        )
+
+        if affected:
+            self.filter(state=target).changed()
+        return affected
+
+    def changed(self):
+        """
+        Forget cached state and bump owners of coupons updated
+        with UPDATE, which send no signal
+        """
+        rows = self.values_list(
+            'identifier',
+            'suggest__user_id',
+            'suggest__spread__fragment__user_id',
+            'suggest__spread__broadcast__user_id'
+        )
+
+        identifiers = set()
+        owner_ids = set()
+        for identifier, *user_ids in rows:
+            identifiers.add(identifier)
+            owner_ids.update(user_ids)
+
+        if settings.FEEDER_COUPON_CACHE_TIMEOUT:
+            coupons.forget(identifiers, using=self.db)
+        bump(owner_ids, (Resource.SUGGEST, Resource.STAT,), using=self.db)
+
+    def transition_all(self, name, ids):
+        """
+        All or nothing for a batch of coupon ids, one UPDATE.
+        When any of them not in expected state rolled back and return False.
+        """
+        ids = set(ids)
+        if not ids:
+            return False
+
+        with transaction.atomic():
+            affected = self.filter(id__in=ids).transition(name)
+            if affected != len(ids):
+                transaction.set_rollback(True)
+                return False
+        return True
+
+
+class CouponManager(models.Manager.from_queryset(CouponQuerySet)):
     @transaction.atomic
     def bulk_create(self, objs, **kwargs):
+        from ..signals import get_owner_ids
+
         for obj in objs:
             identifier = save_random_identifier(obj)
             setattr(obj, 'identifier', identifier)
-        return super().bulk_create(objs, **kwargs)
+        objs = super().bulk_create(objs, **kwargs)
+
+        # bulk_create send no signal
+        owner_ids = set()
+        for suggest in set(obj.suggest for obj in objs):
+            owner_ids.update(get_owner_ids(suggest))
+
+        bump(owner_ids, (Resource.SUGGEST, Resource.STAT,), using=self.db)
+        return objs
+
+    @transaction.atomic
+    def activate(self, user_id):
+        """
+        Issued coupons of user suggests become active once the user
+        verified, then redeemed like suggest of a verified user.
+        Return activated count.
+        """
+        Suggest = apps.get_registered_model('feeder', 'Suggest')
+
+        ids = list(
+            self.filter(suggest__user_id=user_id, state=CouponState.ISSUED)
+            .values_list('id', flat=True)
+        )
+        if not ids:
+            return 0
+
+        affected = self.filter(id__in=ids).transition('activate')
+        for suggest in Suggest.objects.filter(coupons__id__in=ids).distinct():
+            suggest.redeem_coupon()
+        return affected
 
 
 class AbstractCoupon(AbstractCommonField):
+    State = CouponState
+
     suggest = models.ForeignKey(
         'feeder.Suggest',
         related_name='coupons',
@@ -223,6 +363,7 @@ class AbstractCoupon(AbstractCommonField):
     identifier = models.CharField(
         max_length=7,
         editable=False,
+        unique=True,
         validators=[
             RegexValidator(
                 regex='^[a-zA-Z0-9]*$',
@@ -232,7 +373,14 @@ class AbstractCoupon(AbstractCommonField):
         ]
     )
 
-    # user must validate their :canals with otp code then change this as True
+    # issued -> active (user validated :canals with otp code)
+    # -> redeemed -> taken, only changed with `transition`
+    state = models.CharField(
+        choices=CouponState.choices,
+        default=CouponState.ISSUED,
+        max_length=15,
+        db_index=True
+    )
     is_active = models.BooleanField(default=False)
     is_used = models.BooleanField(default=False)
 
@@ -254,6 +402,18 @@ class AbstractCoupon(AbstractCommonField):
             self.identifier = save_random_identifier(self)
         return super().save(*args, **kwargs)
 
+    def transition(self, name):
+        """Return True when this request moved the coupon"""
+        moved = self.__class__.objects \
+            .filter(id=self.id) \
+            .transition(name) == 1
+
+        if moved:
+            self.state = COUPON_TRANSITIONS[name][1]
+            for field, value in COUPON_STATE_FLAGS[self.state].items():
+                setattr(self, field, value)
+        return moved
+
 
 class AbstractRedeem(AbstractCommonField):
     coupon = models.OneToOneField(
@@ -302,8 +462,15 @@ class AbstractTaken(AbstractCommonField):
     def __str__(self) -> str:
         return self.redeem.coupon.identifier
 
-    @transaction.atomic
     def mark_coupon_used(self):
-        coupon = self.redeem.coupon
-        coupon.is_used = True
-        coupon.save()
+        """False when coupon already taken or not redeemed yet"""
+        Coupon = apps.get_registered_model('feeder', 'Coupon')
+        return Coupon.objects \
+            .filter(id=self.redeem.coupon_id) \
+            .transition('take') == 1
+
+    def release_coupon(self):
+        Coupon = apps.get_registered_model('feeder', 'Coupon')
+        return Coupon.objects \
+            .filter(id=self.redeem.coupon_id) \
+            .transition('release') == 1
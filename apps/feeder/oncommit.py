@@ -0,0 +1,47 @@
+from django.db import transaction
+
+
+class Pending:
+    """
+    on_commit callback collecting data of one savepoint scope, written
+    once after commit. Rolled back savepoint drop its own callback with
+    the data recorded inside, the outer scope keep theirs.
+    Subclass implement `add` and `__call__`.
+    """
+
+    def __init__(self, using):
+        self.using = using
+
+    def add(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def __call__(self):
+        raise NotImplementedError
+
+    @classmethod
+    def current(cls, using=None):
+        """Callback registered in the current savepoint, None if missing"""
+        connection = transaction.get_connection(using)
+        if not connection.in_atomic_block:
+            return None
+
+        savepoint_ids = set(connection.savepoint_ids)
+        for entry in connection.run_on_commit:
+            # (savepoint ids when registered, func)
+            if entry[0] == savepoint_ids and isinstance(entry[1], cls):
+                return entry[1]
+        return None
+
+    @classmethod
+    def record(cls, *args, using=None, **kwargs):
+        """Add to the callback of the current savepoint, registered when new"""
+        pending = cls.current(using)
+        is_new = pending is None
+
+        if is_new:
+            pending = cls(using)
+        pending.add(*args, **kwargs)
+
+        # outside transaction run right away, data must be added first
+        if is_new:
+            transaction.on_commit(pending, using=using)
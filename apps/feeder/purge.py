@@ -0,0 +1,200 @@
+"""
+Second step of soft delete. Row hidden by `soft_delete` removed here
+with everything depending on it, deepest rows first, at most
+FEEDER_PURGE_BATCH_SIZE rows per delete each in its own transaction,
+so no lock held long whatever the size of the aggregate.
+"""
+import logging
+
+from collections import Counter
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.apps import apps
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import models, transaction
+
+from .conf import settings
+from .history import deferred_history
+from .versions import ALL_RESOURCES, bump
+
+_state = Local()
+
+# purged in this order, parent before child
+AGGREGATES = ('feeder.Listing', 'feeder.Product', 'feeder.Fragment',
+              'feeder.Spread', 'feeder.Suggest',)
+
+
+@contextmanager
+def purging(owner_ids=()):
+    """
+    Signal handlers skip version bump, purge bump once at the end.
+    owner_ids of the aggregate, parent of purged rows may be gone.
+    """
+    previous = getattr(_state, 'purging', None)
+    _state.purging = set(owner_ids)
+
+    try:
+        yield
+    finally:
+        _state.purging = previous
+
+
+def is_purging():
+    return getattr(_state, 'purging', None) is not None
+
+
+def purging_owner_ids():
+    return getattr(_state, 'purging', None) or set()
+
+
+def dependents(model):
+    """
+    Yield (child model, field name, filter builder, on_delete) of rows
+    referencing model, generic relation treated as cascade
+    """
+    for relation in model._meta.related_objects:
+        # historical models use DO_NOTHING
+        if relation.on_delete not in (models.CASCADE, models.SET_NULL):
+            continue
+
+        name = relation.field.name
+        yield (relation.related_model, name,
+               lambda ids, name=name: {'%s__in' % name: ids},
+               relation.on_delete)
+
+    for field in model._meta.private_fields:
+        if not isinstance(field, GenericRelation):
+            continue
+
+        content_type = ContentType.objects.get_for_model(
+            model, for_concrete_model=field.for_concrete_model
+        )
+
+        def lookup(ids, field=field, content_type=content_type):
+            return {
+                field.content_type_field_name: content_type,
+                '%s__in' % field.object_id_field_name: ids
+            }
+
+        yield field.related_model, None, lookup, models.CASCADE
+
+
+def _next_ids(queryset, batch_size):
+    return list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+
+
+def is_soft_delete(model):
+    return any(f.name == 'delete_at' for f in model._meta.concrete_fields)
+
+
+def hide_dependents(model, ids, when, owner_ids):
+    """
+    Mark soft delete rows depending on ids rows deleted at `when`
+    batch by batch, so they hidden by default managers right away
+    instead of waiting for the purge. Collect their user into owner_ids.
+    """
+    batch_size = settings.FEEDER_PURGE_BATCH_SIZE
+
+    for child, name, lookup, on_delete in dependents(model):
+        if on_delete is not models.CASCADE or not is_soft_delete(child):
+            continue
+
+        children = child._base_manager.filter(delete_at__isnull=True, **lookup(ids))
+        has_user = any(f.name == 'user' for f in child._meta.concrete_fields)
+
+        while True:
+            child_ids = _next_ids(children, batch_size)
+            if not child_ids:
+                break
+
+            hide_dependents(child, child_ids, when, owner_ids)
+            rows = child._base_manager.filter(pk__in=child_ids)
+            if has_user:
+                owner_ids.update(rows.values_list('user_id', flat=True))
+            rows.update(delete_at=when)
+
+
+def purge_rows(model, queryset, progress, report=None):
+    """Delete rows of queryset batch by batch, dependents first"""
+    batch_size = settings.FEEDER_PURGE_BATCH_SIZE
+
+    while True:
+        ids = _next_ids(queryset, batch_size)
+        if not ids:
+            return
+
+        for child, name, lookup, on_delete in dependents(model):
+            children = child._base_manager.filter(**lookup(ids))
+
+            if on_delete is models.CASCADE:
+                purge_rows(child, children, progress, report)
+                continue
+
+            # SET_NULL, detached by batch too
+            while True:
+                child_ids = _next_ids(children, batch_size)
+                if not child_ids:
+                    break
+                child._base_manager.filter(pk__in=child_ids).update(**{name: None})
+
+        with deferred_history():
+            with transaction.atomic():
+                model._base_manager.filter(pk__in=ids).delete()
+
+        label = model._meta.label
+        progress[label] += len(ids)
+        if report is not None:
+            report(label, progress[label])
+
+
+def purge(label, pk, report=None):
+    """
+    Remove soft deleted row of model label (ie: feeder.Suggest) and its
+    dependents. Return Counter of deleted rows per model label.
+
+    :report     called with (model label, deleted so far) per batch
+    """
+    model = apps.get_registered_model(*label.split('.'))
+    queryset = model._base_manager.filter(pk=pk, delete_at__isnull=False)
+    progress = Counter()
+
+    instance = queryset.first()
+    if instance is None:
+        # restored or already purged
+        return progress
+
+    from .signals import get_owner_ids
+
+    try:
+        owner_ids = get_owner_ids(instance)
+    except ObjectDoesNotExist:
+        owner_ids = set()
+
+    owner_ids.discard(None)
+    with purging(owner_ids):
+        purge_rows(model, queryset, progress, report)
+
+    if owner_ids:
+        bump(owner_ids, ALL_RESOURCES)
+
+    logging.info("Purged %s %s: %s" % (label, pk, dict(progress)))
+    return progress
+
+
+def purge_all(report=None):
+    """Purge every soft deleted aggregate, return Counter"""
+    progress = Counter()
+
+    for label in AGGREGATES:
+        model = apps.get_registered_model(*label.split('.'))
+        pks = model._base_manager \
+            .filter(delete_at__isnull=False) \
+            .order_by('pk') \
+            .values_list('pk', flat=True)
+
+        for pk in list(pks):
+            progress.update(purge(label, pk, report=report))
+    return progress
@@ -0,0 +1,116 @@
+import hashlib
+import random
+
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.core.cache import cache
+from django.db import connections, DEFAULT_DB_ALIAS
+
+from .conf import settings
+
+_state = Local()
+
+
+def get_replicas():
+    """Configured replica aliases which exist in DATABASES"""
+    return [
+        alias for alias in settings.FEEDER_REPLICA_DATABASES
+        if alias in connections.databases
+    ]
+
+
+@contextmanager
+def reading(allow_replica=True):
+    """
+    Reads inside the block may go to replica. Outside any block
+    (tasks, commands, shell) everything stay on primary.
+    """
+    previous = getattr(_state, 'allow_replica', False)
+    _state.allow_replica = allow_replica
+
+    try:
+        yield
+    finally:
+        _state.allow_replica = previous
+
+
+@contextmanager
+def use_primary():
+    """Force primary for code which must see its own writes"""
+    with reading(allow_replica=False):
+        yield
+
+
+def is_replica_read():
+    """Reads outside transaction currently go to a replica"""
+    return getattr(_state, 'allow_replica', False) \
+        and not connections[DEFAULT_DB_ALIAS].in_atomic_block \
+        and bool(get_replicas())
+
+
+def client_key(request):
+    """
+    Identify client before authentication run, JWT in Authorization
+    header or session cookie. None for anonymous client.
+    """
+    credential = request.META.get('HTTP_AUTHORIZATION') \
+        or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+
+    if not credential:
+        return None
+    return 'feeder:primary:%s' % hashlib.sha1(credential.encode()).hexdigest()
+
+
+def is_sticky(request):
+    if request.COOKIES.get(settings.FEEDER_REPLICA_COOKIE_NAME):
+        return True
+
+    key = client_key(request)
+    return bool(key and cache.get(key))
+
+
+def stick(request, response):
+    """Keep client on primary until replica caught up with its write"""
+    timeout = settings.FEEDER_REPLICA_STICKY_SECONDS
+    response.set_cookie(
+        settings.FEEDER_REPLICA_COOKIE_NAME,
+        '1',
+        max_age=timeout,
+        httponly=True,
+        samesite='Lax'
+    )
+
+    key = client_key(request)
+    if key:
+        cache.set(key, True, timeout)
+
+
+class ReplicaRouter:
+    """
+    Read from random replica when current request allow it,
+    writes, transactions (select_for_update) and migrations on primary.
+    Enabled by FEEDER_REPLICA_DATABASES, see ReplicaMiddleware.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'allow_replica', False):
+            return DEFAULT_DB_ALIAS
+
+        # read inside transaction must see the transaction
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        replicas = get_replicas()
+        return random.choice(replicas) if replicas else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # instance loaded from replica saved to primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replica hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.FEEDER_REPLICA_DATABASES
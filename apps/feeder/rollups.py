@@ -0,0 +1,235 @@
+import datetime
+
+from collections import Counter, defaultdict
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .conf import settings
+from .oncommit import Pending
+from .versions import Resource, bump
+
+Spread = apps.get_registered_model('feeder', 'Spread')
+Suggest = apps.get_registered_model('feeder', 'Suggest')
+Coupon = apps.get_registered_model('feeder', 'Coupon')
+Redeem = apps.get_registered_model('feeder', 'Redeem')
+Rollup = apps.get_registered_model('feeder', 'Rollup')
+
+Scope = Rollup.Scope
+
+COUNTERS = ('suggest_count', 'rating_1', 'rating_2', 'rating_3', 'rating_4',
+            'rating_5', 'coupon_issued', 'coupon_redeemed',)
+
+
+def local_day(value):
+    return timezone.localdate(value) if value else timezone.localdate()
+
+
+def suggest_deltas(rating, sign=1):
+    return {'suggest_count': sign, 'rating_%s' % rating: sign}
+
+
+def spread_scopes(spread_ids):
+    """
+    Return {spread_id: (owner_id, [(scope, object_id), ...])},
+    content object of spread never changed so cached
+    """
+    keys = {spread_id: 'feeder:rollup:spread:%s' % spread_id for spread_id in spread_ids}
+    cached = cache.get_many(keys.values())
+    scopes = {
+        spread_id: cached[key] for spread_id, key in keys.items() if key in cached
+    }
+
+    missing = [spread_id for spread_id in spread_ids if spread_id not in scopes]
+    if not missing:
+        return scopes
+
+    # soft deleted rows counted until purged
+    content_objects = defaultdict(dict)
+    spreads = Spread._base_manager \
+        .filter(id__in=missing) \
+        .values_list('id', 'content_type_id', 'object_id')
+
+    for spread_id, content_type_id, object_id in spreads:
+        content_objects[content_type_id][int(object_id)] = spread_id
+
+    loaded = dict()
+    for content_type_id, spread_by_object in content_objects.items():
+        model = ContentType.objects.get_for_id(content_type_id).model_class()
+        rows = model._base_manager \
+            .filter(id__in=spread_by_object) \
+            .values_list('id', 'user_id', 'product_id', 'listing_id')
+
+        for object_id, user_id, product_id, listing_id in rows:
+            items = [(Scope.SPREAD, spread_by_object[object_id])]
+            if model._meta.model_name == 'fragment':
+                items.append((Scope.FRAGMENT, object_id))
+            if product_id:
+                items.append((Scope.PRODUCT, product_id))
+            if listing_id:
+                items.append((Scope.LISTING, listing_id))
+            loaded[spread_by_object[object_id]] = (user_id, items)
+
+    cache.set_many(
+        {keys[spread_id]: value for spread_id, value in loaded.items()},
+        settings.FEEDER_ROLLUP_SCOPE_TIMEOUT
+    )
+    scopes.update(loaded)
+    return scopes
+
+
+def bucket_deltas(deltas):
+    """
+    Spread deltas {(spread_id, day): Counter} to every scope,
+    return {(scope, object_id, day): (owner_id, Counter)}
+    """
+    scopes = spread_scopes(set(spread_id for spread_id, _day in deltas))
+    buckets = dict()
+
+    for (spread_id, day), counter in deltas.items():
+        if spread_id not in scopes:
+            # spread deleted, recompute clean it
+            continue
+
+        owner_id, items = scopes[spread_id]
+        for scope, object_id in items:
+            key = (scope, object_id, day)
+            if key not in buckets:
+                buckets[key] = (owner_id, Counter())
+            buckets[key][1].update(counter)
+    return buckets
+
+
+def apply(deltas, using=None):
+    """
+    Add deltas to buckets with UPDATE ... SET x = x + n,
+    missing bucket inserted
+    """
+    manager = Rollup.objects.using(using)
+    owner_ids = set()
+
+    for (scope, object_id, day), (owner_id, counter) in bucket_deltas(deltas).items():
+        counter = {k: v for k, v in counter.items() if v}
+        if not counter:
+            continue
+
+        owner_ids.add(owner_id)
+
+        bucket = manager.filter(scope=scope, object_id=object_id, day=day)
+        values = {k: F(k) + v for k, v in counter.items()}
+        values['update_at'] = timezone.now()
+
+        # bucket before rollup existed, left to recompute
+        if bucket.update(**values) or min(counter.values()) < 0:
+            continue
+
+        try:
+            with transaction.atomic(using=using):
+                manager.create(user_id=owner_id, scope=scope, object_id=object_id,
+                               day=day, **counter)
+        except IntegrityError:
+            # other request inserted it first
+            bucket.update(**values)
+
+    # UPDATE send no signal
+    bump(owner_ids, (Resource.STAT,), using=using)
+
+
+class _Pending(Pending):
+    """Deltas of one savepoint, applied once after commit"""
+
+    def __init__(self, using):
+        super().__init__(using)
+        self.deltas = defaultdict(Counter)
+
+    def add(self, spread_id, day, deltas):
+        self.deltas[(spread_id, day)].update(deltas)
+
+    def __call__(self):
+        apply(self.deltas, using=self.using)
+
+
+def record(spread_id, day, using=None, **deltas):
+    """Queue counter deltas for spread bucket of day"""
+    _Pending.record(spread_id, day, deltas, using=using)
+
+
+def recompute(since=None, until=None, using=None, batch_size=1000):
+    """
+    Rebuild buckets between since and until (dates, inclusive)
+    from suggest, coupon and redeem rows. Return bucket count.
+    """
+    def day_range(queryset):
+        # local day boundary, keep create_at index usable
+        if since:
+            start = datetime.datetime.combine(since, datetime.time.min)
+            queryset = queryset.filter(create_at__gte=timezone.make_aware(start))
+        if until:
+            end = datetime.datetime.combine(until + datetime.timedelta(days=1), datetime.time.min)
+            queryset = queryset.filter(create_at__lt=timezone.make_aware(end))
+        return queryset.annotate(day=TruncDate('create_at')).order_by()
+
+    deltas = defaultdict(Counter)
+    rating_counts = {
+        'rating_%s' % r: Count('id', filter=Q(rating=r)) for r in range(1, 6)
+    }
+
+    suggests = day_range(Suggest._base_manager.using(using)) \
+        .values('spread_id', 'day') \
+        .annotate(suggest_count=Count('id'), **rating_counts)
+
+    for row in suggests:
+        deltas[(row['spread_id'], row['day'])].update(
+            {k: row[k] for k in ('suggest_count', *rating_counts)}
+        )
+
+    coupons = day_range(Coupon.objects.using(using)) \
+        .values('suggest__spread_id', 'day') \
+        .annotate(total=Count('id'))
+
+    for row in coupons:
+        deltas[(row['suggest__spread_id'], row['day'])]['coupon_issued'] += row['total']
+
+    redeems = day_range(Redeem.objects.using(using)) \
+        .values('coupon__suggest__spread_id', 'day') \
+        .annotate(total=Count('id'))
+
+    for row in redeems:
+        deltas[(row['coupon__suggest__spread_id'], row['day'])]['coupon_redeemed'] += row['total']
+
+    objs = [
+        Rollup(user_id=owner_id, scope=scope, object_id=object_id, day=day,
+               **{k: v for k, v in counter.items() if k in COUNTERS})
+        for (scope, object_id, day), (owner_id, counter) in bucket_deltas(deltas).items()
+    ]
+
+    with transaction.atomic(using=using):
+        stale = Rollup.objects.using(using)
+        if since:
+            stale = stale.filter(day__gte=since)
+        if until:
+            stale = stale.filter(day__lte=until)
+
+        stale.delete()
+        Rollup.objects.using(using).bulk_create(objs, batch_size=batch_size)
+        bump(set(obj.user_id for obj in objs), (Resource.STAT,), using=using)
+    return len(objs)
+
+
+def series(scope, object_id, owner_id, since, until):
+    """Buckets of one object between since and until, one range scan"""
+    return Rollup.objects \
+        .filter(
+            scope=scope,
+            object_id=object_id,
+            day__gte=since,
+            day__lte=until,
+            user_id=owner_id
+        ) \
+        .order_by('day') \
+        .values('day', *COUNTERS)
@@ -1,8 +1,187 @@
 from django.apps import apps
+from django.core.exceptions import ObjectDoesNotExist
 from django.db import transaction
+from django.db.models.signals import post_delete
+
+from apps.notifier import outbox
+from . import changes, coupons, purge, rollups
+from .api import aio
+from .conf import settings
+from .versions import ALL_RESOURCES, Resource, bump
 
 
 @transaction.atomic
 def suggest_save_handler(sender, instance, created, **kwargs):
-    if created:
+    if not created:
+        return
+
+    if settings.FEEDER_COUPON_VIA_OUTBOX:
+        # out of request path, create response without coupons
+        outbox.enqueue(
+            'apps.feeder.tasks.create_suggest_coupon',
+            {'suggest_id': instance.id},
+            'suggest:%s' % instance.id
+        )
+    else:
         instance.create_coupon()
+
+
+def _content_object_owner(instance):
+    # spread and reward belong to fragment or broadcast
+    content_object = instance.content_object
+    return getattr(content_object, 'user_id', None)
+
+
+def _suggest_owners(suggest):
+    # owner of the spread and the suggester
+    return {_content_object_owner(suggest.spread), suggest.user_id}
+
+
+def get_owner_ids(instance):
+    """Return user ids whose data changed by instance"""
+    name = instance._meta.model_name
+
+    if name in ('listing', 'broadcast'):
+        return {instance.user_id}
+    if name in ('product', 'fragment'):
+        return {instance.user_id, instance.listing.user_id}
+    if name in ('spread', 'reward'):
+        return {_content_object_owner(instance)}
+    if name == 'suggest':
+        return _suggest_owners(instance)
+    if name in ('canal', 'coupon', 'interaction'):
+        return _suggest_owners(instance.suggest)
+    if name == 'redeem':
+        return _suggest_owners(instance.coupon.suggest)
+    if name == 'taken':
+        return _suggest_owners(instance.redeem.coupon.suggest)
+    if name == 'target':
+        return {instance.broadcast.user_id}
+    return set()
+
+
+# Resources affected when model changed
+VERSION_RESOURCES = {
+    'listing': ALL_RESOURCES,
+    'product': ALL_RESOURCES,
+    'fragment': ALL_RESOURCES,
+    'spread': (Resource.SPREAD, Resource.SUGGEST,),
+    'reward': (Resource.REWARD, Resource.SPREAD,),
+    'suggest': (Resource.SUGGEST, Resource.STAT,),
+    'canal': (Resource.SUGGEST,),
+    'coupon': (Resource.SUGGEST, Resource.STAT,),
+    'interaction': (Resource.SUGGEST,),
+    'redeem': (Resource.SUGGEST, Resource.STAT,),
+    'taken': (Resource.SUGGEST, Resource.STAT,),
+    'broadcast': (Resource.BROADCAST,),
+    'target': (Resource.BROADCAST,),
+}
+
+
+def version_bump_handler(sender, instance, using=None, **kwargs):
+    resources = VERSION_RESOURCES.get(instance._meta.model_name)
+    if not resources or purge.is_purging():
+        # purge bump owners of the aggregate once
+        return
+
+    try:
+        owner_ids = get_owner_ids(instance)
+    except ObjectDoesNotExist:
+        # parent already gone, it bump by itself
+        return
+
+    bump(owner_ids, resources, using=using)
+
+
+def change_handler(sender, instance, created=False, using=None, **kwargs):
+    if kwargs.get('signal') is post_delete or getattr(instance, 'delete_at', None):
+        action = changes.Action.DELETE
+    else:
+        action = changes.Action.CREATE if created else changes.Action.UPDATE
+
+    if purge.is_purging():
+        # parent may be gone, owners of the aggregate
+        owner_ids = purge.purging_owner_ids()
+    else:
+        try:
+            owner_ids = get_owner_ids(instance)
+        except ObjectDoesNotExist:
+            return
+
+    changes.record(instance._meta.model_name, instance.uuid, action,
+                   owner_ids, using=using)
+
+
+@transaction.atomic
+def msisdn_verified_handler(sender, instance, created, update_fields=None, **kwargs):
+    if not instance.is_msisdn_verified:
+        return
+
+    if update_fields is not None and 'is_msisdn_verified' not in update_fields:
+        return
+
+    Coupon = apps.get_registered_model('feeder', 'Coupon')
+    Coupon.objects.activate(instance.id)
+
+
+def coupon_delete_handler(sender, instance, using=None, **kwargs):
+    coupons.forget([instance.identifier], using=using)
+
+
+def spread_public_handler(sender, instance, using=None, **kwargs):
+    if not aio.is_enabled('spread_public') or not instance.identifier:
+        return
+
+    key = aio.public_spread_key(instance.identifier)
+    transaction.on_commit(lambda: aio.forget(key), using=using)
+
+
+def suggest_rollup_save_handler(sender, instance, created, using=None, **kwargs):
+    day = rollups.local_day(instance.create_at)
+    loaded_rating = getattr(instance, '_loaded_rating', None)
+
+    if created:
+        rollups.record(instance.spread_id, day, using=using,
+                       **rollups.suggest_deltas(instance.rating))
+    elif loaded_rating and loaded_rating != instance.rating:
+        rollups.record(instance.spread_id, day, using=using, **{
+            'rating_%s' % loaded_rating: -1,
+            'rating_%s' % instance.rating: 1
+        })
+
+    instance._loaded_rating = instance.rating
+
+
+def suggest_rollup_delete_handler(sender, instance, using=None, **kwargs):
+    rollups.record(instance.spread_id, rollups.local_day(instance.create_at),
+                   using=using, **rollups.suggest_deltas(instance.rating, -1))
+
+
+def coupon_rollup_handler(sender, instance, created=True, using=None, **kwargs):
+    # bulk created coupon recorded by Suggest.create_coupon
+    if not created:
+        return
+
+    try:
+        spread_id = instance.suggest.spread_id
+    except ObjectDoesNotExist:
+        return
+
+    sign = -1 if kwargs.get('signal') is post_delete else 1
+    rollups.record(spread_id, rollups.local_day(instance.create_at),
+                   using=using, coupon_issued=sign)
+
+
+def redeem_rollup_handler(sender, instance, created=True, using=None, **kwargs):
+    # bulk created redeem recorded by Suggest.redeem_coupon
+    if not created:
+        return
+
+    try:
+        spread_id = instance.coupon.suggest.spread_id
+    except ObjectDoesNotExist:
+        return
+
+    sign = -1 if kwargs.get('signal') is post_delete else 1
+    rollups.record(spread_id, rollups.local_day(instance.create_at),
+                   using=using, coupon_redeemed=sign)
@@ -1,12 +1,18 @@
 import logging
+from django.apps import apps
+from django.core import serializers
+from django.db import transaction
 from django.utils.translation import ugettext_lazy as _
 
 # Celery config
 from celery import shared_task
+from config import batching
+from . import purge
+from .history import write_historical_records
 from .utils import digihub_send_sms
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_sms(data):
     logging.info(_("Send sms run"))
 
@@ -19,3 +25,55 @@ def send_sms(data):
         logging.warning(
             _("Msisdn and Message empty")
         )
+
+
+@shared_task(ignore_result=True)
+def send_sms_batch():
+    count = batching.drain(send_sms_batch, send_sms)
+    logging.info(_("Send sms batch of %s run") % count)
+
+
+def queue_sms(data):
+    """send_sms, grouped with other sms when TASK_BATCH_ENABLED"""
+    batching.delay(send_sms, data)
+
+
+@shared_task(ignore_result=True)
+@transaction.atomic
+def create_suggest_coupon(data):
+    Suggest = apps.get_registered_model('feeder', 'Suggest')
+
+    try:
+        suggest = Suggest.objects \
+            .select_for_update() \
+            .get(id=data.get('suggest_id'))
+    except Suggest.DoesNotExist:
+        logging.warning(_("Suggest deleted before coupon created"))
+        return
+
+    # delivered at least once, lock above serialize redelivery
+    if not suggest.coupons.exists():
+        suggest.create_coupon()
+
+    # serializer redeemed before coupons existed, active ones of a
+    # verified user redeemed here
+    suggest.redeem_coupon()
+
+
+@shared_task(ignore_result=True)
+def write_history(data):
+    logging.info(_("Write history run"))
+
+    using = data.get('using', None)
+    records = [
+        o.object for o in serializers.deserialize('json', data.get('records'))
+    ]
+
+    if records:
+        write_historical_records(records, using=using)
+
+
+@shared_task(ignore_result=True)
+def purge_deleted(data):
+    logging.info(_("Purge deleted run"))
+    purge.purge(data.get('model'), data.get('id'))
@@ -1,3 +1,1036 @@
-from django.test import TestCase
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
 
-# Create your tests here.
+from collections import Counter
+from io import StringIO
+from unittest import mock
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIClient
+
+from api import idempotency
+from api.throttling import SlidingWindowThrottle
+
+from . import (
+    benchmark, changes, compaction, coupons, exports, metrics, purge, replicas, rollups, versions
+)
+from .api import aio
+from .api.conditional import conditional
+from .api.prefetch import PrefetchPlan
+from .changelist import EstimatedCountPaginator
+from .api.v1.suggest.async_views import create_suggest
+from .history import deferred_history
+from .models.suggest import COUPON_STATE_FLAGS
+from .versions import Resource, get_version
+
+User = apps.get_registered_model('person', 'User')
+Listing = apps.get_registered_model('feeder', 'Listing')
+Product = apps.get_registered_model('feeder', 'Product')
+Fragment = apps.get_registered_model('feeder', 'Fragment')
+Spread = apps.get_registered_model('feeder', 'Spread')
+Reward = apps.get_registered_model('feeder', 'Reward')
+Suggest = apps.get_registered_model('feeder', 'Suggest')
+Coupon = apps.get_registered_model('feeder', 'Coupon')
+Redeem = apps.get_registered_model('feeder', 'Redeem')
+Taken = apps.get_registered_model('feeder', 'Taken')
+Rollup = apps.get_registered_model('feeder', 'Rollup')
+Interaction = apps.get_registered_model('feeder', 'Interaction')
+
+
+class FeederMixin:
+    """Owner with listing > product > fragment, its reward and spread"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create_user('owner', 'pass123', email='owner@example.com')
+        cls.listing = Listing.objects.create(user=cls.owner, label='Listing')
+        cls.product = Product.objects.create(user=cls.owner, listing=cls.listing, label='Product')
+
+        expiry_at = timezone.now() + timezone.timedelta(days=3)
+        cls.fragment = Fragment.objects.create(
+            user=cls.owner, product=cls.product, label='Fragment', expiry_at=expiry_at
+        )
+
+        content_type = ContentType.objects.get_for_model(Fragment)
+        cls.reward = Reward.objects.create(
+            content_type=content_type, object_id=cls.fragment.id, provider='shop',
+            label='Reward', amount='10', unit_slug='pc', unit_label='Piece',
+            expiry_at=expiry_at
+        )
+        cls.spread = Spread.objects.create(
+            content_type=content_type, object_id=cls.fragment.id, expiry_at=expiry_at
+        )
+
+
+class HistoryPolicyTest(FeederMixin, TestCase):
+    def create_listing(self, label):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Listing.objects.create(user=self.owner, label=label)
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='sync')
+    def test_sync_written_on_save(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            Listing.objects.create(user=self.owner, label='sync')
+            self.assertEqual(Listing.history.filter(label='sync').count(), 1)
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='deferred')
+    def test_deferred_written_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Listing.objects.create(user=self.owner, label='deferred')
+            self.assertFalse(Listing.history.filter(label='deferred').exists())
+        self.assertEqual(Listing.history.filter(label='deferred').count(), 1)
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='deferred')
+    def test_deferred_rolled_back_never_written(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Listing.objects.create(user=self.owner, label='rollback')
+                    raise ValueError
+            except ValueError:
+                pass
+        self.assertFalse(Listing.history.filter(label='rollback').exists())
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='async', DEBUG=True)
+    def test_async_written_by_task(self):
+        self.create_listing('async')
+        self.assertEqual(Listing.history.filter(label='async').count(), 1)
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='off')
+    def test_off(self):
+        self.create_listing('off')
+        self.assertFalse(Listing.history.filter(label='off').exists())
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='sampled')
+    def test_sampled_only_updates(self):
+        with override_settings(FEEDER_HISTORY_SAMPLE_RATE=0):
+            listing = self.create_listing('sampled')
+            with self.captureOnCommitCallbacks(execute=True):
+                listing.save()
+        self.assertEqual(list(listing.history.values_list('history_type', flat=True)), ['+'])
+
+        with override_settings(FEEDER_HISTORY_SAMPLE_RATE=1):
+            with self.captureOnCommitCallbacks(execute=True):
+                listing.save()
+        self.assertEqual(listing.history.count(), 2)
+
+    @override_settings(FEEDER_HISTORY_POLICIES={'feeder.Listing': 'off'})
+    def test_policy_per_model(self):
+        listing = self.create_listing('per model')
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.create(user=self.owner, listing=listing, label='per model')
+
+        self.assertFalse(Listing.history.filter(label='per model').exists())
+        self.assertTrue(Product.history.filter(label='per model').exists())
+
+    @override_settings(FEEDER_HISTORY_DEFAULT_POLICY='deferred')
+    def test_deferred_history_bulk_write(self):
+        with deferred_history():
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(5):
+                    Listing.objects.create(user=self.owner, label='bulk %s' % i)
+            # committed but held by the buffer
+            self.assertFalse(Listing.history.filter(label__startswith='bulk').exists())
+
+        self.assertEqual(Listing.history.filter(label__startswith='bulk').count(), 5)
+
+
+class PrefetchPlanTest(FeederMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_plan_on_retrieve_only(self):
+        url = '/api/feeder/v1/rewards/%s/' % self.reward.uuid
+
+        with mock.patch.object(PrefetchPlan, 'for_serializer', wraps=PrefetchPlan.for_serializer) as for_serializer:
+            response = self.client.patch(url, {'label': 'Updated'}, format='json')
+            self.assertEqual(response.status_code, 200)
+            for_serializer.assert_not_called()
+
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            for_serializer.assert_called_once()
+        self.assertEqual(response.data['label'], 'Updated')
+
+    def count_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def add_suggests(self, count):
+        username = 'suggester%s' % Suggest.objects.count()
+        suggester = User.objects.create_user(username, 'pass123', email='%s@example.com' % username)
+        for i in range(count):
+            suggest = Suggest.objects.create(
+                user=suggester, spread=self.spread, rating=4, description='Good %s' % i
+            )
+            Coupon.objects.create(suggest=suggest, reward=self.reward)
+
+    @override_settings(FEEDER_CONDITIONAL_CACHE_TIMEOUT=0)
+    def test_suggest_list_queries_fixed(self):
+        url = '/api/feeder/v1/suggests/'
+        self.add_suggests(1)
+        expected = self.count_queries(url, {})
+
+        self.add_suggests(9)
+        with self.assertNumQueries(expected):
+            response = self.client.get(url)
+        self.assertEqual(len(response.json()['results']), 10)
+
+    @override_settings(FEEDER_CONDITIONAL_CACHE_TIMEOUT=0)
+    def test_spread_list_queries_fixed(self):
+        url = '/api/feeder/v1/spreads/'
+        params = {'fragment': self.fragment.uuid}
+        expected = self.count_queries(url, params)
+
+        content_type = ContentType.objects.get_for_model(Fragment)
+        for i in range(5):
+            Spread.objects.create(content_type=content_type, object_id=self.fragment.id,
+                                  expiry_at=self.spread.expiry_at)
+
+        with self.assertNumQueries(expected):
+            response = self.client.get(url, params)
+        self.assertEqual(len(response.json()['results']), 6)
+
+
+class BenchmarkTest(FeederMixin, TestCase):
+    def test_unexpected_status_failed(self):
+        scenario = benchmark.StatScenario({'owner': self.owner})
+        scenario.status = 201
+
+        with self.assertRaises(benchmark.Failed):
+            benchmark.run_scenario(scenario, iterations=1, warmup=0)
+
+    @override_settings(FEEDER_CONDITIONAL_CACHE_TIMEOUT=0)
+    def test_timed_calls_not_traced(self):
+        scenario = benchmark.StatScenario({'owner': self.owner})
+        timed = list()
+        request = scenario.request
+
+        def traced_request(iteration):
+            timed.append(benchmark.tracemalloc.is_tracing())
+            return request(iteration)
+
+        with mock.patch.object(scenario, 'request', side_effect=traced_request):
+            result = benchmark.run_scenario(scenario, iterations=3, warmup=1)
+
+        # warmup and timed calls, then the one measuring memory
+        self.assertEqual(timed, [False] * 4 + [True])
+        self.assertGreater(result['queries'], 0)
+        self.assertGreater(result['peak_kb'], 0)
+
+    def test_owner_scenario_not_served_from_cache(self):
+        results = benchmark.run(names=['stat'], iterations=2, warmup=1)
+        self.assertEqual(results['stat']['status'], [200])
+        self.assertGreater(results['stat']['queries'], 1)
+
+
+class MetricsViewTest(TestCase):
+    url = '/metrics/'
+
+    def test_loopback_alone_not_enough(self):
+        response = self.client.get(self.url, REMOTE_ADDR='127.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(FEEDER_METRICS_TOKEN='secret')
+    def test_bearer_token(self):
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(response.status_code, 200)
+
+    def test_staff(self):
+        user = User.objects.create_user('staff', 'pass123', email='staff@example.com')
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+        user.is_staff = True
+        user.save(update_fields=['is_staff'])
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_async_route_only_duration(self):
+        labels = (('method', 'GET'), ('route', 'async-test'))
+        metrics.observe('async-test', 'GET', 0.01)
+
+        self.assertIn(labels, metrics.REQUEST_DURATION.series)
+        self.assertNotIn(labels, metrics.DB_QUERIES.series)
+        self.assertNotIn(labels, metrics.SERIALIZER_DURATION.series)
+
+
+class VersionBumpTest(FeederMixin, TestCase):
+    """Queryset writes send no signal, they bump by themselves"""
+
+    def setUp(self):
+        self.suggest = Suggest.objects.create(spread=self.spread, rating=4, description='Good')
+        self.coupon = Coupon.objects.create(
+            suggest=self.suggest, reward=self.reward, state=Coupon.State.ACTIVE, is_active=True
+        )
+
+    def assertBumped(self, resource, func):
+        version = get_version(self.owner.id, resource)
+        with self.captureOnCommitCallbacks(execute=True):
+            func()
+        self.assertNotEqual(get_version(self.owner.id, resource), version)
+
+    def test_coupon_transition(self):
+        self.assertBumped(
+            Resource.SUGGEST,
+            lambda: Coupon.objects.filter(id=self.coupon.id).transition('redeem')
+        )
+
+    def test_coupon_bulk_create(self):
+        self.assertBumped(
+            Resource.STAT,
+            lambda: Coupon.objects.bulk_create([Coupon(suggest=self.suggest, reward=self.reward)])
+        )
+
+    def test_rollup_apply(self):
+        day = rollups.local_day(None)
+        self.assertBumped(
+            Resource.STAT,
+            lambda: rollups.apply({(self.spread.id, day): Counter(suggest_count=1)})
+        )
+
+
+class CouponTransitionTest(FeederMixin, TestCase):
+    def setUp(self):
+        self.suggester = User.objects.create_user('suggester', 'pass123', email='suggester@example.com')
+        self.suggest = Suggest.objects.create(
+            user=self.suggester, spread=self.spread, rating=4, description='Good'
+        )
+
+    def create_coupon(self, state):
+        return Coupon.objects.create(
+            suggest=self.suggest, reward=self.reward, state=state,
+            **COUPON_STATE_FLAGS[state]
+        )
+
+    def test_compare_and_set(self):
+        coupon = self.create_coupon(Coupon.State.ACTIVE)
+        queryset = Coupon.objects.filter(id=coupon.id)
+
+        self.assertEqual(queryset.transition('redeem'), 1)
+        self.assertEqual(queryset.transition('redeem'), 0)
+        self.assertEqual(queryset.transition('activate'), 0)
+
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.state, Coupon.State.REDEEMED)
+        self.assertTrue(coupon.is_active)
+        self.assertFalse(coupon.is_used)
+
+    def test_transition_all_or_nothing(self):
+        active = self.create_coupon(Coupon.State.ACTIVE)
+        issued = self.create_coupon(Coupon.State.ISSUED)
+
+        self.assertFalse(Coupon.objects.transition_all('redeem', [active.id, issued.id]))
+        active.refresh_from_db()
+        self.assertEqual(active.state, Coupon.State.ACTIVE)
+
+        self.assertTrue(Coupon.objects.transition_all('redeem', [active.id]))
+
+    def test_redeem_only_active(self):
+        active = self.create_coupon(Coupon.State.ACTIVE)
+        issued = self.create_coupon(Coupon.State.ISSUED)
+
+        self.suggest.redeem_coupon()
+
+        self.assertTrue(Redeem.objects.filter(coupon=active).exists())
+        self.assertFalse(Redeem.objects.filter(coupon=issued).exists())
+        issued.refresh_from_db()
+        self.assertEqual(issued.state, Coupon.State.ISSUED)
+
+        # nothing left to redeem
+        self.suggest.redeem_coupon()
+        self.assertEqual(Redeem.objects.count(), 1)
+
+    @override_settings(FEEDER_COUPON_VIA_OUTBOX=True, DEBUG=True)
+    def test_outbox_coupon_redeemed_for_verified(self):
+        self.suggester.mark_msisdn_verified()
+        Reward.objects.filter(id=self.reward.id).update(allocation=10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            suggest = Suggest.objects.create(
+                user=self.suggester, spread=self.spread, rating=5, description='Great'
+            )
+
+        coupon = suggest.coupons.get()
+        self.assertEqual(coupon.state, Coupon.State.REDEEMED)
+        self.assertTrue(Redeem.objects.filter(coupon=coupon, user=self.suggester).exists())
+
+    def test_activated_when_msisdn_verified(self):
+        coupon = self.create_coupon(Coupon.State.ISSUED)
+        self.suggester.mark_msisdn_verified()
+
+        coupon.refresh_from_db()
+        self.assertEqual(coupon.state, Coupon.State.REDEEMED)
+        self.assertTrue(Redeem.objects.filter(coupon=coupon, user=self.suggester).exists())
+
+    def test_backfill_state(self):
+        taken = self.create_coupon(Coupon.State.ISSUED)
+        redeemed = self.create_coupon(Coupon.State.ISSUED)
+        active = self.create_coupon(Coupon.State.ISSUED)
+        issued = self.create_coupon(Coupon.State.ISSUED)
+
+        Coupon.objects.filter(id=active.id).update(is_active=True)
+        Redeem.objects.create(user=self.suggester, coupon=redeemed)
+        redeem = Redeem.objects.create(user=self.suggester, coupon=taken)
+        Taken.objects.create(redeem=redeem, actor=self.owner)
+
+        call_command('backfill_coupon_state', stdout=StringIO())
+
+        states = dict(Coupon.objects.values_list('id', 'state'))
+        self.assertEqual(states, {
+            taken.id: Coupon.State.TAKEN,
+            redeemed.id: Coupon.State.REDEEMED,
+            active.id: Coupon.State.ACTIVE,
+            issued.id: Coupon.State.ISSUED,
+        })
+
+
+class RollupTest(FeederMixin, TestCase):
+    def counters(self):
+        return Rollup.objects \
+            .filter(scope=Rollup.Scope.SPREAD, object_id=self.spread.id) \
+            .values_list('suggest_count', flat=True)
+
+    def test_rolled_back_savepoint_not_counted(self):
+        day = rollups.local_day(None)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rollups.record(self.spread.id, day, suggest_count=1)
+            try:
+                with transaction.atomic():
+                    rollups.record(self.spread.id, day, suggest_count=5)
+                    raise ValueError
+            except ValueError:
+                pass
+
+            with transaction.atomic():
+                rollups.record(self.spread.id, day, suggest_count=2)
+
+        self.assertEqual(list(self.counters()), [3])
+
+    def test_one_apply_per_savepoint(self):
+        day = rollups.local_day(None)
+
+        with mock.patch.object(rollups, 'apply') as apply:
+            with self.captureOnCommitCallbacks(execute=True):
+                for i in range(3):
+                    rollups.record(self.spread.id, day, suggest_count=1)
+        apply.assert_called_once()
+
+
+@override_settings(FEEDER_CHANGE_SETTLE_SECONDS=0)
+class ChangeFeedTest(FeederMixin, TestCase):
+    def update_fragment(self, label):
+        self.fragment.label = label
+        self.fragment.save()
+
+    def entries(self, cursor=0):
+        results, _cursor, _more = changes.feed(self.owner.id, cursor)
+        return [(item['resource'], item['action']) for item in results]
+
+    def test_update_in_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.update_fragment('updated')
+
+        results, cursor, more = changes.feed(self.owner.id)
+        self.assertEqual([(i['resource'], i['action']) for i in results], [('fragment', 'update')])
+        self.assertEqual(results[0]['data']['label'], 'updated')
+        self.assertFalse(more)
+
+        # in sync, same cursor and nothing new
+        self.assertEqual(changes.feed(self.owner.id, cursor), ([], cursor, False))
+
+    def test_rolled_back_savepoint_not_in_feed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Listing.objects.create(user=self.owner, label='kept')
+            try:
+                with transaction.atomic():
+                    self.update_fragment('rolled back')
+                    raise ValueError
+            except ValueError:
+                pass
+
+        self.assertEqual(self.entries(), [('listing', 'create')])
+
+    def test_paging(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Listing.objects.create(user=self.owner, label='Listing %s' % i)
+
+        results, cursor, more = changes.feed(self.owner.id, limit=2)
+        self.assertEqual(len(results), 2)
+        self.assertTrue(more)
+
+        results, cursor, more = changes.feed(self.owner.id, cursor, limit=2)
+        self.assertEqual(len(results), 1)
+        self.assertFalse(more)
+
+    def test_expired_cursor(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                self.update_fragment('Fragment %s' % i)
+
+        Change = apps.get_registered_model('feeder', 'Change')
+        first, second, third = Change.objects.order_by('id').values_list('id', flat=True)
+        Change.objects.filter(id__lte=second).delete()
+
+        with self.assertRaises(changes.Expired):
+            changes.feed(self.owner.id, first)
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get('/api/feeder/v1/changes/', {'cursor': first})
+        self.assertEqual(response.status_code, 410)
+
+
+class ProductOwnerTest(FeederMixin, TestCase):
+    def setUp(self):
+        self.suggester = User.objects.create_user('suggester', 'pass123', email='suggester@example.com')
+        self.suggest = Suggest.objects.create(
+            user=self.suggester, spread=self.spread, rating=4, description='Good'
+        )
+
+    def test_resolved_on_create(self):
+        owner = Interaction.objects.create(user=self.owner, suggest=self.suggest, description='Thanks')
+        suggester = Interaction.objects.create(user=self.suggester, suggest=self.suggest, description='Hi')
+        self.assertTrue(owner.is_product_owner)
+        self.assertFalse(suggester.is_product_owner)
+
+    def test_backfill(self):
+        owner = Interaction.objects.create(user=self.owner, suggest=self.suggest, description='Thanks')
+        suggester = Interaction.objects.create(user=self.suggester, suggest=self.suggest, description='Hi')
+        Interaction.objects.filter(id=owner.id).update(is_product_owner=False)
+        Interaction.objects.filter(id=suggester.id).update(is_product_owner=True)
+
+        out = StringIO()
+        call_command('backfill_product_owner', '--batch-size=1', stdout=out)
+
+        flags = dict(Interaction.objects.values_list('id', 'is_product_owner'))
+        self.assertEqual(flags, {owner.id: True, suggester.id: False})
+        self.assertIn('2 interactions updated', out.getvalue())
+
+        out = StringIO()
+        call_command('backfill_product_owner', stdout=out)
+        self.assertIn('0 interactions updated', out.getvalue())
+
+
+class ConditionalTest(FeederMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.seen = list()
+
+    def call(self, version):
+        @conditional(Resource.SUGGEST)
+        def view(view_self, request):
+            self.seen.append(replicas._state.allow_replica)
+            return Response({'ok': True})
+
+        cache.set(versions._key(self.owner.id, Resource.SUGGEST), version)
+        request = RequestFactory().get('/api/feeder/v1/suggests/')
+        request.user = self.owner
+
+        with replicas.reading():
+            return view(None, request)
+
+    def test_fresh_version_computed_on_primary(self):
+        response = self.call(time.time())
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertEqual(self.seen, [False])
+
+    def test_replica_read_not_cached(self):
+        with mock.patch.object(replicas, 'is_replica_read', return_value=True):
+            version = time.time() - 3600
+            response = self.call(version)
+            self.assertNotIn('ETag', response)
+
+            self.call(version)
+        self.assertEqual(self.seen, [True, True])
+
+    def test_primary_read_cached(self):
+        version = time.time() - 3600
+        self.assertIn('ETag', self.call(version))
+        self.assertIn('ETag', self.call(version))
+        self.assertEqual(self.seen, [True])
+
+
+class IdempotencyTest(FeederMixin, TestCase):
+    url = '/api/feeder/v1/suggests/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def data(self, description='Good'):
+        return {
+            'spread': self.spread.identifier,
+            'rating': 4,
+            'description': description,
+            'canals': [{'method': 'email', 'value': 'suggester@example.com'}],
+        }
+
+    def post(self, data, key='key-1'):
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        return self.client.post(self.url, data, content_type='application/json',
+                                HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_replay(self):
+        first = self.post(self.data())
+        self.assertEqual(first.status_code, 201)
+        self.assertNotIn('Idempotent-Replayed', first)
+
+        # same data, other key order and spacing
+        data = self.data()
+        replay = self.post(json.dumps(dict(reversed(list(data.items()))), indent=2))
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(replay.json(), first.json())
+        self.assertEqual(Suggest.objects.count(), 1)
+
+    def test_mismatch(self):
+        self.assertEqual(self.post(self.data()).status_code, 201)
+
+        response = self.post(self.data(description='Other'))
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Suggest.objects.count(), 1)
+
+    @override_settings(IDEMPOTENCY_WAIT=0.1)
+    def test_in_progress(self):
+        lock_key = idempotency.cache_key('suggest', None, 'key-1') + ':lock'
+        cache.add(lock_key, 1)
+
+        response = self.post(self.data())
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Suggest.objects.exists())
+
+    def test_stored_between_get_and_lock(self):
+        first = self.post(self.data())
+        self.assertEqual(first.status_code, 201)
+
+        # retry read before the first stored, lock taken after it released
+        entry_key = idempotency.cache_key('suggest', None, 'key-1')
+        get = cache.get
+        stale = [entry_key]
+
+        def stale_get(key, *args, **kwargs):
+            if key in stale:
+                stale.remove(key)
+                return None
+            return get(key, *args, **kwargs)
+
+        with mock.patch.object(cache, 'get', side_effect=stale_get):
+            replay = self.post(self.data())
+
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(Suggest.objects.count(), 1)
+        self.assertIsNone(cache.get(entry_key + ':lock'))
+
+
+def throttle_rates(**rates):
+    """override_settings of REST_FRAMEWORK with some rates changed"""
+    return override_settings(REST_FRAMEWORK={
+        **settings.REST_FRAMEWORK,
+        'DEFAULT_THROTTLE_RATES': {**settings.REST_FRAMEWORK['DEFAULT_THROTTLE_RATES'], **rates},
+    })
+
+
+class ThrottleTest(FeederMixin, TestCase):
+    url = '/api/feeder/v1/suggests/'
+
+    def setUp(self):
+        cache.clear()
+
+    def data(self, email):
+        return json.dumps({
+            'spread': self.spread.identifier,
+            'rating': 4,
+            'description': 'Good',
+            'canals': [{'method': 'email', 'value': email}],
+        })
+
+    def test_create_with_idempotency_key(self):
+        # throttle parse the body before the idempotency fingerprint
+        response = APIClient().post(self.url, self.data('a@example.com'),
+                                    content_type='application/json',
+                                    HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(response.status_code, 201)
+
+    @throttle_rates(suggest_canal='1/hour')
+    def test_canal_limit(self):
+        client = APIClient()
+        response = client.post(self.url, self.data('a@example.com'), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+        response = client.post(self.url, self.data('A@example.com '), content_type='application/json')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+        response = client.post(self.url, self.data('b@example.com'), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+
+    @throttle_rates(suggest_spread='1/minute')
+    def test_async_create_apply_viewset_limits(self):
+        def post(email):
+            request = RequestFactory().post(self.url, self.data(email), content_type='application/json')
+            return create_suggest(request)
+
+        status, data, wait = post('a@example.com')
+        self.assertEqual((status, wait), (201, None))
+
+        status, data, wait = post('b@example.com')
+        self.assertEqual(status, 429)
+        self.assertGreater(wait, 0)
+        self.assertEqual(Suggest.objects.count(), 1)
+
+    @throttle_rates(anon='1/minute')
+    @override_settings(FEEDER_ASYNC_REDIS_URL=None)
+    def test_async_anon_share_sync_window(self):
+        request = RequestFactory().get('/api/feeder/v1/spreads/public/x/')
+        self.assertTrue(SlidingWindowThrottle().allow_request(Request(request), object()))
+
+        wait = asyncio.run(aio.throttle(request))
+        self.assertGreater(wait, 0)
+        self.assertLessEqual(wait, 60)
+
+
+@override_settings(FEEDER_ADMIN_COUNT_LIMIT=2)
+class ChangeListTest(FeederMixin, TestCase):
+    def setUp(self):
+        for i in range(3):
+            Listing.objects.create(user=self.owner, label='Listing %s' % i)
+
+        self.admin = User.objects.create_superuser('admin', 'admin@example.com', 'pass123')
+        self.client.force_login(self.admin)
+
+    def test_filtered_count_capped(self):
+        paginator = EstimatedCountPaginator(Listing.objects.filter(user=self.owner), 10)
+        self.assertEqual(paginator.count, 2)
+        self.assertTrue(paginator.is_estimated)
+        self.assertTrue(paginator.is_capped)
+
+        paginator = EstimatedCountPaginator(Listing.objects.filter(label='Listing 0'), 10)
+        self.assertEqual(paginator.count, 1)
+        self.assertFalse(paginator.is_estimated)
+
+    def test_capped_count_shown(self):
+        response = self.client.get('/admin/feeder/listing/', {'user__id__exact': self.owner.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '2+ listings')
+
+
+class SoftDeleteTest(FeederMixin, TestCase):
+    def setUp(self):
+        self.suggester = User.objects.create_user('suggester', 'pass123', email='suggester@example.com')
+        self.suggest = Suggest.objects.create(
+            user=self.suggester, spread=self.spread, rating=4, description='Good'
+        )
+        self.coupon = Coupon.objects.create(suggest=self.suggest, reward=self.reward)
+
+    def test_children_hidden_at_once(self):
+        version = get_version(self.suggester.id, Resource.SUGGEST)
+        with self.captureOnCommitCallbacks(execute=True):
+            Listing.objects.get(id=self.listing.id).soft_delete()
+
+        for model in (Listing, Product, Fragment, Spread, Suggest):
+            self.assertFalse(model.objects.exists(), model)
+            self.assertTrue(model.all_objects.exists(), model)
+        self.assertNotEqual(get_version(self.suggester.id, Resource.SUGGEST), version)
+
+        client = APIClient()
+        client.force_authenticate(self.owner)
+        response = client.get('/api/feeder/v1/rewards/', {'fragment': self.fragment.uuid})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+        # spread no longer resolved for new suggest
+        response = APIClient().post('/api/feeder/v1/suggests/', {
+            'spread': self.spread.identifier, 'rating': 4, 'description': 'Late',
+            'canals': [{'method': 'email', 'value': 'late@example.com'}],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_purge(self):
+        Listing.objects.get(id=self.listing.id).soft_delete()
+
+        with override_settings(FEEDER_PURGE_BATCH_SIZE=1):
+            progress = purge.purge('feeder.Listing', self.listing.id)
+
+        self.assertEqual(progress['feeder.Suggest'], 1)
+        self.assertEqual(progress['feeder.Coupon'], 1)
+        self.assertEqual(progress['feeder.Listing'], 1)
+        for model in (Listing, Product, Fragment, Spread, Reward, Suggest, Coupon):
+            self.assertFalse(model._base_manager.exists(), model)
+
+        # children soft deleted with it already gone
+        self.assertEqual(purge.purge_all(), Counter())
+
+    def test_alive_not_purged(self):
+        self.assertEqual(purge.purge('feeder.Listing', self.listing.id), Counter())
+        self.assertTrue(Listing.objects.filter(id=self.listing.id).exists())
+
+
+class SeedTest(TestCase):
+    def test_redeem_only_past_active(self):
+        call_command('seed_feeder', '--owners=1', '--listings=1', '--products=1', '--fragments=1',
+                     '--suggesters=5', '--suggests=40', '--seed=1', stdout=StringIO())
+
+        states = Counter(Coupon.objects.values_list('state', flat=True))
+        self.assertTrue(states[Coupon.State.ISSUED])
+        self.assertFalse(Redeem.objects.exclude(
+            coupon__state__in=(Coupon.State.REDEEMED, Coupon.State.TAKEN)).exists())
+        self.assertEqual(Redeem.objects.count(),
+                         states[Coupon.State.REDEEMED] + states[Coupon.State.TAKEN])
+        self.assertEqual(Taken.objects.count(), states[Coupon.State.TAKEN])
+
+
+@override_settings(FEEDER_HISTORY_DEFAULT_POLICY='sync')
+class CompactionTest(FeederMixin, TestCase):
+    label = 'feeder.Listing'
+
+    def setUp(self):
+        self.history = Listing.history.model
+        self.listing = Listing.objects.create(user=self.owner, label='a')
+        # update_at only, then a real change between no-op saves
+        self.listing.save()
+        self.listing.save()
+        self.listing.label = 'b'
+        self.listing.save()
+        self.listing.save()
+
+    def records(self):
+        return list(
+            self.history.objects
+            .filter(id=self.listing.id)
+            .order_by('history_date', 'pk')
+            .values_list('history_type', 'label')
+        )
+
+    def age(self, days, count):
+        ids = self.history.objects \
+            .filter(id=self.listing.id) \
+            .order_by('pk') \
+            .values_list('pk', flat=True)[:count]
+        self.history.objects \
+            .filter(pk__in=list(ids)) \
+            .update(history_date=timezone.now() - timezone.timedelta(days=days))
+        return list(ids)
+
+    def test_collapse_noop(self):
+        self.assertEqual(len(self.records()), 5)
+
+        removed = compaction.collapse(self.label, self.history, batch_size=2)
+        self.assertEqual(removed, 3)
+        self.assertEqual(self.records(), [('+', 'a'), ('~', 'b')])
+
+        # nothing left
+        self.assertEqual(compaction.collapse(self.label, self.history, batch_size=2), 0)
+
+    @override_settings(FEEDER_HISTORY_IGNORE_FIELDS=())
+    def test_collapse_compare_ignored_fields(self):
+        # update_at compared, every save changed it
+        self.assertEqual(compaction.collapse(self.label, self.history, batch_size=10), 0)
+
+    def test_dry_run(self):
+        out = StringIO()
+        call_command('compact_history', '--model', self.label, '--dry-run', stdout=out)
+
+        self.assertIn('feeder.Listing collapse: 3 would be removed', out.getvalue())
+        self.assertEqual(len(self.records()), 5)
+
+    @override_settings(FEEDER_HISTORY_RETENTION={'feeder.Listing': 30})
+    def test_prune_archived(self):
+        old = self.age(40, 2)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            result = compaction.compact(labels=[self.label], actions=(compaction.Action.PRUNE,),
+                                        archive_dir=archive_dir, batch_size=1)
+            self.assertEqual(result[(self.label, compaction.Action.PRUNE)], 2)
+
+            directory = os.path.join(archive_dir, 'feeder', 'listing')
+            [name] = os.listdir(directory)
+            # one gzip member per batch, read as one file
+            with gzip.open(os.path.join(directory, name), 'rt') as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertEqual([row['history_id'] for row in rows], [str(i) for i in old])
+        self.assertFalse(self.history.objects.filter(pk__in=old).exists())
+        self.assertEqual(len(self.records()), 3)
+
+    @override_settings(FEEDER_HISTORY_RETENTION={'feeder.Listing': 30})
+    def test_prune_dry_run_not_archived(self):
+        self.age(40, 2)
+
+        with tempfile.TemporaryDirectory() as archive_dir:
+            result = compaction.compact(labels=[self.label], actions=(compaction.Action.PRUNE,),
+                                        archive_dir=archive_dir, dry_run=True, batch_size=1)
+            self.assertEqual(os.listdir(archive_dir), [])
+
+        self.assertEqual(result[(self.label, compaction.Action.PRUNE)], 2)
+        self.assertEqual(len(self.records()), 5)
+
+    def test_rate_limit(self):
+        # clock stopped, each batch of 1 row at 10 per second 0.1s more ahead
+        with mock.patch.object(compaction.time, 'monotonic', return_value=0), \
+                mock.patch.object(compaction.time, 'sleep') as sleep:
+            compaction.compact(labels=[self.label], actions=(compaction.Action.COLLAPSE,),
+                               rate=10, batch_size=1)
+
+        self.assertEqual([round(call.args[0], 3) for call in sleep.call_args_list], [0.1, 0.2, 0.3])
+
+    def test_unlimited(self):
+        with mock.patch.object(compaction.time, 'sleep') as sleep:
+            compaction.compact(labels=[self.label], actions=(compaction.Action.COLLAPSE,))
+        sleep.assert_not_called()
+
+
+class CouponCheckTest(FeederMixin, TestCase):
+    url = '/api/feeder/v1/coupons/'
+
+    def setUp(self):
+        cache.clear()
+        suggester = User.objects.create_user('suggester', 'pass123', email='suggester@example.com')
+        suggest = Suggest.objects.create(user=suggester, spread=self.spread, rating=4, description='Good')
+
+        state = Coupon.State.REDEEMED
+        self.coupon = Coupon.objects.create(suggest=suggest, reward=self.reward, state=state,
+                                            **COUPON_STATE_FLAGS[state])
+        self.redeem = Redeem.objects.create(user=suggester, coupon=self.coupon)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def test_retrieve(self):
+        response = self.client.get('%s%s/' % (self.url, self.coupon.identifier))
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertTrue(data['is_redeemable'])
+        self.assertEqual(data['redeem'], str(self.redeem.uuid))
+        self.assertEqual(data['reward']['uuid'], str(self.reward.uuid))
+
+    def test_other_owner_not_found(self):
+        other = User.objects.create_user('other', 'pass123', email='other@example.com')
+        self.client.force_authenticate(other)
+
+        response = self.client.get('%s%s/' % (self.url, self.coupon.identifier))
+        self.assertEqual(response.status_code, 404)
+
+    def test_check_many_one_query(self):
+        identifiers = [self.coupon.identifier, 'missing']
+        with self.assertNumQueries(1):
+            entries = coupons.lookup(identifiers)
+        self.assertEqual(list(entries), [self.coupon.identifier])
+
+        # cached
+        with self.assertNumQueries(0):
+            coupons.lookup(identifiers[:1])
+
+        response = self.client.post(self.url + 'check/', {'identifiers': identifiers}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(r['identifier'], r['is_found'], r['is_redeemable']) for r in response.json()['results']],
+            [(self.coupon.identifier, True, True), ('missing', False, False)]
+        )
+
+    def test_forgotten_on_transition(self):
+        coupons.lookup([self.coupon.identifier])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Coupon.objects.filter(id=self.coupon.id).transition('take')
+
+        entry = coupons.lookup([self.coupon.identifier])[self.coupon.identifier]
+        self.assertEqual(entry['state'], Coupon.State.TAKEN)
+        self.assertFalse(coupons.is_redeemable(entry))
+
+
+class ExportTest(FeederMixin, TestCase):
+    url = '/api/feeder/v1/suggests/export/'
+
+    def setUp(self):
+        self.suggests = [
+            Suggest.objects.create(spread=self.spread, rating=i, description='Suggest %s' % i)
+            for i in range(1, 4)
+        ]
+        self.suggests[0].insert_canal([{'method': 'email', 'value': 'suggester@example.com'}])
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.owner)
+
+    def export(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_ndjson(self):
+        response, content = self.export(output='ndjson')
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['cursor'] for row in rows], [s.id for s in self.suggests])
+        # canal censored like the api
+        [canal] = rows[0]['canals']
+        self.assertNotEqual(canal['value'], 'suggester@example.com')
+
+    def test_csv_resume_after_cursor(self):
+        _response, content = self.export(cursor=self.suggests[0].id)
+        lines = content.splitlines()
+
+        self.assertEqual(lines[0], ','.join(exports.CSV_HEADER))
+        self.assertEqual([int(line.split(',')[0]) for line in lines[1:]],
+                         [s.id for s in self.suggests[1:]])
+
+    def test_chunked_and_filtered(self):
+        rows = list(exports.suggest_rows(self.owner.id, filters={'rating': 2}, chunk_size=1))
+        self.assertEqual([row['cursor'] for row in rows], [self.suggests[1].id])
+
+        rows = list(exports.suggest_rows(self.owner.id, chunk_size=1))
+        self.assertEqual(len(rows), 3)
+
+    def test_other_owner_empty(self):
+        other = User.objects.create_user('other', 'pass123', email='other@example.com')
+        self.client.force_authenticate(other)
+        _response, content = self.export(output='ndjson')
+        self.assertEqual(content, '')
+
+    def test_invalid_params(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'x'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'product': 'x'}).status_code, 400)
+
+    def test_command_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'out.csv')
+            call_command('export_suggests', str(self.owner.id), '--file', path, '--chunk-size', '1')
+
+            # later rows appended without header
+            Suggest.objects.create(spread=self.spread, rating=5, description='Later')
+            call_command('export_suggests', str(self.owner.id), '--file', path,
+                         '--cursor', str(self.suggests[-1].id))
+
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(lines[-1].split(',')[4], 'Later')
@@ -1,4 +1,3 @@
-import requests
 import hashlib
 import calendar
 import time
@@ -42,7 +41,8 @@ def save_random_identifier(model_instance):
     random_identifier = create_random_identifier()
     model_class = model_instance.__class__
 
-    if model_class.objects.filter(identifier=random_identifier).exists():
+    # soft deleted rows keep their identifier
+    if model_class._base_manager.filter(identifier=random_identifier).exists():
         # If exist run the function again
         return save_random_identifier(model_instance)
 
@@ -83,6 +83,9 @@ def digihub_send_sms(msisdn, message):
         "Content-Type": "application/json"
     }
 
+    # SMS client only loaded by worker which send
+    import requests
+
     response = requests.post(url, json=payload, headers=headers)
     return response
 
@@ -1,10 +1,10 @@
-import phonenumbers
-
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
 
 def validate_msisdn(value):
+    import phonenumbers
+
     error_msg = _('Enter a valid msisdn')
 
     try:
@@ -0,0 +1,64 @@
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .conf import settings
+
+
+class Resource:
+    """Owner scoped data which has their own version"""
+    SUGGEST = 'suggest'
+    SPREAD = 'spread'
+    REWARD = 'reward'
+    BROADCAST = 'broadcast'
+    STAT = 'stat'
+
+
+ALL_RESOURCES = (
+    Resource.SUGGEST,
+    Resource.SPREAD,
+    Resource.REWARD,
+    Resource.BROADCAST,
+    Resource.STAT
+)
+
+
+def _key(owner_id, resource):
+    return 'feeder:version:%s:%s' % (owner_id, resource)
+
+
+def get_version(owner_id, resource):
+    """
+    Return version as timestamp, also used as Last-Modified.
+    Missing version (new owner or evicted) started from now,
+    so client never get 304 for unknown state.
+    """
+    key = _key(owner_id, resource)
+    version = cache.get(key)
+
+    if version is None:
+        version = time.time()
+        # keep the first if other request set it already
+        if not cache.add(key, version, timeout=settings.FEEDER_VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+def bump(owner_ids, resources, using=None):
+    """
+    Set new version for each owner and resource after commit,
+    rolled back change keep the old version
+    """
+    owner_ids = set(i for i in owner_ids if i)
+    if not owner_ids or not resources:
+        return
+
+    def _bump():
+        version = time.time()
+        cache.set_many(
+            {_key(o, r): version for o in owner_ids for r in resources},
+            timeout=settings.FEEDER_VERSION_TIMEOUT
+        )
+
+    transaction.on_commit(_bump, using=using)
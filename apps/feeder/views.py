@@ -1,3 +1,30 @@
-from django.shortcuts import render
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
 
-# Create your views here.
+from . import metrics
+from .conf import settings
+
+
+def can_scrape(request):
+    """
+    Bearer FEEDER_METRICS_TOKEN for the scraper or a staff session,
+    client address useless behind the reverse proxy
+    """
+    token = settings.FEEDER_METRICS_TOKEN
+    authorization = request.META.get('HTTP_AUTHORIZATION', '')
+    if token and constant_time_compare(authorization, 'Bearer %s' % token):
+        return True
+
+    user = getattr(request, 'user', None)
+    return bool(user and user.is_authenticated and user.is_staff)
+
+
+def metrics_view(request):
+    """Histograms in Prometheus text format, internal only"""
+    if not can_scrape(request):
+        raise Http404()
+
+    return HttpResponse(
+        metrics.expose(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -4,5 +4,13 @@ from appconf import AppConf
 
 
 class NotifierAppConf(AppConf):
+    # Relay of apps.notifier.outbox, see `manage.py relay_outbox`
+    # failed publish retried after RETRY_DELAY * attempts seconds
+    OUTBOX_BATCH_SIZE = 200
+    OUTBOX_POLL_INTERVAL = 1
+    OUTBOX_RETRY_DELAY = 5
+    OUTBOX_MAX_ATTEMPTS = 10
+    OUTBOX_KEEP_DAYS = 7
+
     class Meta:
         perefix = 'notifier'
@@ -0,0 +1,44 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.notifier import outbox
+from apps.notifier.conf import settings
+
+
+class Command(BaseCommand):
+    """
+    Publish outbox messages to celery, run as long lived process
+    beside the workers. Full batch relayed again without waiting.
+
+        python manage.py relay_outbox
+        python manage.py relay_outbox --once
+        python manage.py relay_outbox --purge 7
+    """
+    help = "Relay transactional outbox to celery"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="One batch then exit")
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--interval', type=float, default=None,
+                            help="Seconds to wait when nothing pending")
+        parser.add_argument('--purge', type=int, default=None, metavar='DAYS',
+                            help="Delete sent messages older than DAYS then exit")
+
+    def handle(self, *args, **options):
+        if options['purge'] is not None:
+            deleted = outbox.purge(days=options['purge'])
+            self.stdout.write(self.style.SUCCESS("%s messages deleted" % deleted))
+            return
+
+        batch_size = options['batch_size'] or settings.NOTIFIER_OUTBOX_BATCH_SIZE
+        interval = options['interval'] or settings.NOTIFIER_OUTBOX_POLL_INTERVAL
+
+        while True:
+            sent = outbox.relay(batch_size=batch_size)
+            if options['once']:
+                self.stdout.write(self.style.SUCCESS("%s messages relayed" % sent))
+                return
+
+            if sent < batch_size:
+                time.sleep(interval)
@@ -1,6 +1,7 @@
 from simple_history.models import HistoricalRecords
 
 from .notification import *
+from .outbox import *
 from ..utils import is_model_registered
 
 __all__ = list()
@@ -15,3 +16,13 @@ if not is_model_registered('notifier', 'Notification'):
             pass
 
     __all__.append('Notification')
+
+
+# 2
+if not is_model_registered('notifier', 'Outbox'):
+    # delivery log, no history
+    class Outbox(AbstractOutbox):
+        class Meta(AbstractOutbox.Meta):
+            pass
+
+    __all__.append('Outbox')
@@ -0,0 +1,37 @@
+from django.db import models
+from django.utils import timezone
+
+
+class AbstractOutbox(models.Model):
+    """
+    Task message written in the same transaction as the change raising
+    it, published to celery after commit by apps.notifier.outbox.relay.
+
+    :aggregate      messages with same aggregate published in id order
+    :task           registered celery task name, called with payload
+    :available_at   next attempt, pushed back after publish failed
+    :failed_at      gave up after NOTIFIER_OUTBOX_MAX_ATTEMPTS, no longer
+                    relayed nor blocking its aggregate
+    """
+    aggregate = models.CharField(max_length=255)
+    task = models.CharField(max_length=255)
+    payload = models.JSONField(default=dict)
+
+    attempts = models.PositiveIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    failed_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(null=True, blank=True)
+    create_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        app_label = 'notifier'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['sent_at', 'failed_at', 'available_at', 'id']),
+            models.Index(fields=['aggregate', 'id']),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {}'.format(self.aggregate, self.task)
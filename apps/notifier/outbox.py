@@ -0,0 +1,124 @@
+"""
+Transactional outbox. Side effect raised inside a transaction written
+as Outbox row in that same transaction, so it exist only when the
+change committed. `relay` publish pending rows to celery in id order
+and mark them sent, run by `manage.py relay_outbox`.
+
+Delivery at least once (crash between publish and mark resend), task
+must be idempotent. Row of an aggregate never published before an
+older pending row of the same aggregate. Row failed
+NOTIFIER_OUTBOX_MAX_ATTEMPTS times marked failed, kept with last_error.
+"""
+import datetime
+import logging
+
+from celery.utils.imports import symbol_by_name
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Min
+from django.utils import timezone
+
+from config import batching
+
+from .conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue(task, payload, aggregate, using=None):
+    """
+    Write message for task (name) with payload, in DEBUG the task run
+    inline after commit like other `.delay()` call site
+    """
+    Outbox = apps.get_registered_model('notifier', 'Outbox')
+    message = Outbox.objects.using(using).create(
+        task=task,
+        payload=payload,
+        aggregate=aggregate
+    )
+
+    if settings.DEBUG:
+        transaction.on_commit(lambda: relay(using=using), using=using)  # without celery
+    return message
+
+
+def publish(message):
+    if settings.DEBUG:
+        # task module may not imported yet in web process
+        symbol_by_name(message.task)(message.payload)
+    else:
+        # sms and notification grouped, see config/batching.py
+        batching.send_task(message.task, message.payload)
+
+
+def relay(batch_size=None, using=None):
+    """
+    Publish one batch of due messages, return published count.
+    Rows locked with skip locked so several relay can run.
+    """
+    Outbox = apps.get_registered_model('notifier', 'Outbox')
+    batch_size = batch_size or settings.NOTIFIER_OUTBOX_BATCH_SIZE
+    max_attempts = settings.NOTIFIER_OUTBOX_MAX_ATTEMPTS
+    now = timezone.now()
+
+    pending = Outbox.objects.using(using) \
+        .filter(sent_at__isnull=True, failed_at__isnull=True, attempts__lt=max_attempts)
+    sent = list()
+
+    with transaction.atomic(using=using):
+        messages = list(
+            pending
+            .select_for_update(skip_locked=True)
+            .filter(available_at__lte=now)
+            .order_by('id')[:batch_size]
+        )
+
+        # oldest waiting (retry delay, locked by other relay) row of
+        # each aggregate, newer rows wait behind it
+        blocked = dict(
+            pending
+            .filter(aggregate__in=set(m.aggregate for m in messages))
+            .exclude(id__in=[m.id for m in messages])
+            .order_by()
+            .values('aggregate')
+            .annotate(first_id=Min('id'))
+            .values_list('aggregate', 'first_id')
+        )
+
+        for message in messages:
+            if message.id > blocked.get(message.aggregate, message.id):
+                continue
+
+            try:
+                publish(message)
+            except Exception as e:
+                logger.exception("Outbox %s publish failed", message.id)
+                blocked.setdefault(message.aggregate, message.id)
+
+                message.attempts += 1
+                message.last_error = str(e)
+                message.available_at = now + datetime.timedelta(
+                    seconds=settings.NOTIFIER_OUTBOX_RETRY_DELAY * message.attempts
+                )
+                if message.attempts >= max_attempts:
+                    message.failed_at = now
+
+                message.save(update_fields=['attempts', 'last_error', 'available_at', 'failed_at'])
+            else:
+                sent.append(message.id)
+
+        if sent:
+            Outbox.objects.using(using).filter(id__in=sent).update(sent_at=now)
+    return len(sent)
+
+
+def purge(days=None, using=None):
+    """Delete sent messages older than days"""
+    Outbox = apps.get_registered_model('notifier', 'Outbox')
+    days = settings.NOTIFIER_OUTBOX_KEEP_DAYS if days is None else days
+    until = timezone.now() - datetime.timedelta(days=days)
+
+    deleted, _rows = Outbox.objects.using(using) \
+        .filter(sent_at__lt=until) \
+        .delete()
+    return deleted
@@ -1,8 +1,9 @@
 from celery import shared_task
+from config import batching
 from .signals import notify
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_notification(context):
     actor = context.pop('actor')
 
@@ -10,3 +11,13 @@ def send_notification(context):
         actor,
         **context
     )
+
+
+@shared_task(ignore_result=True)
+def send_notification_batch():
+    batching.drain(send_notification_batch, send_notification)
+
+
+def queue_notification(context):
+    """send_notification, grouped when TASK_BATCH_ENABLED"""
+    batching.delay(send_notification, context)
@@ -1,3 +1,201 @@
-from django.test import TestCase
+import json
+from unittest import mock
 
-# Create your tests here.
+from django.apps import apps
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.feeder import tasks as feeder_tasks
+from config import batching
+from . import outbox
+
+Outbox = apps.get_registered_model('notifier', 'Outbox')
+
+
+@override_settings(NOTIFIER_OUTBOX_MAX_ATTEMPTS=2)
+class OutboxRelayTest(TestCase):
+    def enqueue(self, aggregate, **kwargs):
+        return Outbox.objects.create(task='apps.notifier.tasks.send_notification',
+                                     aggregate=aggregate, **kwargs)
+
+    def relay(self, fail=()):
+        published = list()
+
+        def publish(message):
+            if message.id in fail:
+                raise ValueError("broker down")
+            published.append(message.id)
+
+        with mock.patch.object(outbox, 'publish', side_effect=publish):
+            outbox.relay()
+        return published
+
+    def test_publish_in_order(self):
+        first = self.enqueue('a')
+        second = self.enqueue('a')
+        other = self.enqueue('b')
+
+        self.assertEqual(self.relay(), [first.id, second.id, other.id])
+        self.assertFalse(Outbox.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(self.relay(), [])
+
+    def test_failed_block_its_aggregate_only(self):
+        first = self.enqueue('a')
+        self.enqueue('a')
+        other = self.enqueue('b')
+
+        with self.assertLogs('apps.notifier.outbox', 'ERROR'):
+            self.assertEqual(self.relay(fail={first.id}), [other.id])
+
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 1)
+        self.assertEqual(first.last_error, "broker down")
+        self.assertGreater(first.available_at, timezone.now())
+
+        # waiting for retry, newer row of the aggregate wait too
+        self.assertEqual(self.relay(), [])
+
+    def test_exhausted_marked_failed(self):
+        first = self.enqueue('a', attempts=1)
+        second = self.enqueue('a')
+
+        with self.assertLogs('apps.notifier.outbox', 'ERROR'):
+            self.assertEqual(self.relay(fail={first.id}), [])
+
+        first.refresh_from_db()
+        self.assertEqual(first.attempts, 2)
+        self.assertIsNotNone(first.failed_at)
+
+        # no longer relayed nor blocking
+        self.assertEqual(self.relay(), [second.id])
+
+    def test_dead_rows_not_starving_batch(self):
+        later = timezone.now() + timezone.timedelta(hours=1)
+        for i in range(3):
+            self.enqueue('dead', attempts=2)
+            self.enqueue('later', available_at=later)
+        due = self.enqueue('due')
+
+        with override_settings(NOTIFIER_OUTBOX_BATCH_SIZE=1):
+            self.assertEqual(self.relay(), [due.id])
+
+
+class FakeRedis:
+    """Lists and set nx of redis used by config.batching"""
+    def __init__(self):
+        self.data = dict()
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.data:
+            return None
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        self.data.pop(key, None)
+
+    def rpush(self, key, value):
+        self.data.setdefault(key, []).append(value)
+
+    def lmove(self, source, destination, src, dest):
+        items = self.data.get(source)
+        if not items:
+            return None
+        value = items.pop(0 if src == 'LEFT' else -1)
+        target = self.data.setdefault(destination, [])
+        target.insert(0 if dest == 'LEFT' else len(target), value)
+        return value
+
+    def lrem(self, key, count, value):
+        self.data.get(key, []).remove(value)
+
+    def llen(self, key):
+        return len(self.data.get(key, []))
+
+    def payloads(self, key):
+        return [json.loads(raw) for raw in self.data.get(key, [])]
+
+
+@override_settings(TASK_BATCH_ENABLED=True, TASK_BATCH_MAX_ATTEMPTS=2)
+class BatchingTest(TestCase):
+    key = 'celery:batch:apps.feeder.tasks.send_sms_batch'
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        patcher = mock.patch.object(batching, 'get_redis', return_value=self.redis)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        patcher = mock.patch.object(batching, 'current_app')
+        self.current_app = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def queue(self, *msisdns):
+        for msisdn in msisdns:
+            feeder_tasks.queue_sms({'msisdn': msisdn, 'message': 'Hi'})
+
+    def flush(self, fail=()):
+        sent = list()
+
+        def send(msisdn, message):
+            if msisdn in fail:
+                raise ValueError("gateway down")
+            sent.append(msisdn)
+
+        with mock.patch.object(feeder_tasks, 'digihub_send_sms', side_effect=send):
+            feeder_tasks.send_sms_batch()
+        return sent
+
+    def test_grouped_in_one_flush(self):
+        self.queue('1', '2', '3')
+        # one flush scheduled for the three
+        self.current_app.send_task.assert_called_once_with(
+            'apps.feeder.tasks.send_sms_batch', countdown=2
+        )
+        self.assertEqual(self.flush(), ['1', '2', '3'])
+        self.assertEqual(self.redis.llen(self.key), 0)
+
+    def test_failed_payload_kept(self):
+        self.queue('1', '2')
+
+        with self.assertLogs('config.batching', 'ERROR'):
+            self.assertEqual(self.flush(fail={'1'}), ['2'])
+
+        self.assertEqual(self.redis.payloads(self.key), [
+            {'data': {'msisdn': '1', 'message': 'Hi'}, 'attempts': 1}
+        ])
+        self.assertEqual(self.redis.llen(self.key + ':processing'), 0)
+        self.assertEqual(self.flush(), ['1'])
+
+    def test_exhausted_payload_dropped(self):
+        self.queue('1')
+        with self.assertLogs('config.batching', 'ERROR'):
+            self.flush(fail={'1'})
+            self.flush(fail={'1'})
+        self.assertEqual(self.redis.llen(self.key), 0)
+
+    def test_lost_worker_payload_recovered(self):
+        self.queue('1', '2')
+        # worker killed after taking the first one
+        self.redis.lmove(self.key, self.key + ':processing', 'LEFT', 'RIGHT')
+
+        self.assertEqual(self.flush(), ['1', '2'])
+        self.assertEqual(self.redis.llen(self.key + ':processing'), 0)
+
+    def test_flush_running_not_overlapped(self):
+        self.queue('1')
+        self.redis.set(self.key + ':lock', 1)
+        self.assertEqual(self.flush(), [])
+        self.assertEqual(self.redis.llen(self.key), 1)
+
+    def test_outbox_routing(self):
+        sms = Outbox(task='apps.feeder.tasks.send_sms', payload={'msisdn': '1'})
+        otp = Outbox(task='apps.person.tasks.send_securecode_msisdn', payload={'msisdn': '1'})
+        outbox.publish(sms)
+        outbox.publish(otp)
+
+        self.assertEqual(self.redis.payloads(self.key), [{'data': {'msisdn': '1'}, 'attempts': 0}])
+        # OTP one by one on its queue
+        self.current_app.send_task.assert_called_with(
+            'apps.person.tasks.send_securecode_msisdn', args=[{'msisdn': '1'}]
+        )
@@ -5,8 +5,8 @@ from rest_framework import status as response_status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
-from rest_framework.throttling import AnonRateThrottle
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import RecoveryPasswordSerializer
 
 
@@ -27,7 +27,7 @@ class RecoveryPasswordAPIView(APIView):
         }
     """
     permission_classes = (AllowAny,)
-    throttle_classes = (AnonRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     @transaction.atomic()
     def post(self, request, format=None):
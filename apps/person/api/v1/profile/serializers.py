@@ -4,16 +4,29 @@ from django.db import transaction
 
 from rest_framework import serializers
 
+from ....attributes import representation
+from ....images import variant_urls
+
 Profile = apps.get_model('person', 'Profile')
 
 
 class BaseProfileSerializer(serializers.ModelSerializer):
     # from user instance
     name = serializers.CharField()
+    picture_variants = serializers.SerializerMethodField()
+    attributes = serializers.SerializerMethodField()
 
     class Meta:
         model = Profile
-        fields = '__all__'
+        exclude = ('picture_digest',)
+
+    def get_picture_variants(self, instance):
+        # None until rendered, client fallback to picture
+        return variant_urls(instance.picture_digest, self.context.get('request'))
+
+    def get_attributes(self, instance):
+        # denormalized document, no query
+        return representation(instance.attributes, self.context.get('request'))
 
 
 class RetrieveProfileSerializer(BaseProfileSerializer):
@@ -24,6 +37,7 @@ class UpdateProfileSerializer(BaseProfileSerializer):
     first_name = serializers.CharField(required=False)
 
     class Meta(BaseProfileSerializer.Meta):
+        exclude = None
         fields = ('first_name', 'headline', 'gender', 'birthdate', 'about',
                   'picture', 'address', 'latitude', 'longitude',)
 
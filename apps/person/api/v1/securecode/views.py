@@ -5,9 +5,10 @@ from django.core.exceptions import ObjectDoesNotExist, ValidationError as Django
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import viewsets, status as response_status
 from rest_framework.permissions import AllowAny
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from rest_framework.response import Response
 
+from api.idempotency import idempotent
+from api.throttling import SlidingWindowThrottle
 from .serializers import GenerateSecureCodeSerializer, ValidateSecureCodeSerializer
 
 SecureCode = apps.get_model('person', 'SecureCode')
@@ -15,7 +16,7 @@ SecureCode = apps.get_model('person', 'SecureCode')
 
 class BaseViewSet(viewsets.ViewSet):
     permission_classes = (AllowAny,)
-    throttle_classes = (AnonRateThrottle, UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
 
     def __init__(self, **kwargs) -> None:
         super().__init__(**kwargs)
@@ -44,6 +45,9 @@ class SecureCodeViewSet(BaseViewSet):
         }
     """
     lookup_field = 'passcode'
+    throttle_limits = {
+        'create': (('ip', 'securecode_ip'), ('issuer', 'securecode_issuer'),),
+    }
 
     def queryset(self, **kwargs):
         try:
@@ -51,6 +55,7 @@ class SecureCodeViewSet(BaseViewSet):
         except ObjectDoesNotExist:
             raise NotFound()
 
+    @idempotent('securecode')
     @transaction.atomic
     def create(self, request, format=None):
         serializer = GenerateSecureCodeSerializer(
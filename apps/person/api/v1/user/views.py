@@ -7,7 +7,6 @@ from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework import viewsets, status as response_status
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework.throttling import AnonRateThrottle, UserRateThrottle
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from rest_framework.parsers import JSONParser, MultiPartParser
@@ -15,6 +14,7 @@ from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.views import TokenObtainPairView
 
+from api.throttling import SlidingWindowThrottle
 from .serializers import (
     CreateUserSerializer,
     ListUserSerializer,
@@ -25,6 +25,7 @@ from .serializers import (
 from ..profile.serializers import UpdateProfileSerializer
 from ..password.serializers import ChangePasswordSerializer
 from ....helpers import build_result_pagination
+from .... import attributes
 
 UserModel = get_user_model()
 Profile = apps.get_model('person', 'Profile')
@@ -74,7 +75,7 @@ class UserViewSet(BaseViewSet):
         }
     """
     lookup_field = 'hexid'
-    throttle_classes = (AnonRateThrottle, UserRateThrottle,)
+    throttle_classes = (SlidingWindowThrottle,)
     permission_classes = (AllowAny,)
     permission_action = {
         'create': (AllowAny,),
@@ -203,6 +204,40 @@ class UserViewSet(BaseViewSet):
             return Response(serializer.data, status=response_status.HTTP_200_OK)
         return Response(serializer.errors, status=response_status.HTTP_406_NOT_ACCEPTABLE)
 
+    # bulk read and write attribute values of current user
+    @action(
+        detail=True,
+        methods=['get', 'patch'],
+        url_name='attributes',
+        url_path='attributes',
+        permission_classes=(IsAuthenticated,),
+        parser_classes=(JSONParser, MultiPartParser,)
+    )
+    def attribute_values(self, request, hexid=None, format=None):
+        if request.user.hexid != hexid:
+            raise NotFound()
+
+        if request.method == 'GET':
+            document = Profile.objects \
+                .filter(user_id=request.user.id) \
+                .values_list('attributes', flat=True) \
+                .first()
+        else:
+            data = request.data
+            values = data.dict() if hasattr(data, 'dict') else data
+            if not isinstance(values, dict):
+                raise ValidationError(detail={'non_field_errors': ["Expected an object."]})
+
+            try:
+                document = attributes.save_values(request.user, values)
+            except DjangoValidationError as e:
+                raise ValidationError(detail=e.message_dict)
+
+        return Response(
+            attributes.representation(document, request),
+            status=response_status.HTTP_200_OK
+        )
+
     # change password
     @transaction.atomic
     @action(
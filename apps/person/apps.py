@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete
 
 
 class PersonConfig(AppConfig):
@@ -13,10 +13,16 @@ class PersonConfig(AppConfig):
         from .signals import (
             user_save_handler,
             group_save_handler,
-            securecode_save_handler
+            securecode_save_handler,
+            image_save_handler,
+            attribute_save_handler,
+            attribute_value_handler
         )
+        from .images import IMAGE_FIELDS
 
         SecureCode = self.get_model('SecureCode')
+        Attribute = self.get_model('Attribute')
+        AttributeValue = self.get_model('AttributeValue')
 
         # User
         post_save.connect(user_save_handler, sender=settings.AUTH_USER_MODEL,
@@ -29,3 +35,19 @@ class PersonConfig(AppConfig):
         # Group
         post_save.connect(group_save_handler, sender=Group,
                           dispatch_uid='group_save_signal')
+
+        # Picture variants
+        for label in IMAGE_FIELDS:
+            model = self.get_model(label.split('.')[1])
+            post_save.connect(image_save_handler, sender=model,
+                              dispatch_uid='%s_image_save_signal' % model._meta.model_name)
+
+        # Attribute definitions and per user document
+        post_save.connect(attribute_save_handler, sender=Attribute,
+                          dispatch_uid='attribute_save_signal')
+        post_delete.connect(attribute_save_handler, sender=Attribute,
+                            dispatch_uid='attribute_delete_signal')
+        post_save.connect(attribute_value_handler, sender=AttributeValue,
+                          dispatch_uid='attribute_value_save_signal')
+        post_delete.connect(attribute_value_handler, sender=AttributeValue,
+                            dispatch_uid='attribute_value_delete_signal')
@@ -0,0 +1,254 @@
+"""
+Bulk attribute values of a user. Definitions kept in process for
+PERSON_ATTRIBUTE_CACHE_TIMEOUT (dropped on change in this process),
+values validated together and written with one bulk_create and one
+bulk_update. Profile.attributes hold the JSON document of all values
+so profile read need no query for them.
+"""
+import datetime
+import time
+
+from contextlib import contextmanager
+
+from asgiref.local import Local
+from django.apps import apps
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.translation import gettext_lazy as _
+
+from simple_history.utils import bulk_create_with_history, bulk_update_with_history
+
+from apps.feeder.versions import ALL_RESOURCES, bump
+from .conf import settings
+
+_definitions = None
+_loaded_at = 0
+_state = Local()
+
+
+def get_attributes():
+    """{identifier: Attribute}"""
+    global _definitions, _loaded_at
+
+    if _definitions is None \
+            or time.monotonic() - _loaded_at > settings.PERSON_ATTRIBUTE_CACHE_TIMEOUT:
+        Attribute = apps.get_registered_model('person', 'Attribute')
+        _definitions = {a.identifier: a for a in Attribute.objects.all()}
+        _loaded_at = time.monotonic()
+    return _definitions
+
+
+def get_attribute_by_id(attribute_id):
+    for attribute in get_attributes().values():
+        if attribute.id == attribute_id:
+            return attribute
+    return None
+
+
+def forget_attributes():
+    global _definitions
+    _definitions = None
+
+
+def to_python(attribute, value):
+    """JSON value to what the validator of the type expect"""
+    Types = attribute.Types
+    if not isinstance(value, str):
+        return value
+
+    try:
+        # well formatted but invalid like 2020-13-45 raise
+        if attribute.type == Types.DATE:
+            return parse_date(value) or value
+        if attribute.type == Types.DATETIME:
+            return parse_datetime(value) or value
+    except ValueError:
+        return value
+
+    if attribute.type == Types.INTEGER:
+        return int(value) if value.lstrip('-').isdigit() else value
+    if attribute.type == Types.FLOAT:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def to_json(attribute, value):
+    """Value to document value, file as storage name"""
+    if hasattr(value, 'name') and attribute.is_file:
+        return value.name or None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if attribute.type == attribute.Types.FLOAT and value is not None:
+        return float(value)
+    if attribute.type == attribute.Types.INTEGER and value is not None:
+        return int(value)
+    return value
+
+
+def representation(document, request=None):
+    """Document for response, file name to url"""
+    attributes = get_attributes()
+    ret = dict()
+
+    for identifier, value in (document or {}).items():
+        attribute = attributes.get(identifier)
+        if attribute is None:
+            continue
+
+        if attribute.is_file and value:
+            value = default_storage.url(value)
+            if request is not None:
+                value = request.build_absolute_uri(value)
+        ret[identifier] = value
+    return ret
+
+
+@contextmanager
+def bulk_writing():
+    """Signal handlers skip document refresh, caller write it once"""
+    previous = getattr(_state, 'bulk', False)
+    _state.bulk = True
+
+    try:
+        yield
+    finally:
+        _state.bulk = previous
+
+
+def is_bulk_writing():
+    return getattr(_state, 'bulk', False)
+
+
+def _is_empty(attribute, value):
+    if attribute.is_file:
+        return value is False
+    return value is None or value == ''
+
+
+@transaction.atomic
+def save_values(user, values):
+    """
+    Validate and write {identifier: value}, None or '' (False for
+    file) delete the value. Raise ValidationError with all invalid
+    identifiers, nothing written then. Return the new document.
+
+    File values saved one by one, storage and picture variants need
+    the model save.
+    """
+    AttributeValue = apps.get_registered_model('person', 'AttributeValue')
+    Profile = apps.get_registered_model('person', 'Profile')
+
+    attributes = get_attributes()
+    errors = dict()
+    cleaned = dict()
+
+    for identifier, value in values.items():
+        attribute = attributes.get(identifier)
+        if attribute is None:
+            errors[identifier] = [_("Unknown attribute.")]
+            continue
+
+        if _is_empty(attribute, value) or (attribute.is_file and value is None):
+            cleaned[attribute] = value
+            continue
+
+        value = to_python(attribute, value)
+        try:
+            attribute.validate_value(value)
+        except (ValidationError, TypeError) as e:
+            errors[identifier] = getattr(e, 'messages', [str(e)])
+        else:
+            cleaned[attribute] = value
+
+    if errors:
+        raise ValidationError(errors)
+
+    existing = {
+        obj.attribute_id: obj for obj in AttributeValue.objects
+        .select_for_update()
+        .filter(user=user, attribute_id__in=[a.id for a in cleaned])
+    }
+
+    profile = Profile.objects.select_for_update().get(user=user)
+    document = dict(profile.attributes or {})
+
+    creates = list()
+    updates = list()
+    update_fields = set()
+    deletes = list()
+
+    for attribute, value in cleaned.items():
+        obj = existing.get(attribute.id)
+        field = 'value_%s' % attribute.type
+
+        if attribute.is_file:
+            if value is None:
+                # no change
+                continue
+            with bulk_writing():
+                attribute.save_value(user, value)
+            if value is False:
+                document.pop(attribute.identifier, None)
+            else:
+                obj = AttributeValue.objects.get(user=user, attribute=attribute)
+                document[attribute.identifier] = to_json(attribute, getattr(obj, field))
+            continue
+
+        if _is_empty(attribute, value):
+            if obj is not None:
+                deletes.append(obj.id)
+            document.pop(attribute.identifier, None)
+            continue
+
+        if obj is None:
+            obj = AttributeValue(user=user, attribute=attribute)
+            setattr(obj, field, value)
+            creates.append(obj)
+        elif getattr(obj, field) != value:
+            setattr(obj, field, value)
+            updates.append(obj)
+            update_fields.add(field)
+        document[attribute.identifier] = to_json(attribute, value)
+
+    with bulk_writing():
+        if deletes:
+            AttributeValue.objects.filter(id__in=deletes).delete()
+        if creates:
+            bulk_create_with_history(creates, AttributeValue)
+        if updates:
+            bulk_update_with_history(updates, AttributeValue, list(update_fields))
+
+    # UPDATE send no signal
+    Profile.objects.filter(id=profile.id).update(attributes=document)
+    bump({profile.user_id}, ALL_RESOURCES)
+    return document
+
+
+def build_document(user_id):
+    AttributeValue = apps.get_registered_model('person', 'AttributeValue')
+    document = dict()
+
+    for obj in AttributeValue.objects.filter(user_id=user_id):
+        attribute = get_attribute_by_id(obj.attribute_id)
+        if attribute is None:
+            continue
+
+        value = getattr(obj, 'value_%s' % attribute.type)
+        if value is None or (attribute.is_file and not value):
+            continue
+        document[attribute.identifier] = to_json(attribute, value)
+    return document
+
+
+def refresh_document(user_id):
+    """Rebuild document of one user from the values"""
+    Profile = apps.get_registered_model('person', 'Profile')
+    document = build_document(user_id)
+    Profile.objects.filter(user_id=user_id).update(attributes=document)
+    bump({user_id}, ALL_RESOURCES)
+    return document
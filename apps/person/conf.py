@@ -6,5 +6,18 @@ from appconf import AppConf
 class PersonAppConf(AppConf):
     VERIFICATION_FIELDS = ['msisdn', 'email']
 
+    # Picture variants rendered by celery, see apps.person.images
+    # name: max width and height in px
+    IMAGE_VARIANTS = {'small': 96, 'medium': 320, 'large': 960}
+    IMAGE_FORMATS = ('webp', 'jpeg',)
+    IMAGE_QUALITY = 82
+    IMAGE_VARIANT_PATH = 'images/variants'
+
+    # Attribute definitions kept in process, see apps.person.attributes
+    ATTRIBUTE_CACHE_TIMEOUT = 60
+
+    # Candidate rows checked per haversine batch, see apps.person.geo
+    GEO_BATCH_SIZE = 2000
+
     class Meta:
         perefix = 'person'
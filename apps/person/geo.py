@@ -0,0 +1,208 @@
+"""
+Geohash of profile location. Cell prefix share the prefix of every
+point inside, so nearby lookup is 9 prefix range scans (cell of the
+point and its neighbours) on the geohash index, then exact haversine
+distance of the candidates computed per batch (numpy when installed).
+"""
+import heapq
+import math
+
+from django.apps import apps
+from django.db.models import Q
+
+from .conf import settings
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS = 6371008.8  # meter
+PRECISION = 12
+
+# precision: (cell height, cell width at equator) in meter
+CELL_SIZES = {
+    1: (4992600, 5009400),
+    2: (624100, 1252300),
+    3: (156000, 156500),
+    4: (19500, 39100),
+    5: (4900, 4900),
+    6: (609.4, 1200),
+    7: (152.4, 152.9),
+    8: (19, 38.2),
+    9: (4.8, 4.8),
+    10: (0.6, 1.2),
+    11: (0.149, 0.149),
+    12: (0.019, 0.037),
+}
+
+
+def has_location(latitude, longitude):
+    # 0, 0 is the field default, not a real location
+    return latitude is not None and longitude is not None \
+        and not (latitude == 0 and longitude == 0)
+
+
+def encode(latitude, longitude, precision=PRECISION):
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = list()
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if longitude >= mid:
+                bits = bits * 2 + 1
+                lng_range[0] = mid
+            else:
+                bits = bits * 2
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if latitude >= mid:
+                bits = bits * 2 + 1
+                lat_range[0] = mid
+            else:
+                bits = bits * 2
+                lat_range[1] = mid
+
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def bounds(geohash):
+    """(lat min, lat max, lng min, lng max) of the cell"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+
+    for char in geohash:
+        value = BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bit = (value >> shift) & 1
+            target = lng_range if even else lat_range
+            mid = (target[0] + target[1]) / 2
+            target[0 if bit else 1] = mid
+            even = not even
+    return lat_range[0], lat_range[1], lng_range[0], lng_range[1]
+
+
+def neighbours(geohash):
+    """Cell and its 8 neighbours, fewer at the poles"""
+    lat_min, lat_max, lng_min, lng_max = bounds(geohash)
+    lat_step = lat_max - lat_min
+    lng_step = lng_max - lng_min
+    lat_center = (lat_min + lat_max) / 2
+    lng_center = (lng_min + lng_max) / 2
+
+    cells = set()
+    for dlat in (-1, 0, 1):
+        lat = lat_center + dlat * lat_step
+        if lat < -90 or lat > 90:
+            continue
+
+        for dlng in (-1, 0, 1):
+            lng = (lng_center + dlng * lng_step + 180) % 360 - 180
+            cells.add(encode(lat, lng, len(geohash)))
+    return cells
+
+
+def precision_for(latitude, radius):
+    """
+    Longest prefix whose cell still wider than radius, None when even
+    one character cell too narrow (huge radius or near the poles)
+    """
+    shrink = max(math.cos(math.radians(latitude)), 0.01)
+    for precision in range(PRECISION, 0, -1):
+        height, width = CELL_SIZES[precision]
+        if min(height, width * shrink) >= radius:
+            return precision
+    return None
+
+
+def covering_cells(latitude, longitude, radius):
+    """Cells covering the radius, None when no precision does"""
+    precision = precision_for(latitude, radius)
+    if precision is None:
+        return None
+    return neighbours(encode(latitude, longitude, precision))
+
+
+def distances(latitude, longitude, latitudes, longitudes):
+    """Haversine distance in meter from one point to many"""
+    if numpy is not None:
+        lat1 = numpy.radians(latitude)
+        lat2 = numpy.radians(numpy.asarray(latitudes, dtype=float))
+        dlat = lat2 - lat1
+        dlng = numpy.radians(numpy.asarray(longitudes, dtype=float) - longitude)
+        a = numpy.sin(dlat / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin(dlng / 2) ** 2
+        return (2 * EARTH_RADIUS * numpy.arcsin(numpy.sqrt(a))).tolist()
+
+    lat1 = math.radians(latitude)
+    cos_lat1 = math.cos(lat1)
+    ret = list()
+
+    for lat, lng in zip(latitudes, longitudes):
+        lat2 = math.radians(lat)
+        a = math.sin((lat2 - lat1) / 2) ** 2 \
+            + cos_lat1 * math.cos(lat2) * math.sin(math.radians(lng - longitude) / 2) ** 2
+        ret.append(2 * EARTH_RADIUS * math.asin(math.sqrt(a)))
+    return ret
+
+
+def nearby(latitude, longitude, radius, limit=None, queryset=None):
+    """
+    Return [(user_id, distance in meter)] of profiles within radius,
+    nearest first. No GIS needed, candidates from covering cells then
+    filtered by exact distance PERSON_GEO_BATCH_SIZE rows at a time.
+
+    :radius     in meter
+    :queryset   of Profile to narrow, default all profiles
+    """
+    if queryset is None:
+        queryset = apps.get_registered_model('person', 'Profile').objects.all()
+
+    # without covering cells only the latitude band below narrow
+    cells = Q()
+    for cell in covering_cells(latitude, longitude, radius) or ():
+        cells |= Q(geohash__startswith=cell)
+
+    # latitude span is the same everywhere, cheap filter on index
+    span = math.degrees(radius / EARTH_RADIUS)
+    rows = queryset \
+        .filter(cells, geohash__isnull=False,
+                latitude__gte=latitude - span, latitude__lte=latitude + span) \
+        .order_by() \
+        .values_list('user_id', 'latitude', 'longitude')
+
+    batch_size = settings.PERSON_GEO_BATCH_SIZE
+    found = list()
+    batch = list()
+
+    def flush():
+        user_ids, lats, lngs = zip(*batch)
+        for user_id, distance in zip(user_ids, distances(latitude, longitude, lats, lngs)):
+            if distance <= radius:
+                found.append((user_id, distance))
+        batch.clear()
+
+    for row in rows.iterator(chunk_size=batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            flush()
+
+    if batch:
+        flush()
+
+    if limit is not None:
+        return heapq.nsmallest(limit, found, key=lambda item: item[1])
+    return sorted(found, key=lambda item: item[1])
@@ -0,0 +1,190 @@
+"""
+Picture variants. Original decoded once, orientation applied, then
+downscaled step by step (largest variant first) to every
+PERSON_IMAGE_VARIANTS size in every PERSON_IMAGE_FORMATS. Variants
+carry no metadata (EXIF, GPS).
+
+Variants named by sha256 of the original, identical upload rendered
+once. Model keep the digest, see IMAGE_FIELDS.
+"""
+import hashlib
+import io
+import logging
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from apps.feeder.versions import ALL_RESOURCES, bump
+from .conf import settings
+
+logger = logging.getLogger(__name__)
+
+# model label: (image field, digest field)
+IMAGE_FIELDS = {
+    'person.Profile': ('picture', 'picture_digest'),
+    'person.AttributeValue': ('value_image', 'value_image_digest'),
+}
+
+# format: (Pillow format, extension)
+FORMATS = {
+    'webp': ('WEBP', 'webp'),
+    'jpeg': ('JPEG', 'jpg'),
+}
+
+
+def get_variants():
+    """Largest first, each one resized from the previous"""
+    return sorted(settings.PERSON_IMAGE_VARIANTS.items(), key=lambda x: -x[1])
+
+
+def variant_name(digest, size_name, size, fmt):
+    return '%s/%s/%s/%s-%d.%s' % (
+        settings.PERSON_IMAGE_VARIANT_PATH,
+        digest[:2],
+        digest,
+        size_name,
+        size,
+        FORMATS[fmt][1]
+    )
+
+
+def variant_names(digest):
+    return {
+        (size_name, fmt): variant_name(digest, size_name, size, fmt)
+        for size_name, size in get_variants()
+        for fmt in settings.PERSON_IMAGE_FORMATS
+    }
+
+
+def variant_urls(digest, request=None, storage=None):
+    """{size name: {format: url}}, None before rendered"""
+    if not digest:
+        return None
+
+    storage = storage or default_storage
+    urls = dict()
+
+    for (size_name, fmt), name in variant_names(digest).items():
+        url = storage.url(name)
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        urls.setdefault(size_name, dict())[fmt] = url
+    return urls
+
+
+def encode(image, fmt):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    quality = settings.PERSON_IMAGE_QUALITY
+
+    if fmt == 'jpeg':
+        if image.mode != 'RGB':
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            if image.mode in ('RGBA', 'LA'):
+                background.paste(image, mask=image.getchannel('A'))
+            else:
+                background.paste(image.convert('RGB'))
+            image = background
+        image.save(buffer, 'JPEG', quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, FORMATS[fmt][0], quality=quality)
+    return buffer.getvalue()
+
+
+def render(name, storage=None):
+    """Render variants of stored file name, return digest"""
+    # Pillow only loaded by worker which render
+    from PIL import Image, ImageOps
+
+    storage = storage or default_storage
+
+    with storage.open(name, 'rb') as f:
+        data = f.read()
+
+    digest = hashlib.sha256(data).hexdigest()
+    names = variant_names(digest)
+    missing = {key: n for key, n in names.items() if not storage.exists(n)}
+
+    # same content rendered before
+    if not missing:
+        return digest
+
+    image = Image.open(io.BytesIO(data))
+    variants = get_variants()
+
+    # jpeg decoded at reduced scale when far bigger than largest variant
+    largest = variants[0][1]
+    image.draft('RGB', (largest, largest))
+    image = ImageOps.exif_transpose(image)
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    for size_name, size in variants:
+        image = image.copy()
+        image.thumbnail((size, size), Image.LANCZOS)
+
+        for fmt in settings.PERSON_IMAGE_FORMATS:
+            variant = missing.get((size_name, fmt))
+            if variant:
+                storage.save(variant, ContentFile(encode(image, fmt)))
+    return digest
+
+
+def safe_render(name):
+    try:
+        return render(name)
+    except Exception:
+        logger.exception("Render %s failed", name)
+        return None
+
+
+def forget_digest(instance, update_fields=None):
+    """
+    Clear digest of an image changed since loaded, in the same save so
+    old variants never served for the new image. Return update_fields
+    with the digest field when the image in it.
+    """
+    field, digest_field = IMAGE_FIELDS[instance._meta.label]
+    name = getattr(instance, field).name or None
+    loaded = getattr(instance, '_loaded_%s' % field, None) or None
+
+    if name == loaded:
+        return update_fields
+
+    setattr(instance, digest_field, None)
+    if update_fields is not None and field in update_fields:
+        return {*update_fields, digest_field}
+    return update_fields
+
+
+def init_worker():
+    """ProcessPoolExecutor initializer for spawned process"""
+    import django
+
+    if not apps.ready:
+        django.setup()
+
+
+def process(label, pk):
+    """Render variants of one row and store the digest"""
+    model = apps.get_model(label)
+    field, digest_field = IMAGE_FIELDS[label]
+    name, user_id = model._default_manager \
+        .filter(pk=pk) \
+        .values_list(field, 'user_id') \
+        .first() or (None, None)
+
+    digest = safe_render(name) if name else None
+
+    # skip when replaced while rendering, next task handle it
+    updated = model._default_manager \
+        .filter(pk=pk, **{field: name}) \
+        .update(**{digest_field: digest})
+
+    if updated:
+        # picture variants embedded in owner responses, UPDATE send no signal
+        bump({user_id}, ALL_RESOURCES)
+    return digest
@@ -0,0 +1,45 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.person import geo
+
+
+class Command(BaseCommand):
+    """
+    Fill Profile.geohash from latitude and longitude, needed once
+    after adding the field, saved profiles keep it up to date.
+
+        python manage.py index_locations
+    """
+    help = "Compute geohash of profile locations"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        Profile = apps.get_registered_model('person', 'Profile')
+        batch_size = options['batch_size']
+        rows = Profile.objects \
+            .order_by() \
+            .values_list('id', 'latitude', 'longitude', 'geohash')
+
+        total = 0
+        batch = list()
+
+        for pk, latitude, longitude, current in rows.iterator(chunk_size=batch_size):
+            value = geo.encode(latitude, longitude) \
+                if geo.has_location(latitude, longitude) else None
+
+            if value != current:
+                batch.append(Profile(id=pk, geohash=value))
+
+            if len(batch) >= batch_size:
+                Profile.objects.bulk_update(batch, ['geohash'])
+                total += len(batch)
+                batch = list()
+
+        if batch:
+            Profile.objects.bulk_update(batch, ['geohash'])
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS("%s profiles indexed" % total))
@@ -0,0 +1,76 @@
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.feeder.versions import ALL_RESOURCES, bump
+from apps.person import images
+
+
+class Command(BaseCommand):
+    """
+    Render picture variants of existing rows across a process pool,
+    database read and written by this process only.
+
+        python manage.py process_images --missing
+        python manage.py process_images --model person.Profile --workers 8
+    """
+    help = "Render picture variants in bulk"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=list(images.IMAGE_FIELDS), default=None)
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+        parser.add_argument('--missing', action='store_true',
+                            help="Only rows without digest")
+        parser.add_argument('--chunk-size', type=int, default=8)
+
+    def handle(self, *args, **options):
+        labels = [options['model']] if options['model'] else list(images.IMAGE_FIELDS)
+
+        for label in labels:
+            model = apps.get_model(label)
+            field, digest_field = images.IMAGE_FIELDS[label]
+
+            rows = model._default_manager \
+                .exclude(**{field: ''}) \
+                .exclude(**{'%s__isnull' % field: True})
+
+            if options['missing']:
+                rows = rows.filter(**{'%s__isnull' % digest_field: True})
+
+            rows = list(rows.order_by('pk').values_list('pk', field, 'user_id'))
+            if not rows:
+                continue
+
+            # forked worker must not share the connection
+            connections.close_all()
+
+            done = 0
+            user_ids = set()
+            with ProcessPoolExecutor(max_workers=options['workers'],
+                                     initializer=images.init_worker) as pool:
+                names = [name for _pk, name, _user_id in rows]
+                digests = pool.map(images.safe_render, names,
+                                   chunksize=options['chunk_size'])
+
+                for (pk, name, user_id), digest in zip(rows, digests):
+                    if digest is None:
+                        continue
+
+                    updated = model._default_manager \
+                        .filter(pk=pk, **{field: name}) \
+                        .update(**{digest_field: digest})
+
+                    if updated:
+                        done += updated
+                        user_ids.add(user_id)
+
+            # UPDATE send no signal
+            bump(user_ids, ALL_RESOURCES)
+
+            self.stdout.write(self.style.SUCCESS(
+                "%s: %s of %s rendered" % (label, done, len(rows))
+            ))
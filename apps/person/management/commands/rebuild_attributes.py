@@ -0,0 +1,28 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from apps.person import attributes
+
+
+class Command(BaseCommand):
+    """
+    Rebuild Profile.attributes document from attribute values,
+    needed once after adding the field or renaming an identifier.
+
+        python manage.py rebuild_attributes
+    """
+    help = "Rebuild per user attribute documents"
+
+    def handle(self, *args, **options):
+        AttributeValue = apps.get_registered_model('person', 'AttributeValue')
+        user_ids = AttributeValue.objects \
+            .order_by('user_id') \
+            .values_list('user_id', flat=True) \
+            .distinct()
+
+        total = 0
+        for user_id in user_ids.iterator():
+            attributes.refresh_document(user_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS("%s documents rebuilt" % total))
@@ -11,6 +11,8 @@ from django.core.validators import RegexValidator
 from django.utils.html import strip_tags
 from django.utils.safestring import mark_safe
 
+from .. import images
+
 
 class AbstractAttribute(models.Model):
     class Types(models.TextChoices):
@@ -55,7 +57,7 @@ class AbstractAttribute(models.Model):
 
     @property
     def is_file(self):
-        return self.type in [self.FILE, self.IMAGE]
+        return self.type in [self.Types.FILE, self.Types.IMAGE]
 
     def __str__(self):
         return self.label
@@ -204,6 +206,12 @@ class AbstractAttributeValue(models.Model):
         blank=True,
         null=True
     )
+    value_image_digest = models.CharField(
+        max_length=64,
+        blank=True,
+        null=True,
+        editable=False
+    )
 
     def _get_value(self):
         value = getattr(self, 'value_%s' % self.attribute.type)
@@ -229,6 +237,19 @@ class AbstractAttributeValue(models.Model):
     def __str__(self):
         return self.summary()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # image as loaded, variants rendered when it changed
+        instance._loaded_value_image = instance.__dict__.get('value_image')
+        return instance
+
+    def save(self, *args, **kwargs):
+        update_fields = images.forget_digest(self, kwargs.get('update_fields'))
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        return super().save(*args, **kwargs)
+
     def summary(self):
         """
         Gets a string representation of both the attribute and it's value,
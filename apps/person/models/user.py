@@ -10,6 +10,7 @@ from django.utils.text import slugify
 from django.utils import timezone
 from django.contrib.auth.models import Group
 
+from .. import geo, images
 from ..conf import settings
 from ..validators import validate_msisdn
 
@@ -110,7 +111,9 @@ class User(AbstractUser):
 
     def unique_hexid(self):
         while True:
-            object_id = id(timezone.now().timestamp())
+            # microsecond timestamp, id() of a temporary float repeat
+            # the same address and never left the loop
+            object_id = int(timezone.now().timestamp() * 1000000)
             hexid = hex(object_id)
 
             if not self._meta.model.objects.filter(hexid=hexid).exists():
@@ -163,20 +166,60 @@ class AbstractProfile(models.Model):
         null=True,
         blank=True
     )
+    # sha256 of picture, name of rendered variants
+    picture_digest = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False
+    )
     address = models.TextField(blank=True, null=True)
+    # {identifier: value} of attribute values, see apps.person.attributes
+    attributes = models.JSONField(default=dict, blank=True, editable=False)
     latitude = models.FloatField(default=Decimal(0.0), db_index=True)
     longitude = models.FloatField(default=Decimal(0.0), db_index=True)
+    # geohash of latitude and longitude, see apps.person.geo
+    geohash = models.CharField(
+        max_length=12,
+        null=True,
+        blank=True,
+        editable=False
+    )
 
     class Meta:
         abstract = True
         app_label = 'person'
         ordering = ['-user__date_joined']
+        indexes = [
+            # nearby as prefix range scans, coordinates read from index
+            models.Index(fields=['geohash', 'latitude', 'longitude']),
+        ]
         verbose_name = _("Profile")
         verbose_name_plural = _("Profiles")
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # picture as loaded, variants rendered when it changed
+        instance._loaded_picture = instance.__dict__.get('picture')
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.geohash = geo.encode(self.latitude, self.longitude) \
+            if geo.has_location(self.latitude, self.longitude) else None
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'latitude', 'longitude'} & set(update_fields):
+            update_fields = {*update_fields, 'geohash'}
+
+        update_fields = images.forget_digest(self, update_fields)
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        return super().save(*args, **kwargs)
+
     @property
     def name(self):
         full_name = '{}{}'.format(
@@ -4,9 +4,10 @@ from django.db import transaction, IntegrityError
 from django.db.models import Q
 from django.contrib.auth.models import Group
 from django.utils import timezone
-from django.conf import settings
 
-from .tasks import send_securecode_email, send_securecode_msisdn
+from apps.notifier import outbox
+from . import attributes
+from .images import IMAGE_FIELDS
 from .utils import get_users
 
 Profile = apps.get_model('person', 'Profile')
@@ -51,37 +52,24 @@ def securecode_save_handler(sender, instance, created, **kwargs):
         if issuer_type == 'email':
             # Send via email
             data.update({'email': issuer})
-
-            if instance.challenge == challenges.PASSWORD_RECOVERY:
-                for user in get_users(instance.issuer):
-                    # send to multiple users
-                    if settings.DEBUG:
-                        send_securecode_email(data)  # without celery
-                    else:
-                        send_securecode_email.delay(data)  # with celery
-            else:
-                # send to single user
-                if settings.DEBUG:
-                    send_securecode_email(data)  # without celery
-                else:
-                    send_securecode_email.delay(data)  # with celery
+            task = 'apps.person.tasks.send_securecode_email'
         elif issuer_type == 'msisdn':
             # Send via SMS
             data.update({'msisdn': issuer})
+            task = 'apps.person.tasks.send_securecode_msisdn'
+        else:
+            task = None
 
+        if task:
+            # sent after commit, never for rolled back code
+            aggregate = 'securecode:%s' % issuer
             if instance.challenge == challenges.PASSWORD_RECOVERY:
                 for user in get_users(instance.issuer):
                     # send to multiple users
-                    if settings.DEBUG:
-                        send_securecode_msisdn(data)  # without celery
-                    else:
-                        send_securecode_msisdn.delay(data)  # with celery
+                    outbox.enqueue(task, data, aggregate)
             else:
                 # send to single user
-                if settings.DEBUG:
-                    send_securecode_msisdn(data)  # without celery
-                else:
-                    send_securecode_msisdn.delay(data)  # with celery
+                outbox.enqueue(task, data, aggregate)
 
         # mark oldest SecureCode as expired
         cls = instance.__class__
@@ -94,3 +82,34 @@ def securecode_save_handler(sender, instance, created, **kwargs):
 
         if oldest.exists():
             oldest.update(valid_until=timezone.now())
+
+
+def image_save_handler(sender, instance, created, using=None, **kwargs):
+    label = instance._meta.label
+    field, _digest_field = IMAGE_FIELDS[label]
+
+    name = getattr(instance, field).name or None
+    loaded = getattr(instance, '_loaded_%s' % field, None) or None
+
+    if name == loaded:
+        return
+
+    setattr(instance, '_loaded_%s' % field, name)
+    outbox.enqueue(
+        'apps.person.tasks.process_image',
+        {'model': label, 'id': instance.pk},
+        'image:%s:%s' % (label, instance.pk),
+        using=using
+    )
+
+
+def attribute_save_handler(sender, instance, **kwargs):
+    attributes.forget_attributes()
+
+
+def attribute_value_handler(sender, instance, using=None, **kwargs):
+    if attributes.is_bulk_writing():
+        return
+
+    user_id = instance.user_id
+    transaction.on_commit(lambda: attributes.refresh_document(user_id), using=using)
@@ -1,17 +1,17 @@
 import logging
 import smtplib
-import requests
 
 from django.utils.translation import ugettext_lazy as _
 from django.core.mail import BadHeaderError, EmailMultiAlternatives
 
 # Celery config
 from celery import shared_task
+from . import images
 
 APP_NAME = 'Kirim Saran'
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_securecode_email(data):
     logging.info(_("Send secure code email run"))
 
@@ -63,7 +63,7 @@ def send_securecode_email(data):
             _("Tried to send email to non-existing SecureCode Code"))
 
 
-@shared_task
+@shared_task(ignore_result=True)
 def send_securecode_msisdn(data):
     msisdn = data.get('msisdn')
     passcode = data.get('passcode')
@@ -90,5 +90,13 @@ def send_securecode_msisdn(data):
         "Is_Flash": False
     }
 
+    import requests
+
     r = requests.get(url, params=payload)
     logging.info(r.status_code)
+
+
+@shared_task(ignore_result=True)
+def process_image(data):
+    logging.info(_("Process image run"))
+    images.process(data.get('model'), data.get('id'))
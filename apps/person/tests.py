@@ -1,3 +1,137 @@
+from django.apps import apps
+from django.core.cache import cache
 from django.test import TestCase
 
-# Create your tests here.
+from rest_framework.test import APIClient
+
+from . import attributes, geo, images
+
+User = apps.get_registered_model('person', 'User')
+Profile = apps.get_registered_model('person', 'Profile')
+Attribute = apps.get_registered_model('person', 'Attribute')
+AttributeValue = apps.get_registered_model('person', 'AttributeValue')
+
+
+class SecureCodeCreateTest(TestCase):
+    url = '/api/person/v1/securecodes/'
+
+    def setUp(self):
+        cache.clear()
+
+    def test_create_with_idempotency_key(self):
+        # throttle parse the body before the idempotency fingerprint
+        client = APIClient()
+        data = {'issuer': 'someone@example.com', 'challenge': 'validate_email'}
+
+        first = client.post(self.url, data, format='json', HTTP_USER_AGENT='test',
+                            HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(first.status_code, 201)
+
+        replay = client.post(self.url, data, format='json', HTTP_USER_AGENT='test',
+                             HTTP_IDEMPOTENCY_KEY='key-1')
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+
+
+class AttributeValuesTest(TestCase):
+    def setUp(self):
+        attributes.forget_attributes()
+        self.user = User.objects.create_user('someone', 'pass123', email='someone@example.com')
+        self.nickname = Attribute.objects.create(label='Nickname', identifier='nickname')
+        self.age = Attribute.objects.create(label='Age', identifier='age', type=Attribute.Types.INTEGER)
+        self.birthday = Attribute.objects.create(label='Birthday', identifier='birthday',
+                                                 type=Attribute.Types.DATE)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = '/api/person/v1/users/%s/attributes/' % self.user.hexid
+
+    def document(self):
+        return Profile.objects.get(user=self.user).attributes
+
+    def test_bulk_write(self):
+        values = {'nickname': 'Some', 'age': '30', 'birthday': '2000-01-02'}
+        response = self.client.patch(self.url, values, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        expected = {'nickname': 'Some', 'age': 30, 'birthday': '2000-01-02'}
+        self.assertEqual(response.json(), expected)
+        self.assertEqual(self.document(), expected)
+        self.assertEqual(AttributeValue.objects.filter(user=self.user).count(), 3)
+
+        # empty delete the value
+        response = self.client.patch(self.url, {'age': None}, format='json')
+        self.assertEqual(response.json(), {'nickname': 'Some', 'birthday': '2000-01-02'})
+        self.assertEqual(AttributeValue.objects.filter(user=self.user).count(), 2)
+
+    def test_invalid_all_or_nothing(self):
+        values = {'nickname': 'Some', 'age': 'old', 'birthday': '2020-13-45', 'unknown': 1}
+        response = self.client.patch(self.url, values, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'age', 'birthday', 'unknown'})
+        self.assertFalse(AttributeValue.objects.filter(user=self.user).exists())
+        self.assertFalse(self.document())
+
+    def test_document_refreshed_on_single_save(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nickname.save_value(self.user, 'Some')
+        self.assertEqual(self.document(), {'nickname': 'Some'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.nickname.save_value(self.user, None)
+        self.assertEqual(self.document(), {})
+
+
+class PictureTest(TestCase):
+    def setUp(self):
+        user = User.objects.create_user('someone', 'pass123', email='someone@example.com')
+        Profile.objects.filter(user=user).update(picture='old.jpg', picture_digest='old')
+        self.profile = Profile.objects.get(user=user)
+
+    def test_digest_cleared_with_new_picture(self):
+        self.profile.picture = 'new.jpg'
+        self.profile.save(update_fields=['picture'])
+
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.picture.name, 'new.jpg')
+        self.assertIsNone(self.profile.picture_digest)
+
+    def test_digest_kept_when_picture_same(self):
+        self.profile.save()
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.picture_digest, 'old')
+
+    def test_failed_render_logged(self):
+        with self.assertLogs('apps.person.images', 'ERROR'):
+            self.assertIsNone(images.safe_render('missing.jpg'))
+
+
+class NearbyTest(TestCase):
+    def locate(self, username, latitude, longitude):
+        user = User.objects.create_user(username, 'pass123', email='%s@example.com' % username)
+        profile = Profile.objects.get(user=user)
+        profile.latitude, profile.longitude = latitude, longitude
+        profile.save()
+        return user
+
+    def test_nearby(self):
+        near = self.locate('near', -6.2, 106.8)
+        far = self.locate('far', -7.8, 110.4)
+
+        found = geo.nearby(-6.21, 106.81, 5000)
+        self.assertEqual([user_id for user_id, _distance in found], [near.id])
+
+        found = geo.nearby(-6.21, 106.81, 500000)
+        self.assertEqual([user_id for user_id, _distance in found], [near.id, far.id])
+
+    def test_radius_wider_than_any_cell(self):
+        self.assertIsNone(geo.precision_for(0, 6000000))
+
+        # south of the neighbour cells around the point
+        east = self.locate('east', 1, 170)
+        south = self.locate('south', -50, 179)
+        self.locate('unlocated', 0, 0)
+
+        found = geo.nearby(1, 179, 6000000)
+        self.assertEqual([user_id for user_id, _distance in found], [east.id, south.id])
@@ -1,4 +1,3 @@
-import phonenumbers
 import unicodedata
 
 from django.core.exceptions import ValidationError
@@ -31,6 +30,8 @@ def get_issuer_type(value):
     """
     # Msisdn
     if value.isnumeric():
+        import phonenumbers
+
         try:
             locale_number = phonenumbers.parse(value, 'ID')
             if phonenumbers.is_valid_number(locale_number):
@@ -1,5 +1,3 @@
-import phonenumbers
-
 from django.core.exceptions import ValidationError
 from django.core.validators import validate_email
 from django.utils.translation import gettext_lazy as _
@@ -10,6 +8,8 @@ def validate_msisdn(value):
     Checks msisdn valid with locale format
     """
     if value:
+        import phonenumbers
+
         error_msg = _('Enter a valid msisdn number')
 
         if not value.isnumeric():
@@ -36,6 +36,8 @@ def validate_issuer(value):
 
     if value.isnumeric():
         # Msisdn
+        import phonenumbers
+
         try:
             locale_number = phonenumbers.parse(value, 'ID')
         except phonenumbers.NumberParseException as e:
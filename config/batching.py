@@ -0,0 +1,148 @@
+"""
+Batched consumer for many small fire-and-forget tasks. Payload of a
+task listed in TASK_BATCH_ROUTES pushed to a redis list, one flush
+task scheduled per TASK_BATCH_INTERVAL drain up to TASK_BATCH_SIZE
+payloads in one execution.
+
+    from config import batching
+
+    batching.delay(send_sms, data)  # or send_task by name
+
+    @shared_task(ignore_result=True)
+    def send_sms_batch():
+        batching.drain(send_sms_batch, send_sms)
+
+Payload moved to a processing list before run and removed once done,
+failed one pushed back for the next flush up to TASK_BATCH_MAX_ATTEMPTS,
+left by a lost worker put back by the next flush. Delivered at least
+once. OTP never routed here, sent one by one on the otp queue.
+"""
+import json
+import logging
+
+from celery import current_app
+from django.conf import settings
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+_client = None
+
+
+def get_redis():
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(settings.REDIS_URL)
+    return _client
+
+
+def _keys(name):
+    key = 'celery:batch:%s' % name
+    return key, key + ':scheduled', key + ':processing', key + ':lock'
+
+
+def is_enabled():
+    return settings.TASK_BATCH_ENABLED and not settings.DEBUG and redis is not None
+
+
+def _schedule(client, name, countdown=None):
+    # one pending flush per batch task
+    _key, scheduled_key, _processing_key, _lock_key = _keys(name)
+    if client.set(scheduled_key, 1, nx=True, ex=settings.TASK_BATCH_INTERVAL * 10):
+        current_app.send_task(name, countdown=countdown)
+
+
+def push(name, data, attempts=0):
+    """Queue data for batch task name"""
+    key, _scheduled_key, _processing_key, _lock_key = _keys(name)
+    client = get_redis()
+    client.rpush(key, json.dumps({'data': data, 'attempts': attempts}))
+    _schedule(client, name, settings.TASK_BATCH_INTERVAL)
+
+
+def send_task(name, data):
+    """
+    current_app.send_task(name, args=[data]), or queued for its batch
+    task of TASK_BATCH_ROUTES when batching enabled
+    """
+    batch_name = settings.TASK_BATCH_ROUTES.get(name)
+    if batch_name and is_enabled():
+        push(batch_name, data)
+    else:
+        current_app.send_task(name, args=[data])
+
+
+def delay(task, data):
+    """
+    task.delay(data), or queued like send_task. Called inline when
+    DEBUG like other tasks.
+    """
+    if settings.DEBUG:
+        return task(data)  # without celery
+
+    batch_name = settings.TASK_BATCH_ROUTES.get(task.name)
+    if batch_name and is_enabled():
+        push(batch_name, data)
+    else:
+        task.delay(data)  # with celery
+
+
+def drain(batch_task, handler, size=None):
+    """
+    Run handler(data) for up to size payloads of batch_task, return
+    handled count. Flush rescheduled when more left in the list.
+    """
+    size = size or settings.TASK_BATCH_SIZE
+    name = batch_task.name
+    key, scheduled_key, processing_key, lock_key = _keys(name)
+    client = get_redis()
+
+    # payload pushed from now on schedule another flush
+    client.delete(scheduled_key)
+
+    if not client.set(lock_key, 1, nx=True, ex=settings.TASK_BATCH_LOCK_TIMEOUT):
+        # other flush running, its payloads in processing
+        _schedule(client, name, settings.TASK_BATCH_INTERVAL)
+        return 0
+
+    handled = 0
+    failed = list()
+    try:
+        # left by a worker lost mid batch, back to the head in order
+        while client.lmove(processing_key, key, 'RIGHT', 'LEFT') is not None:
+            pass
+
+        for _i in range(size):
+            raw = client.lmove(key, processing_key, 'LEFT', 'RIGHT')
+            if raw is None:
+                break
+
+            try:
+                handler(json.loads(raw)['data'])
+            except Exception:
+                logger.exception("Batch %s payload failed", name)
+                failed.append(raw)  # kept in processing until pushed back
+            else:
+                handled += 1
+                client.lrem(processing_key, 1, raw)
+
+        # after the loop, not retried in this flush
+        for raw in failed:
+            item = json.loads(raw)
+            item['attempts'] += 1
+            if item['attempts'] < settings.TASK_BATCH_MAX_ATTEMPTS:
+                client.rpush(key, json.dumps(item))
+            else:
+                logger.error("Batch %s payload dropped after %s attempts: %s",
+                             name, item['attempts'], item['data'])
+            client.lrem(processing_key, 1, raw)
+    finally:
+        client.delete(lock_key)
+
+    if client.llen(key):
+        _schedule(client, name, settings.TASK_BATCH_INTERVAL if failed else None)
+    return handled
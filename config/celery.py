@@ -1,11 +1,14 @@
 from __future__ import absolute_import, unicode_literals
 import os
 from celery import Celery
+from celery.signals import worker_init
 from django.conf import settings
 
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 os.environ.setdefault('FORKED_BY_MULTIPROCESSING', '1')
+# system checks run by deploy (migrate, check), not by every worker start
+os.environ.setdefault('CELERY_SKIP_CHECKS', '1')
 
 app = Celery('meteora')
 
@@ -21,6 +24,16 @@ app.config_from_object('config.settings.celeryconfig', namespace='CELERY')
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
 
+@worker_init.connect
+def preload_worker(**kwargs):
+    # master, before the pool forked
+    if settings.PRELOAD_ENABLED:
+        from config import preload
+
+        preload.warm(urls=False)
+        preload.freeze()
+
+
 @app.task(bind=True)
 def debug_task(self):
     print('Request: {0!r}'.format(self.request))
@@ -0,0 +1,20 @@
+"""
+gunicorn -c config/gunicorn.py config.wsgi
+
+Application imported once in master (preload_app, see config/preload.py),
+workers forked from it share the imported modules.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+preload_app = True
+
+
+def when_ready(server):
+    # master only, app already loaded by preload_app
+    from config import preload
+
+    preload.freeze()
@@ -0,0 +1,81 @@
+"""
+Preload mode. gunicorn (preload_app, see config/gunicorn.py) and the
+celery master import the project once before forking, so workers
+share those pages copy-on-write instead of each importing it again.
+Libraries in PRELOAD_MODULES stay lazy when preload disabled.
+
+`import_times` run a fresh interpreter with -X importtime for
+`manage.py startup_report`.
+"""
+import gc
+import importlib
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+
+# target: code run by the profiled interpreter
+TARGETS = {
+    'web': 'import config.wsgi\n'
+           'from django.urls import get_resolver\n'
+           'get_resolver().url_patterns',
+    'celery': 'from config.celery import app\n'
+              'import django\n'
+              'django.setup()\n'
+              'app.loader.import_default_modules()',
+}
+
+
+def warm(urls=True):
+    """Import what every worker would import anyway"""
+    if urls:
+        from django.urls import get_resolver
+
+        # every viewset, serializer and model module
+        get_resolver().url_patterns
+
+    for name in settings.PRELOAD_MODULES:
+        importlib.import_module(name)
+
+
+def freeze():
+    """
+    Move objects alive now out of gc reach, collection in a forked
+    worker then never write (so never copy) the shared pages
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def import_times(target):
+    """
+    Return (seconds, [(module, self us, cumulative us, depth)]) of
+    a cold start of target in a new interpreter
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in sys.path if p)
+
+    started = time.monotonic()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', TARGETS[target]],
+        env=env,
+        capture_output=True,
+        text=True
+    )
+    elapsed = time.monotonic() - started
+
+    if process.returncode:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+
+    rows = list()
+    for line in process.stderr.splitlines():
+        # import time:   self [us] | cumulative | imported package
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return elapsed, rows
@@ -1,6 +1,48 @@
+"""
+Queue topology, one worker per queue so bulk work never delay OTP:
+
+    celery -A config worker -Q otp -c 4 -n otp@%h
+    celery -A config worker -Q notification -c 2 -n notification@%h
+    celery -A config worker -Q bulk,default -c 2 -n bulk@%h
+
+Redis has no native priority, messages split into priority_steps
+lists and the lower number consumed first (0 is highest).
+"""
 from django.conf import settings
+from kombu import Queue
 
 broker_url = settings.REDIS_URL
-broker_transport_options = {'visibility_timeout': 3600}
+broker_transport_options = {
+    'visibility_timeout': 3600,
+    'queue_order_strategy': 'priority',
+    'priority_steps': list(range(10)),
+    'sep': ':',
+}
 result_backend = settings.REDIS_URL
+result_expires = 60 * 60
 task_serializer = 'json'
+
+task_queues = (
+    Queue('otp'),
+    Queue('notification'),
+    Queue('bulk'),
+    Queue('default'),
+)
+task_default_queue = 'default'
+task_default_priority = 5
+
+# task name: queue and priority
+task_routes = {
+    'apps.person.tasks.send_securecode_email': {'queue': 'otp', 'priority': 0},
+    'apps.person.tasks.send_securecode_msisdn': {'queue': 'otp', 'priority': 0},
+    'apps.person.tasks.process_image': {'queue': 'bulk', 'priority': 5},
+    'apps.notifier.tasks.*': {'queue': 'notification', 'priority': 3},
+    'apps.feeder.tasks.send_sms': {'queue': 'bulk', 'priority': 6},
+    'apps.feeder.tasks.send_sms_batch': {'queue': 'bulk', 'priority': 6},
+    'apps.feeder.tasks.create_suggest_coupon': {'queue': 'default', 'priority': 2},
+    'apps.feeder.tasks.write_history': {'queue': 'bulk', 'priority': 9},
+    'apps.feeder.tasks.purge_deleted': {'queue': 'bulk', 'priority': 9},
+}
+
+# one message at a time, a long bulk task don't hold a prefetched OTP
+worker_prefetch_multiplier = 1
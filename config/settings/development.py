@@ -33,6 +33,18 @@ DATABASES = {
     }
 }
 
+# Local replica, second mysqld replicating `default`, ie:
+#   mysqld --port=3307 --server-id=2 --read-only --datadir=/tmp/mysql-replica
+#   mysql -P 3307 -e "CHANGE MASTER TO MASTER_HOST='127.0.0.1', ...; START SLAVE;"
+#   DJANGO_DB_REPLICA_PORT=3307 python manage.py runserver
+if os.environ.get('DJANGO_DB_REPLICA_PORT'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'PORT': os.environ['DJANGO_DB_REPLICA_PORT'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    FEEDER_REPLICA_DATABASES = ('replica',)
+
 
 # Static files (CSS, JavaScript, Images)
 # ------------------------------------------------------------------------------
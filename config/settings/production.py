@@ -8,6 +8,7 @@ from sentry_sdk.integrations.django import DjangoIntegration
 from corsheaders.defaults import default_headers
 
 DEBUG = False
+PRELOAD_ENABLED = True
 ALLOWED_HOSTS = [
     'localhost',
     '127.0.0.1',
@@ -108,6 +109,29 @@ DATABASES = {
     }
 }
 
+# Read replica, same credential on other host
+if os.environ.get('DJANGO_DB_REPLICA_HOST'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DJANGO_DB_REPLICA_HOST'],
+        'TEST': {'MIRROR': 'default'},
+    }
+    FEEDER_REPLICA_DATABASES = ('replica',)
+
+
+# Async views cache and throttle on the same redis
+FEEDER_ASYNC_REDIS_URL = REDIS_URL
+
+# Prometheus scrape /metrics/ with this bearer token
+FEEDER_METRICS_TOKEN = os.environ.get('FEEDER_METRICS_TOKEN')
+
+
+# Django Rest Framework (DRF)
+# No browsable api in production
+REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
+    'rest_framework.renderers.JSONRenderer',
+]
+
 
 # CHANNELS
 CHANNEL_LAYERS = {
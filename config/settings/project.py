@@ -32,12 +32,19 @@ AUTHENTICATION_BACKENDS = [
 
 # MIDDLEWARES
 PROJECT_MIDDLEWARE = [
+    'apps.feeder.middleware.MetricsMiddleware',
+    'apps.feeder.middleware.ReplicaMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'simple_history.middleware.HistoryRequestMiddleware',
+    'apps.feeder.middleware.HistoryBufferMiddleware',
 ]
 MIDDLEWARE = PROJECT_MIDDLEWARE + MIDDLEWARE
 
 
+# Read replica, see apps.feeder.replicas
+DATABASE_ROUTERS = ['apps.feeder.replicas.ReplicaRouter']
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.0/ref/settings/#auth-password-validators
 AUTH_PASSWORD_VALIDATORS = [
@@ -66,17 +73,52 @@ REDIS_PORT = '6379'
 REDIS_URL = 'redis://' + REDIS_HOST + ':' + REDIS_PORT
 
 
+# CELERY
+# Group small notification and sms tasks, see config/batching.py
+# OTP (apps.person.tasks.send_securecode_*) never listed, sent one by one
+TASK_BATCH_ENABLED = False
+TASK_BATCH_SIZE = 100
+TASK_BATCH_INTERVAL = 2
+TASK_BATCH_MAX_ATTEMPTS = 3
+TASK_BATCH_LOCK_TIMEOUT = 60 * 5
+TASK_BATCH_ROUTES = {
+    'apps.feeder.tasks.send_sms': 'apps.feeder.tasks.send_sms_batch',
+    'apps.notifier.tasks.send_notification': 'apps.notifier.tasks.send_notification_batch',
+}
+
+
+# IDEMPOTENCY
+# Idempotency-Key of create endpoints, see api/idempotency.py
+IDEMPOTENCY_TIMEOUT = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+IDEMPOTENCY_WAIT = 5
+
+
+# PRELOAD
+# Import once in gunicorn (preload_app) and celery master before fork,
+# workers share the pages, see config/preload.py
+# Libraries below are lazy otherwise, loaded by the worker which use it
+PRELOAD_ENABLED = False
+PRELOAD_MODULES = ('qrcode', 'phonenumbers', 'PIL.Image', 'requests',)
+
+
 # Django Rest Framework (DRF)
 # ------------------------------------------------------------------------------
 # https://www.django-rest-framework.org/
 REST_FRAMEWORK = {
     'DEFAULT_THROTTLE_CLASSES': [
-        'rest_framework.throttling.AnonRateThrottle',
-        'rest_framework.throttling.UserRateThrottle'
+        'api.throttling.SlidingWindowThrottle',
     ],
+    # scopes of SlidingWindowThrottle limits, see api/throttling.py
     'DEFAULT_THROTTLE_RATES': {
         'anon': '10/minute',
-        'user': '100/minute'
+        'user': '100/minute',
+        'suggest_ip': '10/minute',
+        'suggest_user': '30/minute',
+        'suggest_spread': '120/minute',
+        'suggest_canal': '5/hour',
+        'securecode_ip': '10/minute',
+        'securecode_issuer': '5/hour',
     },
     'DEFAULT_PARSER_CLASSES': [
         'rest_framework.parsers.JSONParser',
@@ -142,6 +184,11 @@ TAGGIT_CASE_INSENSITIVE = True
 # Simple history
 SIMPLE_HISTORY_HISTORY_ID_USE_UUID = True
 
+# Feeder history writer; sync, deferred, async, sampled or off
+# see apps/feeder/history.py
+FEEDER_HISTORY_DEFAULT_POLICY = 'deferred'
+FEEDER_HISTORY_POLICIES = {}
+
 
 # CACHING
 # https://docs.djangoproject.com/en/2.2/topics/cache/
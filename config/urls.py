@@ -4,10 +4,12 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 from api import routers as api_routers
+from apps.feeder.views import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(api_routers)),
+    path('metrics/', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG: